@@ -0,0 +1,83 @@
+"""Microbenchmark: list-of-dicts chunk records vs. columnar ChunkBatch.
+
+Measures time and peak Python memory for carrying 10k embedded chunks from the
+embedding model output to the arguments of the Milvus insert call.
+
+Usage:
+    python benchmarks/bench_chunk_batch.py [--chunks 10000] [--dim 384]
+"""
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.data.chunk_batch import ChunkBatch
+
+
+def legacy_path(contents, embeddings):
+    """Previous path: per-chunk tolist() into dicts, then lists rebuilt for insert."""
+    records = [{
+        'content': chunk,
+        'embedding': embedding.tolist(),
+        'metadata': {'chunk_id': i}
+    } for i, (chunk, embedding) in enumerate(zip(contents, embeddings))]
+    insert_contents = [doc['content'] for doc in records]
+    insert_embeddings = [doc['embedding'] for doc in records]
+    return records, insert_contents, insert_embeddings
+
+
+def batch_path(contents, embeddings):
+    """Columnar path: the embedding matrix is handed to the insert call as is."""
+    batch = ChunkBatch(contents=contents, embeddings=embeddings)
+    return batch, batch.contents, batch.embeddings
+
+
+def measure(fn, contents, embeddings, repeats):
+    """Return (best time in seconds, peak traced memory in bytes)."""
+    best = float('inf')
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = fn(contents, embeddings)
+        best = min(best, time.perf_counter() - start)
+        del result
+
+    tracemalloc.start()
+    result = fn(contents, embeddings)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return best, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--chunks', type=int, default=10000)
+    parser.add_argument('--dim', type=int, default=384)
+    parser.add_argument('--repeats', type=int, default=5)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    contents = [f"chunk {i} " + "lorem ipsum " * 40 for i in range(args.chunks)]
+    embeddings = rng.standard_normal((args.chunks, args.dim), dtype=np.float32)
+
+    print(f"{args.chunks} chunks, {args.dim}-dim embeddings "
+          f"(raw float32 matrix: {embeddings.nbytes / 2**20:.1f} MiB)")
+    results = {}
+    for name, fn in [("list of dicts", legacy_path), ("ChunkBatch", batch_path)]:
+        seconds, peak = measure(fn, contents, embeddings, args.repeats)
+        results[name] = (seconds, peak)
+        print(f"{name:>14}: {seconds * 1000:8.1f} ms  peak {peak / 2**20:8.1f} MiB")
+
+    legacy_seconds, legacy_peak = results["list of dicts"]
+    batch_seconds, batch_peak = results["ChunkBatch"]
+    print(f"saved per {args.chunks} chunks: {(legacy_seconds - batch_seconds) * 1000:.1f} ms, "
+          f"{(legacy_peak - batch_peak) / 2**20:.1f} MiB")
+
+
+if __name__ == "__main__":
+    main()
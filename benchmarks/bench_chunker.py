@@ -0,0 +1,124 @@
+"""Benchmark: LangChain RecursiveCharacterTextSplitter vs. the native TextChunker.
+
+Splits a large synthetic markdown document (headings, paragraphs, lists and
+code blocks) with both chunkers and reports throughput and chunk statistics.
+With --tokenizer, the native chunker is also run in token length mode using
+that Hugging Face tokenizer, cold and with a warm token cache.
+
+Usage:
+    python benchmarks/bench_chunker.py [--size-mb 8] [--chunk-size 512] [--chunk-overlap 50]
+                                       [--tokenizer sentence-transformers/all-MiniLM-L6-v2]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from langchain_text_splitters import RecursiveCharacterTextSplitter
+
+from src.data.chunker import TextChunker, tokenizer_offsets
+
+WORDS = (
+    "the pipeline document vector embedding chunk model retrieval index query latency "
+    "throughput batch stage worker queue parse token separator offset storage milvus"
+).split()
+
+
+def make_markdown(size_bytes: int, seed: int = 0) -> str:
+    """Generate markdown text of roughly the requested size."""
+    rng = random.Random(seed)
+
+    def sentence():
+        return " ".join(rng.choice(WORDS) for _ in range(rng.randint(6, 20))).capitalize() + "."
+
+    parts = []
+    size = 0
+    section = 0
+    while size < size_bytes:
+        kind = rng.random()
+        if kind < 0.1:
+            section += 1
+            part = f"{'#' * rng.randint(1, 3)} Section {section}"
+        elif kind < 0.3:
+            part = "\n".join(f"- {sentence()}" for _ in range(rng.randint(2, 8)))
+        elif kind < 0.35:
+            part = "```python\n" + "\n".join(f"value_{i} = compute({i})" for i in range(rng.randint(3, 15))) + "\n```"
+        else:
+            part = " ".join(sentence() for _ in range(rng.randint(2, 30)))
+        parts.append(part)
+        size += len(part) + 2
+    return "\n\n".join(parts)
+
+
+def measure(fn, text, repeats):
+    """Return (best time in seconds, result of the last run)."""
+    best = float('inf')
+    result = None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = fn(text)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def report(name, seconds, chunks, text_mb):
+    lengths = [len(chunk) if isinstance(chunk, str) else chunk[1] - chunk[0] for chunk in chunks]
+    print(f"{name:>28}: {seconds * 1000:9.1f} ms  {text_mb / seconds:7.1f} MB/s  "
+          f"{len(chunks):7d} chunks  avg {sum(lengths) / max(len(lengths), 1):6.1f} chars")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--size-mb', type=float, default=8)
+    parser.add_argument('--chunk-size', type=int, default=512)
+    parser.add_argument('--chunk-overlap', type=int, default=50)
+    parser.add_argument('--repeats', type=int, default=3)
+    parser.add_argument('--tokenizer', default=None, help="Hugging Face tokenizer for token length mode")
+    args = parser.parse_args()
+
+    text = make_markdown(int(args.size_mb * 1024 * 1024))
+    text_mb = len(text.encode('utf-8')) / 2**20
+    print(f"{text_mb:.1f} MB of markdown, chunk_size={args.chunk_size}, chunk_overlap={args.chunk_overlap}")
+
+    splitter = RecursiveCharacterTextSplitter(
+        chunk_size=args.chunk_size,
+        chunk_overlap=args.chunk_overlap,
+        length_function=len,
+        is_separator_regex=False,
+        add_start_index=True,
+    )
+    chunker = TextChunker(chunk_size=args.chunk_size, chunk_overlap=args.chunk_overlap)
+
+    results = {}
+    for name, fn in [
+        ("langchain create_documents", lambda t: [doc.page_content for doc in splitter.create_documents([t])]),
+        ("native split_text", chunker.split_text),
+        ("native split_offsets", chunker.split_offsets),
+    ]:
+        seconds, chunks = measure(fn, text, args.repeats)
+        results[name] = seconds
+        report(name, seconds, chunks, text_mb)
+    print(f"speedup (split_text): {results['langchain create_documents'] / results['native split_text']:.1f}x")
+
+    if args.tokenizer:
+        from transformers import AutoTokenizer
+        tokenizer = AutoTokenizer.from_pretrained(args.tokenizer)
+        token_chunker = TextChunker(
+            chunk_size=args.chunk_size // 4,
+            chunk_overlap=args.chunk_overlap // 4,
+            length_mode="tokens",
+            token_offsets=tokenizer_offsets(tokenizer),
+            token_cache_size=10**6
+        )
+        start = time.perf_counter()
+        chunks = token_chunker.split_offsets(text)
+        report("native tokens (cold cache)", time.perf_counter() - start, chunks, text_mb)
+        seconds, chunks = measure(token_chunker.split_offsets, text, args.repeats)
+        report("native tokens (warm cache)", seconds, chunks, text_mb)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""Benchmark: torch vs. ONNX Runtime (fp32 and dynamic int8) embedding backends.
+
+Loads the model through each backend, then encodes the same synthetic chunks
+and reports the load time, chunks per second, and the drift from the torch
+embeddings as minimum and mean cosine similarity. ONNX exports are built
+and validated on first use, as the ingestion backend does, so run the
+benchmark once to build them before comparing load times.
+
+Usage:
+    python benchmarks/bench_embedding_backends.py [--chunks 2048] [--quantization avx2 avx512_vnni]
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from sentence_transformers import SentenceTransformer
+
+from bench_embedding_pool import make_chunks, run
+from src.data.onnx_embedding import cosine_similarities, load_onnx_model, prepare_onnx_model
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--model', default="sentence-transformers/all-MiniLM-L6-v2")
+    parser.add_argument('--chunks', type=int, default=2048)
+    parser.add_argument('--chunk-chars', type=int, default=512)
+    parser.add_argument('--batch-size', type=int, default=64)
+    parser.add_argument('--quantization', nargs='*', default=["avx2"],
+                        help="int8 quantization configs to compare, besides fp32")
+    parser.add_argument('--onnx-path', default="state/onnx")
+    args = parser.parse_args()
+
+    chunks = make_chunks(args.chunks, args.chunk_chars)
+    print(f"{len(chunks)} chunks of ~{args.chunk_chars} chars, {os.cpu_count()} CPUs")
+
+    def load_torch():
+        return SentenceTransformer(args.model, device="cpu")
+
+    def onnx_loader(quantization):
+        def load():
+            config = {"model_name": args.model, "onnx": {"path": args.onnx_path, "quantization": quantization}}
+            return load_onnx_model(*prepare_onnx_model(config))
+        return load
+
+    backends = [("torch", load_torch), ("onnx fp32", onnx_loader(None))]
+    backends += [(f"onnx qint8 {q}", onnx_loader(q)) for q in args.quantization]
+
+    reference = None
+    for name, load in backends:
+        start = time.perf_counter()
+        model = load()
+        load_seconds = time.perf_counter() - start
+        model.encode(chunks[:args.batch_size])
+        seconds = run(lambda batch: model.encode(batch, batch_size=args.batch_size), chunks, args.batch_size)
+
+        embeddings = model.encode(chunks, batch_size=args.batch_size)
+        if reference is None:
+            reference = embeddings
+        similarities = cosine_similarities(reference, embeddings)
+        print(f"{name:>20}: load {load_seconds:6.2f}s  {len(chunks) / seconds:8.1f} chunks/s  "
+              f"cosine min {similarities.min():.4f} mean {similarities.mean():.4f}")
+        del model
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""Benchmark: one SentenceTransformer process vs. the multi-process EmbeddingProcessPool.
+
+Encodes the same synthetic chunks with a single in-process model (torch
+using all cores) and with pools of increasing size, and reports chunks per
+second and the speedup over the single process. Run it on the ingestion
+node itself; the result depends on the number of physical cores.
+
+Usage:
+    python benchmarks/bench_embedding_pool.py [--chunks 4096] [--workers 1 2 4 8] [--shard-size 32]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from sentence_transformers import SentenceTransformer
+
+from src.data.embedding_pool import EmbeddingProcessPool
+
+WORDS = (
+    "the pipeline document vector embedding chunk model retrieval index query latency "
+    "throughput batch stage worker queue parse token separator offset storage milvus"
+).split()
+
+
+def make_chunks(count: int, chunk_chars: int, seed: int = 0):
+    rng = random.Random(seed)
+    chunks = []
+    for _ in range(count):
+        words = []
+        while sum(len(word) + 1 for word in words) < chunk_chars:
+            words.append(rng.choice(WORDS))
+        chunks.append(" ".join(words))
+    return chunks
+
+
+def run(encode, chunks, batch_size):
+    start = time.perf_counter()
+    for i in range(0, len(chunks), batch_size):
+        encode(chunks[i:i + batch_size])
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--model', default="sentence-transformers/all-MiniLM-L6-v2")
+    parser.add_argument('--chunks', type=int, default=4096)
+    parser.add_argument('--chunk-chars', type=int, default=512)
+    parser.add_argument('--workers', type=int, nargs='+', default=None)
+    parser.add_argument('--shard-size', type=int, default=32)
+    args = parser.parse_args()
+
+    cores = os.cpu_count() or 1
+    worker_counts = args.workers or sorted({1, 2, max(cores // 2, 1), cores})
+    chunks = make_chunks(args.chunks, args.chunk_chars)
+    print(f"{len(chunks)} chunks of ~{args.chunk_chars} chars, {cores} CPUs")
+
+    model = SentenceTransformer(args.model, device="cpu")
+    model.encode(chunks[:args.shard_size])
+    baseline = run(model.encode, chunks, 64)
+    print(f"{'single process':>16}: {len(chunks) / baseline:8.1f} chunks/s")
+    del model
+
+    for workers in worker_counts:
+        pool = EmbeddingProcessPool(args.model, num_workers=workers, shard_size=args.shard_size)
+        pool.start()
+        try:
+            batch_size = workers * args.shard_size
+            pool.encode(chunks[:batch_size])
+            seconds = run(pool.encode, chunks, batch_size)
+        finally:
+            pool.close()
+        print(f"{f'pool x{workers}':>16}: {len(chunks) / seconds:8.1f} chunks/s  "
+              f"speedup {baseline / seconds:4.1f}x  ({pool.threads_per_worker} threads/worker)")
+
+
+if __name__ == "__main__":
+    main()
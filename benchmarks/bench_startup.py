@@ -0,0 +1,98 @@
+"""Startup report: import time of the service entry points, broken down by package.
+
+Imports each entry point in a fresh interpreter with ``python -X importtime``
+and reports the total import time and the packages that take the longest to
+import. It fails if an entry point imports a package it must not load at
+startup, such as ragas or torch in the API process, or exceeds
+``--max-seconds``. CI can track the ``--json`` output.
+
+Usage:
+    python benchmarks/bench_startup.py [--top 15] [--json report.json] [--max-seconds 10]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+from collections import defaultdict
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+# Entry point -> packages only loaded once they are used, never at import time
+ENTRY_POINTS = {
+    "api.main": ["ragas", "mlflow", "llama_parse", "torch", "sentence_transformers"],
+    "start_reindex": ["torch", "sentence_transformers", "mlflow", "llama_parse"],
+    "src.pipeline.document_ingestion_pipeline": ["ragas", "llama_parse", "langchain_text_splitters"],
+}
+
+
+def import_times(module: str):
+    """Import a module in a fresh interpreter; returns wall seconds and per-module import times."""
+    start = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=PROJECT_ROOT, capture_output=True, text=True
+    )
+    seconds = time.perf_counter() - start
+    if result.returncode != 0:
+        raise RuntimeError(f"Importing {module} failed:\n{result.stderr[-2000:]}")
+
+    modules = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        # "import time:  self [us] | cumulative [us] | nested module name"
+        self_us, cumulative_us, name = (part.strip() for part in line.split(":", 1)[1].split("|"))
+        modules.append((name, int(self_us), int(cumulative_us)))
+    return seconds, modules
+
+
+def report(module: str, forbidden, top: int) -> dict:
+    seconds, modules = import_times(module)
+    # Self time summed per top-level package
+    packages = defaultdict(int)
+    for name, self_us, _ in modules:
+        packages[name.split(".")[0]] += self_us
+    imported = {name for name, _, _ in modules}
+    return {
+        "module": module,
+        "wall_seconds": round(seconds, 3),
+        "import_seconds": round(sum(packages.values()) / 1e6, 3),
+        "packages": [
+            {"package": package, "seconds": round(us / 1e6, 3)}
+            for package, us in sorted(packages.items(), key=lambda item: -item[1])[:top]
+        ],
+        "forbidden_imports": sorted(package for package in forbidden if package in imported)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('modules', nargs='*', default=list(ENTRY_POINTS))
+    parser.add_argument('--top', type=int, default=15)
+    parser.add_argument('--json', default=None, help="write the report to this file")
+    parser.add_argument('--max-seconds', type=float, default=None, help="fail if an import takes longer")
+    args = parser.parse_args()
+
+    reports = [report(module, ENTRY_POINTS.get(module, []), args.top) for module in args.modules]
+    failed = False
+    for entry in reports:
+        print(f"{entry['module']}: {entry['wall_seconds']:.2f}s wall, {entry['import_seconds']:.2f}s importing")
+        for package in entry["packages"]:
+            print(f"  {package['package']:<32} {package['seconds']:7.3f}s")
+        if entry["forbidden_imports"]:
+            failed = True
+            print(f"  imported at startup: {', '.join(entry['forbidden_imports'])}")
+        if args.max_seconds is not None and entry["wall_seconds"] > args.max_seconds:
+            failed = True
+            print(f"  slower than {args.max_seconds}s")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(reports, f, indent=2)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
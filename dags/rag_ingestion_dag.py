@@ -1,8 +1,10 @@
 from airflow import DAG
 from airflow.operators.python import PythonOperator
 from datetime import datetime, timedelta
+import logging
 import sys
 import os
+import yaml
 
 # Add project root to Python path properly
 PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
@@ -11,6 +13,13 @@ sys.path.insert(0, PROJECT_ROOT)
 from src.pipeline.document_ingestion_pipeline import DocumentIngestionPipeline
 from src.pipeline.sources.source_folder import FolderSourceHandler
 
+CONFIG_PATH = os.path.join(PROJECT_ROOT, 'config/config.yaml')
+DOCUMENTS_PATH = os.path.join(PROJECT_ROOT, 'documents')
+
+with open(CONFIG_PATH, 'r') as f:
+    BATCH_CONFIG = yaml.safe_load(f).get('ingestion', {}).get('batch', {})
+NUM_SHARDS = BATCH_CONFIG.get('num_shards', 4)
+
 default_args = {
     'owner': 'airflow',
     'depends_on_past': False,
@@ -21,24 +30,70 @@ default_args = {
     'retry_delay': timedelta(minutes=5),
 }
 
-def run_ingestion():
-    config_path = os.path.join(PROJECT_ROOT, 'config/config.yaml')
-    documents_path = os.path.join(PROJECT_ROOT, 'documents')
-    
+def shard_config_path(shard_index: int, num_shards: int) -> str:
+    """Write a config whose path-keyed state files are private to one shard.
+
+    Files always hash to the same shard, so each shard keeps its own manifest
+    and work queue and shards never write the same SQLite database. The embedding cache is keyed by content and stays shared.
+    """
+    with open(CONFIG_PATH, 'r') as f:
+        config = yaml.safe_load(f)
+    state_dir = os.path.join(PROJECT_ROOT, 'state', f'shard-{shard_index}-of-{num_shards}')
+    ingestion_config = config.setdefault('ingestion', {})
+    for section in (ingestion_config.get('manifest'), ingestion_config.get('work_queue')):
+        if section and section.get('path'):
+            section['path'] = os.path.join(state_dir, os.path.basename(section['path']))
+
+    os.makedirs(state_dir, exist_ok=True)
+    path = os.path.join(state_dir, 'config.yaml')
+    with open(path, 'w') as f:
+        yaml.safe_dump(config, f)
+    return path
+
+def run_ingestion(shard_index: int = 0, num_shards: int = 1) -> dict:
+    """Ingest the pending documents of one shard and exit with a summary."""
+    config_path = shard_config_path(shard_index, num_shards) if num_shards > 1 else CONFIG_PATH
+
     pipeline = DocumentIngestionPipeline(config_path)
-    folder_handler = FolderSourceHandler(pipeline.config, documents_path)
+    folder_handler = FolderSourceHandler(pipeline.config, DOCUMENTS_PATH)
     pipeline.add_source_handler("folder", folder_handler)
-    pipeline.run()
+    summary = pipeline.run_batch(
+        folder_handler.pending_documents(shard_index, num_shards),
+        timeout=BATCH_CONFIG.get('timeout_seconds')
+    )
+    summary["shard"] = shard_index
+    return summary
+
+def summarize_ingestion(ti) -> dict:
+    """Combine the summaries of all shards."""
+    summaries = [summary for summary in ti.xcom_pull(task_ids='ingest_documents') or [] if summary]
+    totals = {
+        key: sum(summary[key] for summary in summaries)
+        for key in ("documents", "processed", "skipped", "failed", "unfinished")
+    }
+    logging.info(f"Ingested {len(summaries)} shards: {totals}")
+    return totals
 
 with DAG(
     'rag_ingestion',
     default_args=default_args,
     description='RAG document ingestion pipeline',
     schedule_interval=timedelta(hours=1),
-    catchup=False
+    catchup=False,
+    max_active_runs=1
 ) as dag:
 
-    ingest_task = PythonOperator(
+    # One mapped task per shard, spread over the available Airflow workers
+    ingest_task = PythonOperator.partial(
         task_id='ingest_documents',
         python_callable=run_ingestion,
-    )
\ No newline at end of file
+    ).expand(
+        op_kwargs=[{"shard_index": i, "num_shards": NUM_SHARDS} for i in range(NUM_SHARDS)]
+    )
+
+    summarize_task = PythonOperator(
+        task_id='summarize_ingestion',
+        python_callable=summarize_ingestion,
+    )
+
+    ingest_task >> summarize_task
@@ -0,0 +1,71 @@
+from dataclasses import dataclass, field
+from typing import Dict, List
+
+import numpy as np
+
+
+@dataclass
+class ChunkBatch:
+    """Columnar batch of embedded chunks.
+
+    Chunk contents, a float32 embedding matrix and per-chunk metadata arrays are
+    kept as columns, so embeddings travel from the model to the vector store
+    without being converted into per-chunk Python lists of floats.
+    """
+    contents: List[str]
+    embeddings: np.ndarray
+    chunk_ids: np.ndarray = None
+    metadata: Dict[str, np.ndarray] = field(default_factory=dict)
+
+    def __post_init__(self):
+        self.embeddings = np.ascontiguousarray(self.embeddings, dtype=np.float32)
+        if self.embeddings.ndim != 2:
+            rows = len(self.contents)
+            self.embeddings = self.embeddings.reshape(rows, -1) if rows else self.embeddings.reshape(0, 0)
+        if self.chunk_ids is None:
+            self.chunk_ids = np.arange(len(self.contents), dtype=np.int64)
+        else:
+            self.chunk_ids = np.asarray(self.chunk_ids, dtype=np.int64)
+        if not len(self.contents) == len(self.embeddings) == len(self.chunk_ids):
+            raise ValueError(
+                f"Chunk batch columns have different lengths: {len(self.contents)} contents, "
+                f"{len(self.embeddings)} embeddings, {len(self.chunk_ids)} chunk ids"
+            )
+
+    def __len__(self) -> int:
+        return len(self.contents)
+
+    @classmethod
+    def empty(cls, dim: int = 0) -> 'ChunkBatch':
+        """Create a batch without chunks."""
+        return cls(contents=[], embeddings=np.empty((0, dim), dtype=np.float32))
+
+    @classmethod
+    def concat(cls, batches: List['ChunkBatch']) -> 'ChunkBatch':
+        """Concatenate batches column by column."""
+        batches = [batch for batch in batches if len(batch)]
+        if not batches:
+            return cls.empty()
+        metadata_keys = set.intersection(*(set(batch.metadata) for batch in batches))
+        return cls(
+            contents=[content for batch in batches for content in batch.contents],
+            embeddings=np.concatenate([batch.embeddings for batch in batches]),
+            chunk_ids=np.concatenate([batch.chunk_ids for batch in batches]),
+            metadata={
+                key: np.concatenate([np.asarray(batch.metadata[key]) for batch in batches])
+                for key in metadata_keys
+            }
+        )
+
+    @property
+    def total_content_length(self) -> int:
+        """Total number of characters over all chunks."""
+        return sum(len(content) for content in self.contents)
+
+    def to_records(self) -> List[Dict]:
+        """Convert to the list-of-dicts format returned by DocumentProcessor.process_document."""
+        return [{
+            'content': content,
+            'embedding': embedding.tolist(),
+            'metadata': {'chunk_id': int(chunk_id)}
+        } for content, embedding, chunk_id in zip(self.contents, self.embeddings, self.chunk_ids)]
@@ -0,0 +1,54 @@
+import threading
+from collections import defaultdict
+from typing import Dict, List, Tuple
+
+from ..utils.hashing import hash_text
+
+
+class ChunkDiff:
+    """Works out which chunks of an updated document need to be written.
+
+    Built from the chunks currently stored for a document, as returned by
+    ``VectorStore.get_document_chunks``. New chunks whose content hash matches
+    a stored chunk are unchanged and skipped; the stored chunks left unmatched
+    once the whole document has been seen are stale and should be deleted.
+    Unchanged chunks that moved to another position, e.g. after text was
+    inserted before them, are reported with their new chunk index.
+    Chunks can be fed in several windows, as for streamed documents.
+    """
+    def __init__(self, existing_chunks: List[Dict]):
+        self._lock = threading.Lock()
+        self._unmatched: Dict[str, List[Tuple[int, int]]] = defaultdict(list)
+        for chunk in existing_chunks:
+            self._unmatched[chunk['chunk_hash']].append((chunk['id'], chunk.get('chunk_index')))
+        self._moved: Dict[int, int] = {}
+        self.unchanged = 0
+
+    def filter_new(self, chunks: List[str], start_index: int = 0) -> Tuple[List[str], List[int]]:
+        """Return the chunks that are not stored yet, with their chunk indices."""
+        new_chunks = []
+        new_indices = []
+        with self._lock:
+            for index, chunk in enumerate(chunks, start=start_index):
+                stored = self._unmatched.get(hash_text(chunk))
+                if stored:
+                    # Prefer a stored copy at the same position, which needs no renumbering
+                    position = next((i for i, (_, stored_index) in enumerate(stored) if stored_index == index), -1)
+                    chunk_id, stored_index = stored.pop(position)
+                    if stored_index != index:
+                        self._moved[chunk_id] = index
+                    self.unchanged += 1
+                else:
+                    new_chunks.append(chunk)
+                    new_indices.append(index)
+        return new_chunks, new_indices
+
+    def stale_ids(self) -> List[int]:
+        """Primary keys of stored chunks that no longer appear in the document."""
+        with self._lock:
+            return [chunk_id for stored in self._unmatched.values() for chunk_id, _ in stored]
+
+    def moved_chunks(self) -> Dict[int, int]:
+        """New chunk index of each unchanged stored chunk that changed position, by primary key."""
+        with self._lock:
+            return dict(self._moved)
@@ -0,0 +1,224 @@
+import threading
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
+from typing import Callable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+# Separators tried from the strongest to the weakest boundary, as in
+# LangChain's RecursiveCharacterTextSplitter. Text without any of them is cut
+# at the length limit.
+DEFAULT_SEPARATORS = ("\n\n", "\n", " ")
+
+# Paragraphs are tokenized and cached one at a time in token length mode
+PARAGRAPH_SEPARATOR = "\n\n"
+
+LENGTH_MODES = ("chars", "tokens")
+
+# Maps a text to the (start, end) character offsets of its tokens
+TokenOffsetsFn = Callable[[str], Sequence[Tuple[int, int]]]
+
+
+def tokenizer_offsets(tokenizer) -> TokenOffsetsFn:
+    """Adapt a Hugging Face fast tokenizer to return token character offsets."""
+    def offsets(text: str) -> Sequence[Tuple[int, int]]:
+        encoding = tokenizer(
+            text,
+            add_special_tokens=False,
+            return_offsets_mapping=True,
+            return_attention_mask=False,
+            verbose=False
+        )
+        return encoding["offset_mapping"]
+    return offsets
+
+
+class TextChunker:
+    """Splits text into overlapping chunks in a single pass over separator offsets.
+
+    The offsets of every separator are found once up front. Each chunk then
+    ends at the furthest separator of the strongest kind that keeps it within
+    ``chunk_size``, and the next chunk starts at the first separator of that
+    kind inside the last ``chunk_overlap`` of it. A segment that had to be cut
+    at a weaker separator is finished before the next one starts, so chunk
+    boundaries follow those of a recursive separator split without building
+    intermediate strings. Chunks are returned as (start, end) offsets into the
+    text, with surrounding whitespace excluded.
+
+    In ``chars`` mode sizes count characters. In ``tokens`` mode they count
+    tokens of the embedding model; token offsets are computed per paragraph
+    and kept in an LRU cache.
+    """
+    def __init__(
+        self,
+        chunk_size: int,
+        chunk_overlap: int = 0,
+        separators: Sequence[str] = DEFAULT_SEPARATORS,
+        length_mode: str = "chars",
+        token_offsets: Optional[TokenOffsetsFn] = None,
+        token_cache_size: int = 10000
+    ):
+        if chunk_overlap >= chunk_size:
+            raise ValueError(f"Chunk overlap ({chunk_overlap}) must be smaller than chunk size ({chunk_size})")
+        if length_mode not in LENGTH_MODES:
+            raise ValueError(f"Unknown chunk length mode '{length_mode}', expected one of {LENGTH_MODES}")
+        if length_mode == "tokens" and token_offsets is None:
+            raise ValueError("Token length mode needs a tokenizer")
+        self.chunk_size = chunk_size
+        self.chunk_overlap = chunk_overlap
+        self.separators = [separator for separator in separators if separator]
+        self.length_mode = length_mode
+        self.token_offsets = token_offsets
+        self.token_cache_size = token_cache_size
+        self._token_cache: "OrderedDict[str, List[Tuple[int, int]]]" = OrderedDict()
+        self._cache_lock = threading.Lock()
+
+    def split_offsets(self, text: str) -> List[Tuple[int, int]]:
+        """Split text into chunks, returned as (start, end) character offsets."""
+        breaks = _SeparatorOffsets(text, self.separators)
+        if self.length_mode == "tokens":
+            token_starts, token_ends = self._tokens(text)
+        text_length = len(text)
+
+        chunks = []
+        start = self._skip_whitespace(text, 0, text_length)
+        # Number of separator kinds the chunk must not cross: once a segment had
+        # to be cut at a weaker separator, its pieces stay within that segment
+        depth = 0
+        while start < text_length:
+            # Furthest end that keeps the chunk within the size limit
+            if self.length_mode == "tokens":
+                first_token = bisect_left(token_ends, start + 1)
+                last_token = first_token + self.chunk_size
+                max_end = token_ends[last_token - 1] if last_token <= len(token_ends) else text_length
+            else:
+                max_end = start + self.chunk_size
+            for outer in range(depth):
+                positions = breaks[outer]
+                i = bisect_right(positions, start)
+                if i < len(positions):
+                    max_end = min(max_end, positions[i])
+
+            level = len(breaks)
+            if max_end >= text_length:
+                end = text_length
+            else:
+                end = max_end
+                for candidate in range(len(breaks)):
+                    positions = breaks[candidate]
+                    i = bisect_right(positions, max_end) - 1
+                    if i >= 0 and positions[i] > start:
+                        end = positions[i]
+                        level = candidate
+                        break
+
+            chunk_end = end
+            while chunk_end > start and text[chunk_end - 1].isspace():
+                chunk_end -= 1
+            if chunk_end > start:
+                chunks.append((start, chunk_end))
+            if end >= text_length:
+                break
+
+            next_start = end
+            if self.chunk_overlap:
+                # Earliest position the overlap with this chunk may start at
+                if self.length_mode == "tokens":
+                    end_token = bisect_left(token_ends, chunk_end)
+                    overlap_token = max(end_token + 1 - self.chunk_overlap, 0)
+                    min_start = token_starts[overlap_token] if overlap_token < len(token_starts) else end
+                else:
+                    min_start = chunk_end - self.chunk_overlap
+                if level == len(breaks):
+                    next_start = max(min_start, start + 1)
+                else:
+                    positions = breaks[level]
+                    i = bisect_left(positions, min_start)
+                    if i < len(positions) and start < positions[i] < end:
+                        next_start = positions[i]
+            depth = level
+            start = self._skip_whitespace(text, next_start, text_length)
+        return chunks
+
+    def split_text(self, text: str) -> List[str]:
+        """Split text into chunk strings."""
+        return [text[start:end] for start, end in self.split_offsets(text)]
+
+    def length(self, text: str) -> int:
+        """Length of a text in the chunker's length mode."""
+        if self.length_mode == "tokens":
+            return len(self._tokens(text)[0])
+        return len(text)
+
+    @staticmethod
+    def _skip_whitespace(text: str, position: int, text_length: int) -> int:
+        while position < text_length and text[position].isspace():
+            position += 1
+        return position
+
+    def _tokens(self, text: str) -> Tuple[List[int], List[int]]:
+        """Token start and end offsets of a text.
+
+        Paragraphs are tokenized separately and their offsets cached, so text
+        that is split again, such as the carried-over tail of a streaming
+        buffer, or that repeats across documents is not tokenized twice.
+        """
+        token_starts: List[int] = []
+        token_ends: List[int] = []
+        position = 0
+        text_length = len(text)
+        while position < text_length:
+            paragraph_end = text.find(PARAGRAPH_SEPARATOR, position)
+            paragraph_end = text_length if paragraph_end == -1 else paragraph_end + len(PARAGRAPH_SEPARATOR)
+            for start, end in self._paragraph_tokens(text[position:paragraph_end]):
+                token_starts.append(position + start)
+                token_ends.append(position + end)
+            position = paragraph_end
+        return token_starts, token_ends
+
+    def _paragraph_tokens(self, paragraph: str) -> List[Tuple[int, int]]:
+        """Token offsets within a paragraph, from the LRU cache when possible."""
+        with self._cache_lock:
+            offsets = self._token_cache.get(paragraph)
+            if offsets is not None:
+                self._token_cache.move_to_end(paragraph)
+                return offsets
+        offsets = [(start, end) for start, end in self.token_offsets(paragraph) if end > start]
+        with self._cache_lock:
+            self._token_cache[paragraph] = offsets
+            if len(self._token_cache) > self.token_cache_size:
+                self._token_cache.popitem(last=False)
+        return offsets
+
+
+class _SeparatorOffsets:
+    """Sorted offsets of each separator in a text, found on first use.
+
+    Weaker separators are often never needed, as most chunks end at a
+    paragraph or line break, so their offsets are only computed on demand.
+    """
+    def __init__(self, text: str, separators: Sequence[str]):
+        self.text = text
+        self.separators = separators
+        self._offsets: List[Optional[List[int]]] = [None] * len(separators)
+        self._codes = None
+
+    def __len__(self) -> int:
+        return len(self.separators)
+
+    def __getitem__(self, level: int) -> List[int]:
+        if self._offsets[level] is None:
+            self._offsets[level] = self._find(self.separators[level])
+        return self._offsets[level]
+
+    def _find(self, separator: str) -> List[int]:
+        """Offsets at which the separator starts, compared on code points with numpy."""
+        if self._codes is None:
+            self._codes = np.frombuffer(self.text.encode('utf-32-le'), dtype=np.uint32)
+        length = len(self._codes) - len(separator) + 1
+        if length <= 0:
+            return []
+        matches = np.ones(length, dtype=bool)
+        for i, char in enumerate(separator):
+            matches &= self._codes[i:i + length] == ord(char)
+        return np.flatnonzero(matches).tolist()
@@ -1,13 +1,33 @@
 import os
-from typing import List, Dict
+from functools import cached_property
+from typing import List, Dict, Iterable, Iterator, Optional, Sequence, Tuple
 import yaml
+import numpy as np
 from dotenv import load_dotenv
 
 load_dotenv()
 
 from sentence_transformers import SentenceTransformer
-from langchain_text_splitters import RecursiveCharacterTextSplitter
-from llama_parse import LlamaParse
+
+from .chunk_batch import ChunkBatch
+from .chunker import TextChunker, tokenizer_offsets
+from .embedding_batcher import EmbeddingBatcher
+from .embedding_cache import EmbeddingCache
+from .embedding_pool import EmbeddingProcessPool
+from .embedding_registry import get_embedding_model
+from .parsers import create_parser_registry
+from ..utils.hashing import hash_bytes, hash_config, hash_text
+
+# Imported on first use: llama_parse is slow to import and only some documents need it
+LlamaParse = None
+
+
+def _llama_parse_class():
+    global LlamaParse
+    if LlamaParse is None:
+        from llama_parse import LlamaParse as llama_parse_class
+        LlamaParse = llama_parse_class
+    return LlamaParse
 
 
 class DocumentProcessor:
@@ -15,44 +35,318 @@ class DocumentProcessor:
         with open(config_path, 'r') as f:
             self.config = yaml.safe_load(f)
         
-        self.embedding_model = SentenceTransformer(
-            self.config['embedding_model']['model_name']
+        # Shared with the retriever and other processors in this process. CPU-only
+        # nodes can run a validated ONNX export of the model, optionally int8-quantized.
+        # With the process pool the workers hold the model, and the parent loads
+        # it only if it is needed, e.g. for the tokens chunker's tokenizer.
+        self.embedding_backend = self.config['embedding_model'].get('backend', 'local')
+        self.embedding_quantization = (
+            self.config['embedding_model'].get('onnx', {}).get('quantization')
+            if self.embedding_backend == 'onnx' else None
         )
-        self.parser = LlamaParse(
-            api_key=os.environ["LLAMA_PARSE_API"],
-            result_type="markdown"
+        if self.embedding_backend != 'process_pool':
+            self.embedding_model = self._load_embedding_model()
+        self.parse_result_type = "markdown"
+        self.llama_parse_api_key = os.environ["LLAMA_PARSE_API"]
+        # Set by the pipeline to reuse parse results stored in the object store
+        self.parse_cache = None
+        # Simple formats are parsed in-process; only the rest goes to LlamaParse
+        self.parser_registry = create_parser_registry(
+            self.config['document_processor'].get('parsers', {})
         )
         self.chunk_size = self.config['document_processor']['chunk_size']
         self.chunk_overlap = self.config['document_processor']['chunk_overlap']
-        self.text_splitter = RecursiveCharacterTextSplitter(
-            chunk_size=self.chunk_size,
-            chunk_overlap=self.chunk_overlap,
-            length_function=len,
-            is_separator_regex=False,
-        )
+        # The native chunker splits in a single pass and can measure chunks in model tokens
+        chunker_config = self.config['document_processor'].get('chunker', {})
+        self.chunker_engine = chunker_config.get('engine', 'langchain')
+        self.chunk_length_mode = chunker_config.get('length_mode', 'chars')
+        self.chunker = None
+        self.text_splitter = None
+        if self.chunker_engine == 'native':
+            self.chunker = TextChunker(
+                chunk_size=self.chunk_size,
+                chunk_overlap=self.chunk_overlap,
+                length_mode=self.chunk_length_mode,
+                token_offsets=(
+                    tokenizer_offsets(self.embedding_model.tokenizer)
+                    if self.chunk_length_mode == 'tokens' else None
+                ),
+                token_cache_size=chunker_config.get('token_cache_size', 10000)
+            )
+        elif self.chunker_engine == 'langchain' and self.chunk_length_mode == 'chars':
+            from langchain_text_splitters import RecursiveCharacterTextSplitter
+            self.text_splitter = RecursiveCharacterTextSplitter(
+                chunk_size=self.chunk_size,
+                chunk_overlap=self.chunk_overlap,
+                length_function=len,
+                is_separator_regex=False,
+                add_start_index=True,
+            )
+        else:
+            raise ValueError(
+                f"Unsupported chunker engine '{self.chunker_engine}' with length mode '{self.chunk_length_mode}'"
+            )
+
+        # Large documents are chunked and embedded in windows instead of all at once
+        streaming_config = self.config['document_processor'].get('streaming', {})
+        self.stream_window_chunks = streaming_config.get('window_chunks', 256)
+        self.stream_buffer_chars = streaming_config.get('buffer_chars', self.chunk_size * 64)
+
+        # CPU-only nodes can encode on a pool of processes, one model copy per worker
+        self.embedding_pool = None
+        if self.embedding_backend == 'process_pool':
+            pool_config = self.config['embedding_model'].get('pool', {})
+            self.embedding_pool = EmbeddingProcessPool(
+                self.config['embedding_model']['model_name'],
+                num_workers=pool_config.get('workers'),
+                threads_per_worker=pool_config.get('threads_per_worker'),
+                shard_size=pool_config.get('shard_size', 32)
+            )
+            self.embedding_pool.start()
+        elif self.embedding_backend not in ('local', 'onnx'):
+            raise ValueError(f"Unknown embedding backend '{self.embedding_backend}'")
+
+        # Optionally share encode batches across documents being processed concurrently
+        self.embedding_batcher = None
+        batching_config = self.config['embedding_model'].get('batching', {})
+        if batching_config.get('enabled', False):
+            self.embedding_batcher = EmbeddingBatcher(
+                encode_fn=self._encode,
+                max_batch_size=batching_config.get('max_batch_size', 64),
+                max_wait_time=batching_config.get('max_wait_ms', 20) / 1000
+            )
+            self.embedding_batcher.start()
+
+        # Optionally reuse embeddings of chunks seen before, e.g. repeated boilerplate
+        self.embedding_cache = None
+        cache_config = self.config['embedding_model'].get('cache', {})
+        if cache_config.get('enabled', False):
+            cache_model_name = self.config['embedding_model']['model_name']
+            if self.embedding_quantization:
+                # int8 embeddings differ slightly from the float model's and are cached apart
+                cache_model_name = f"{cache_model_name}@qint8_{self.embedding_quantization}"
+            self.embedding_cache = EmbeddingCache(
+                db_path=cache_config['path'],
+                model_name=cache_model_name,
+                max_entries=cache_config.get('max_entries', 500000)
+            )
         
+    @property
+    def config_fingerprint(self) -> str:
+        """Fingerprint of the settings that determine the chunks and embeddings produced."""
+        return hash_config({
+            "chunk_size": self.chunk_size,
+            "chunk_overlap": self.chunk_overlap,
+            "chunker": [self.chunker_engine, self.chunk_length_mode],
+            "parsers": [self.parse_result_type, self.parser_registry.settings],
+            "model_name": self.config['embedding_model']['model_name'],
+            "embedding": [self.embedding_backend, self.embedding_quantization]
+        })
+
+    @cached_property
+    def embedding_model(self):
+        """Embedding model of this process, loaded on first use with the process pool backend."""
+        return self._load_embedding_model()
+
+    def _load_embedding_model(self):
+        device = self.config['embedding_model'].get('device')
+        return get_embedding_model(
+            self.config['embedding_model'],
+            device=device,
+            loader=lambda: SentenceTransformer(self.config['embedding_model']['model_name'], device=device)
+        )
+
+    @property
+    def embedding_dimension(self) -> int:
+        """Size of the embeddings produced, without loading a model in this process for the pool."""
+        if self.embedding_pool is not None:
+            return self.embedding_pool.dimension
+        return self.embedding_model.get_sentence_embedding_dimension()
+
+    @cached_property
+    def parser(self):
+        """LlamaParse client, created when the first document needs it."""
+        return _llama_parse_class()(
+            api_key=self.llama_parse_api_key,
+            result_type=self.parse_result_type
+        )
+
+    @property
+    def parser_settings(self) -> dict:
+        """Settings that determine the parser output, used to key cached parse results."""
+        return {"parser": "llamaparse", "result_type": self.parse_result_type}
+
     def parse_document(self, bytes: bytes, extra_info: dict) -> str:
         """Parse a document from bytes to text."""
+        local_parser = self.parser_registry.resolve(
+            extra_info.get("file_name"), extra_info.get("mime_type")
+        )
+        if local_parser is not None:
+            content = local_parser.parse(bytes)
+            if content is not None:
+                return content
+        return self._parse_with_llamaparse(bytes, extra_info)
+
+    def _parse_with_llamaparse(self, bytes: bytes, extra_info: dict) -> str:
+        """Parse a document with LlamaParse, reusing cached results when available."""
+        content_hash = None
+        if self.parse_cache is not None:
+            content_hash = hash_bytes(bytes)
+            content = self.parse_cache.get(content_hash)
+            if content is not None:
+                return content
+
         documents = self.parser.load_data(bytes, extra_info=extra_info)
         content = "".join([doc.text for doc in documents])
+
+        if self.parse_cache is not None:
+            self.parse_cache.put(content_hash, content)
         return content
         
+    def iter_pages(self, bytes: bytes, extra_info: dict) -> Iterator[str]:
+        """Parse a document into an iterator of page texts without joining them."""
+        local_parser = self.parser_registry.resolve(
+            extra_info.get("file_name"), extra_info.get("mime_type")
+        )
+        if local_parser is not None:
+            pages = local_parser.iter_pages(bytes)
+            if pages is not None:
+                return pages
+
+        content_hash = None
+        if self.parse_cache is not None:
+            content_hash = hash_bytes(bytes)
+            content = self.parse_cache.get(content_hash)
+            if content is not None:
+                return iter([content])
+        pages = [doc.text for doc in self.parser.load_data(bytes, extra_info=extra_info)]
+
+        if self.parse_cache is not None:
+            self.parse_cache.put(content_hash, "".join(pages))
+        return iter(pages)
+
+    def iter_chunk_windows(self, pages: Iterable[str]) -> Iterator[Tuple[int, List[str]]]:
+        """Chunk a stream of pages, yielding (index of first chunk, chunks) windows.
+
+        Only a bounded buffer of text and at most one window of chunks is held at
+        a time. The last chunk of each buffer may be cut short by the buffer end,
+        so its text is carried over and re-split together with the next pages.
+        """
+        buffer = ""
+        pending: List[str] = []
+        next_index = 0
+        for page in pages:
+            buffer += page
+            if len(buffer) < self.stream_buffer_chars:
+                continue
+            offsets = self._split_offsets(buffer)
+            if len(offsets) > 1:
+                pending.extend(buffer[start:end] for start, end in offsets[:-1])
+                buffer = buffer[offsets[-1][0]:]
+            while len(pending) >= self.stream_window_chunks:
+                yield next_index, pending[:self.stream_window_chunks]
+                next_index += self.stream_window_chunks
+                pending = pending[self.stream_window_chunks:]
+
+        if buffer.strip():
+            pending.extend(self._create_chunks(buffer))
+        for start in range(0, len(pending), self.stream_window_chunks):
+            yield next_index + start, pending[start:start + self.stream_window_chunks]
+
     def process_document(self, content: str) -> List[Dict]:
         """Process document content into chunks and generate embeddings."""
-        chunks = self._create_chunks(content)
-        embeddings = self._generate_embeddings(chunks)
-        
-        return [{
-            'content': chunk,
-            'embedding': embedding.tolist(),
-            'metadata': {'chunk_id': i}
-        } for i, (chunk, embedding) in enumerate(zip(chunks, embeddings))]
+        chunks = self.chunk_document(content)
+        return self.embed_chunks(chunks).to_records()
+
+    def chunk_document(self, content: str) -> List[str]:
+        """Split parsed document content into chunks."""
+        return self._create_chunks(content)
+
+    def embed_chunks(
+        self,
+        chunks: List[str],
+        start_index: int = 0,
+        chunk_ids: Optional[Sequence[int]] = None,
+        doc_id: Optional[str] = None
+    ) -> ChunkBatch:
+        """Generate embeddings for chunks and return them as a columnar batch.
+
+        Chunks are numbered from ``start_index`` unless explicit ``chunk_ids``
+        are given. With a ``doc_id`` the batch also carries the document id and
+        content hash of every chunk.
+        """
+        if not chunks:
+            return ChunkBatch.empty()
+        embeddings = self.embed_texts(chunks)
+        if chunk_ids is None:
+            chunk_ids = np.arange(start_index, start_index + len(chunks), dtype=np.int64)
+        metadata = {}
+        if doc_id is not None:
+            metadata = {
+                'doc_id': np.full(len(chunks), doc_id, dtype=object),
+                'chunk_hash': np.array([hash_text(chunk) for chunk in chunks], dtype=object)
+            }
+        return ChunkBatch(contents=chunks, embeddings=embeddings, chunk_ids=chunk_ids, metadata=metadata)
     
     def _create_chunks(self, content: str) -> List[str]:
         """Split content into overlapping chunks."""
-        texts = self.text_splitter.create_documents([content])
-        return [text.page_content for text in texts]
+        return [content[start:end] for start, end in self._split_offsets(content)]
+
+    def _split_offsets(self, content: str) -> List[Tuple[int, int]]:
+        """Split content into chunks, returned as (start, end) offsets."""
+        if self.chunker is not None:
+            return self.chunker.split_offsets(content)
+        documents = self.text_splitter.create_documents([content])
+        return [
+            (doc.metadata['start_index'], doc.metadata['start_index'] + len(doc.page_content))
+            for doc in documents
+        ]
     
+    def embed_texts(self, chunks: List[str]) -> np.ndarray:
+        """Embed texts through the cache, batcher and backend in use, as a float32 matrix."""
+        return self._generate_embeddings(chunks)
+
     def _generate_embeddings(self, chunks: List[str]):
         """Generate embeddings for text chunks."""
-        return self.embedding_model.encode(chunks)
\ No newline at end of file
+        if self.embedding_cache is None:
+            return self._embed_uncached(chunks)
+
+        embeddings = self.embedding_cache.get_many(chunks)
+        missing = {}
+        for i, embedding in enumerate(embeddings):
+            if embedding is None:
+                missing.setdefault(EmbeddingCache.text_hash(chunks[i]), []).append(i)
+
+        if missing:
+            # Encode each distinct missing chunk once, even if repeated in the document
+            texts = [chunks[indices[0]] for indices in missing.values()]
+            new_embeddings = self._embed_uncached(texts)
+            self.embedding_cache.put_many(texts, new_embeddings)
+            for indices, embedding in zip(missing.values(), new_embeddings):
+                for i in indices:
+                    embeddings[i] = embedding
+
+        if not embeddings:
+            return np.empty((0, 0), dtype=np.float32)
+        return np.vstack(embeddings).astype(np.float32, copy=False)
+
+    def _embed_uncached(self, chunks: List[str]):
+        """Generate embeddings with the model, through the batcher if enabled."""
+        if self.embedding_batcher is not None:
+            return self.embedding_batcher.embed(chunks)
+        return self._encode(chunks)
+
+    def _encode(self, chunks: List[str]):
+        """Run the embedding model on a list of texts."""
+        if self.embedding_pool is not None:
+            return self.embedding_pool.encode(chunks)
+        return self.embedding_model.encode(chunks)
+
+    def close(self) -> None:
+        """Release background resources held by the processor."""
+        if self.embedding_batcher is not None:
+            self.embedding_batcher.stop()
+        if self.embedding_pool is not None:
+            self.embedding_pool.close()
+        if self.embedding_cache is not None:
+            self.embedding_cache.close()
\ No newline at end of file
@@ -0,0 +1,141 @@
+import logging
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from typing import Callable, List, Optional
+
+import numpy as np
+
+from ..monitoring.metrics import embedding_batch_size
+
+
+class _EmbeddingRequest:
+    """Chunks submitted by one document, filled in as batches complete."""
+    def __init__(self, texts: List[str]):
+        self.texts = texts
+        self.future: Future = Future()
+        self.next_index = 0  # first text not yet assigned to a batch
+        self.parts = {}  # start index -> embeddings for texts[start:start + n]
+        self.received = 0
+
+    def add_part(self, start: int, embeddings: np.ndarray) -> None:
+        """Store embeddings for a slice and resolve the future once complete."""
+        self.parts[start] = embeddings
+        self.received += len(embeddings)
+        if self.received == len(self.texts) and not self.future.done():
+            ordered = [self.parts[key] for key in sorted(self.parts)]
+            self.future.set_result(np.concatenate(ordered, axis=0))
+
+
+class EmbeddingBatcher:
+    """Collects chunks from many in-flight documents into fixed-size encode batches.
+
+    Callers submit the chunks of one document and get back a future with the
+    embeddings in the same order. A background thread packs pending chunks into
+    batches of at most ``max_batch_size`` texts, waiting up to ``max_wait_time``
+    seconds for a batch to fill before encoding a partial one. Small documents
+    therefore share batches, and large documents are split across several.
+    """
+    def __init__(
+        self,
+        encode_fn: Callable[[List[str]], np.ndarray],
+        max_batch_size: int = 64,
+        max_wait_time: float = 0.02,
+    ):
+        self.encode_fn = encode_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait_time = max_wait_time
+        self.logger = logging.getLogger(__name__)
+
+        self._pending = deque()
+        self._condition = threading.Condition()
+        self._stopped = False
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        """Start the background batching thread."""
+        if self._thread is not None:
+            return
+        self._stopped = False
+        self._thread = threading.Thread(target=self._run, name="embedding-batcher", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the batching thread after encoding already submitted chunks."""
+        with self._condition:
+            self._stopped = True
+            self._condition.notify_all()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def submit(self, texts: List[str]) -> Future:
+        """Submit the chunks of one document for embedding."""
+        request = _EmbeddingRequest(list(texts))
+        if not request.texts:
+            request.future.set_result(np.empty((0, 0), dtype=np.float32))
+            return request.future
+        with self._condition:
+            if self._stopped or self._thread is None:
+                raise RuntimeError("Embedding batcher is not running")
+            self._pending.append(request)
+            self._condition.notify()
+        return request.future
+
+    def embed(self, texts: List[str], timeout: Optional[float] = None) -> np.ndarray:
+        """Submit chunks and wait for their embeddings."""
+        return self.submit(texts).result(timeout=timeout)
+
+    def _collect_batch(self):
+        """Wait for pending chunks and take up to one batch worth of them."""
+        with self._condition:
+            while not self._pending and not self._stopped:
+                self._condition.wait()
+            if not self._pending:
+                return [], []
+
+            deadline = time.monotonic() + self.max_wait_time
+            texts = []
+            slices = []  # (request, start index in request, count)
+            while len(texts) < self.max_batch_size:
+                if self._pending:
+                    request = self._pending[0]
+                    start = request.next_index
+                    count = min(self.max_batch_size - len(texts), len(request.texts) - start)
+                    texts.extend(request.texts[start:start + count])
+                    slices.append((request, start, count))
+                    request.next_index += count
+                    if request.next_index == len(request.texts):
+                        self._pending.popleft()
+                    continue
+
+                # Batch is not full yet; wait briefly for more documents to arrive
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or self._stopped:
+                    break
+                self._condition.wait(remaining)
+            return texts, slices
+
+    def _run(self) -> None:
+        """Batching loop running in the background thread."""
+        while True:
+            texts, slices = self._collect_batch()
+            if not texts:
+                return
+
+            embedding_batch_size.observe(len(texts))
+            try:
+                embeddings = np.asarray(self.encode_fn(texts))
+            except Exception as e:
+                self.logger.error(f"Error encoding batch of {len(texts)} chunks: {str(e)}")
+                for request, _, _ in slices:
+                    if not request.future.done():
+                        request.future.set_exception(e)
+                continue
+
+            offset = 0
+            for request, start, count in slices:
+                if not request.future.done():
+                    request.add_part(start, embeddings[offset:offset + count])
+                offset += count
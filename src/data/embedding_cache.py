@@ -0,0 +1,137 @@
+import os
+import sqlite3
+import threading
+import time
+import logging
+import hashlib
+from typing import List, Optional
+
+import numpy as np
+
+from ..monitoring.metrics import embedding_cache_requests
+
+
+def normalize_chunk_text(text: str) -> str:
+    """Normalize chunk text so copies differing only in whitespace share a cache entry."""
+    return " ".join(text.split())
+
+
+class EmbeddingCache:
+    """On-disk cache of chunk embeddings keyed by model name and chunk text hash.
+
+    Vectors are stored as float32 blobs in SQLite. When the number of entries
+    exceeds ``max_entries`` the least recently used ones are evicted.
+    """
+    def __init__(self, db_path: str, model_name: str, max_entries: int = 500000):
+        self.db_path = db_path
+        self.model_name = model_name
+        self.max_entries = max_entries
+        self.logger = logging.getLogger(__name__)
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS chunk_embeddings (
+                model_name TEXT NOT NULL,
+                text_hash TEXT NOT NULL,
+                embedding BLOB NOT NULL,
+                last_access REAL NOT NULL,
+                PRIMARY KEY (model_name, text_hash)
+            );
+            CREATE INDEX IF NOT EXISTS idx_chunk_embeddings_last_access
+                ON chunk_embeddings (last_access);
+        """)
+        self._conn.commit()
+        self._entries = self._conn.execute("SELECT COUNT(*) FROM chunk_embeddings").fetchone()[0]
+
+    @staticmethod
+    def text_hash(text: str) -> str:
+        """Hash of the normalized chunk text."""
+        return hashlib.sha256(normalize_chunk_text(text).encode('utf-8')).hexdigest()
+
+    def get_many(self, texts: List[str]) -> List[Optional[np.ndarray]]:
+        """Look up embeddings for texts, returning None for texts not in the cache."""
+        hashes = [self.text_hash(text) for text in texts]
+        found = {}
+        unique_hashes = list(set(hashes))
+        with self._lock:
+            # Stay well below SQLite's bound parameter limit
+            for start in range(0, len(unique_hashes), 500):
+                batch = unique_hashes[start:start + 500]
+                placeholders = ",".join("?" * len(batch))
+                rows = self._conn.execute(
+                    f"SELECT text_hash, embedding FROM chunk_embeddings "
+                    f"WHERE model_name = ? AND text_hash IN ({placeholders})",
+                    [self.model_name, *batch]
+                ).fetchall()
+                found.update((text_hash, np.frombuffer(blob, dtype=np.float32)) for text_hash, blob in rows)
+
+            if found:
+                now = time.time()
+                self._conn.executemany(
+                    "UPDATE chunk_embeddings SET last_access = ? WHERE model_name = ? AND text_hash = ?",
+                    [(now, self.model_name, text_hash) for text_hash in found]
+                )
+                self._conn.commit()
+
+            results = [found.get(text_hash) for text_hash in hashes]
+            hits = sum(1 for result in results if result is not None)
+            self.hits += hits
+            self.misses += len(results) - hits
+        embedding_cache_requests.labels(result="hit").inc(hits)
+        embedding_cache_requests.labels(result="miss").inc(len(results) - hits)
+        return results
+
+    def put_many(self, texts: List[str], embeddings) -> None:
+        """Store embeddings for texts."""
+        now = time.time()
+        rows = [
+            (self.model_name, self.text_hash(text), np.asarray(embedding, dtype=np.float32).tobytes(), now)
+            for text, embedding in zip(texts, embeddings)
+        ]
+        with self._lock:
+            before = self._conn.total_changes
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO chunk_embeddings (model_name, text_hash, embedding, last_access) "
+                "VALUES (?, ?, ?, ?)",
+                rows
+            )
+            self._entries += self._conn.total_changes - before
+            if self._entries > self.max_entries:
+                self._evict()
+            self._conn.commit()
+
+    def _evict(self) -> None:
+        """Evict least recently used entries down to 90% of the size limit."""
+        target = int(self.max_entries * 0.9)
+        to_remove = self._entries - target
+        self._conn.execute(
+            "DELETE FROM chunk_embeddings WHERE rowid IN "
+            "(SELECT rowid FROM chunk_embeddings ORDER BY last_access LIMIT ?)",
+            (to_remove,)
+        )
+        self._entries = target
+        self.logger.info(f"Evicted {to_remove} entries from embedding cache")
+
+    def stats(self) -> dict:
+        """Get cache hit/miss counters and size."""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+                "entries": self._entries,
+                "max_entries": self.max_entries
+            }
+
+    def close(self) -> None:
+        """Close the cache database."""
+        with self._lock:
+            self._conn.close()
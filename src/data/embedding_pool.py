@@ -0,0 +1,183 @@
+import logging
+import multiprocessing
+import os
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from multiprocessing import shared_memory
+from typing import Callable, List, Optional
+
+import numpy as np
+
+# Bytes per embedding value in the shared result buffers
+FLOAT_BYTES = np.dtype(np.float32).itemsize
+
+
+def _load_sentence_transformer(model_name: str):
+    from sentence_transformers import SentenceTransformer
+    return SentenceTransformer(model_name, device="cpu")
+
+
+def _worker_main(conn, model_name: str, num_threads: int, capacity: int,
+                 model_factory: Optional[Callable]) -> None:
+    """Worker process: load a model copy, then encode shards into shared memory."""
+    # Limit every thread pool the model may use before it is loaded
+    for variable in ("OMP_NUM_THREADS", "MKL_NUM_THREADS", "OPENBLAS_NUM_THREADS"):
+        os.environ[variable] = str(num_threads)
+    os.environ["TOKENIZERS_PARALLELISM"] = "false"
+    try:
+        import torch
+        torch.set_num_threads(num_threads)
+    except ImportError:
+        pass
+
+    shm = None
+    output = None
+    try:
+        model = (model_factory or _load_sentence_transformer)(model_name)
+        dimension = model.get_sentence_embedding_dimension()
+        conn.send(("ready", dimension))
+        shm = shared_memory.SharedMemory(name=conn.recv())
+        output = np.ndarray((capacity, dimension), dtype=np.float32, buffer=shm.buf)
+
+        while True:
+            texts = conn.recv()
+            if texts is None:
+                break
+            try:
+                embeddings = model.encode(texts, batch_size=len(texts))
+                output[:len(texts)] = embeddings
+                conn.send(("ok", len(texts)))
+            except Exception as e:
+                conn.send(("error", str(e)))
+    except Exception as e:
+        conn.send(("error", str(e)))
+    finally:
+        if shm is not None:
+            output = None
+            shm.close()
+        conn.close()
+
+
+class _Worker:
+    """Parent-side handle of a worker process and its shared result buffer."""
+    def __init__(self, process, conn, shm: shared_memory.SharedMemory, output: np.ndarray):
+        self.process = process
+        self.conn = conn
+        self.shm = shm
+        self.output = output
+
+
+class EmbeddingProcessPool:
+    """Encodes batches on a pool of worker processes, one model copy each.
+
+    A batch is cut into shards of at most ``shard_size`` texts that are
+    encoded in parallel, one per idle worker. Each worker is limited to
+    ``threads_per_worker`` torch/BLAS threads, so the pool does not
+    oversubscribe the cores the way many threads in one process contend for
+    torch's intra-op pool. Texts are sent to the workers over a pipe; the
+    embeddings are written into a shared memory buffer per worker and
+    copied out by the parent, so results are never pickled.
+    """
+    def __init__(
+        self,
+        model_name: str,
+        num_workers: Optional[int] = None,
+        threads_per_worker: Optional[int] = None,
+        shard_size: int = 32,
+        model_factory: Optional[Callable] = None,
+        start_timeout: float = 300.0
+    ):
+        cpu_count = os.cpu_count() or 1
+        self.model_name = model_name
+        self.num_workers = num_workers or cpu_count
+        self.threads_per_worker = threads_per_worker or max(1, cpu_count // self.num_workers)
+        self.shard_size = shard_size
+        self.model_factory = model_factory
+        self.start_timeout = start_timeout
+        self.dimension: Optional[int] = None
+        self.logger = logging.getLogger(__name__)
+
+        self._workers: List[_Worker] = []
+        self._idle: "queue.Queue[_Worker]" = queue.Queue()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    def start(self) -> None:
+        """Start the worker processes and wait until every model is loaded."""
+        context = multiprocessing.get_context("spawn")
+        pending = []
+        for i in range(self.num_workers):
+            parent_conn, child_conn = context.Pipe()
+            process = context.Process(
+                target=_worker_main,
+                args=(child_conn, self.model_name, self.threads_per_worker, self.shard_size, self.model_factory),
+                name=f"embedding-worker-{i}",
+                daemon=True
+            )
+            process.start()
+            child_conn.close()
+            pending.append((process, parent_conn))
+
+        for process, conn in pending:
+            status, value = conn.recv() if conn.poll(self.start_timeout) else ("error", "timed out")
+            if status != "ready":
+                for other, _ in pending:
+                    other.terminate()
+                self.close()
+                raise RuntimeError(f"Embedding worker {process.name} failed to load the model: {value}")
+            self.dimension = value
+            shm = shared_memory.SharedMemory(create=True, size=self.shard_size * value * FLOAT_BYTES)
+            conn.send(shm.name)
+            worker = _Worker(process, conn, shm, np.ndarray((self.shard_size, value), dtype=np.float32, buffer=shm.buf))
+            self._workers.append(worker)
+            self._idle.put(worker)
+
+        self._executor = ThreadPoolExecutor(max_workers=self.num_workers, thread_name_prefix="embedding-pool")
+        self.logger.info(
+            f"Started {self.num_workers} embedding workers with {self.threads_per_worker} threads each"
+        )
+
+    def encode(self, texts: List[str]) -> np.ndarray:
+        """Embed texts in order, sharding them across the workers."""
+        if self._executor is None:
+            raise RuntimeError("Embedding pool is not started")
+        result = np.empty((len(texts), self.dimension), dtype=np.float32)
+        shards = [(start, texts[start:start + self.shard_size]) for start in range(0, len(texts), self.shard_size)]
+        for future in [self._executor.submit(self._encode_shard, shard, result, start) for start, shard in shards]:
+            future.result()
+        return result
+
+    def _encode_shard(self, texts: List[str], result: np.ndarray, start: int) -> None:
+        """Encode one shard on an idle worker and copy it into the result."""
+        worker = self._idle.get()
+        try:
+            worker.conn.send(texts)
+            status, value = worker.conn.recv()
+            if status != "ok":
+                raise RuntimeError(f"Embedding worker {worker.process.name} failed: {value}")
+            result[start:start + value] = worker.output[:value]
+        finally:
+            self._idle.put(worker)
+
+    def close(self) -> None:
+        """Stop the worker processes and release the shared buffers."""
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=True)
+                self._executor = None
+            for worker in self._workers:
+                try:
+                    worker.conn.send(None)
+                except (OSError, ValueError):
+                    pass
+            for worker in self._workers:
+                worker.process.join(timeout=10)
+                if worker.process.is_alive():
+                    worker.process.terminate()
+                worker.conn.close()
+                worker.output = None
+                worker.shm.close()
+                worker.shm.unlink()
+            self._workers = []
+            self._idle = queue.Queue()
@@ -0,0 +1,85 @@
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from .onnx_embedding import load_onnx_model, prepare_onnx_model
+
+logger = logging.getLogger(__name__)
+
+
+def _load_sentence_transformer(model_name: str, device: Optional[str] = None):
+    from sentence_transformers import SentenceTransformer
+    return SentenceTransformer(model_name, device=device)
+
+
+class EmbeddingModelRegistry:
+    """Process-wide cache of loaded embedding models.
+
+    Each (model, backend, device) combination is loaded on first use and then
+    shared by every component of the process, e.g. the document processor and
+    the retriever, instead of each holding its own copy of the weights.
+    Different models load concurrently; callers asking for a model that is
+    being loaded wait for that load instead of starting another.
+    """
+    def __init__(self):
+        self._models: Dict[Tuple[str, str, Optional[str]], Any] = {}
+        self._loading: Dict[Tuple[str, str, Optional[str]], threading.Lock] = {}
+        self._lock = threading.Lock()
+
+    def get(self, model_name: str, backend: str, device: Optional[str], loader: Callable[[], Any]) -> Any:
+        """Return the shared model for a key, calling ``loader`` if it is not loaded yet."""
+        key = (model_name, backend, device)
+        with self._lock:
+            if key in self._models:
+                return self._models[key]
+            key_lock = self._loading.setdefault(key, threading.Lock())
+
+        with key_lock:
+            with self._lock:
+                if key in self._models:
+                    return self._models[key]
+            start_time = time.time()
+            model = loader()
+            with self._lock:
+                self._models[key] = model
+                self._loading.pop(key, None)
+        logger.info(f"Loaded embedding model {model_name} ({backend}, {device or 'auto'}) in {time.time() - start_time:.1f}s")
+        return model
+
+    def clear(self) -> None:
+        """Forget all loaded models, e.g. between tests."""
+        with self._lock:
+            self._models.clear()
+
+
+# The registry shared by everything in this process
+embedding_registry = EmbeddingModelRegistry()
+
+
+def get_embedding_model(
+    embedding_config: dict,
+    device: Optional[str] = None,
+    loader: Optional[Callable[[], Any]] = None
+):
+    """Shared SentenceTransformer for an ``embedding_model`` config section.
+
+    With the ``onnx`` backend this is the validated ONNX export, otherwise
+    the torch model on ``device`` (chosen automatically if None), loaded by
+    ``loader`` if one is given. Process-pool workers load their own copies;
+    the parent loads one only if it needs the tokenizer.
+    """
+    model_name = embedding_config['model_name']
+    if embedding_config.get('backend', 'local') == 'onnx':
+        onnx_config = embedding_config.get('onnx', {})
+        quantization = onnx_config.get('quantization')
+        return embedding_registry.get(
+            model_name,
+            f"onnx-qint8_{quantization}" if quantization else "onnx-fp32",
+            "cpu",
+            lambda: load_onnx_model(*prepare_onnx_model(embedding_config), num_threads=onnx_config.get('threads'))
+        )
+    return embedding_registry.get(
+        model_name, "torch", device,
+        loader or (lambda: _load_sentence_transformer(model_name, device=device))
+    )
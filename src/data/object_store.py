@@ -1,20 +1,72 @@
 from minio import Minio
+from minio.error import S3Error
+import urllib3
 import yaml
+import io
 import os
-from typing import BinaryIO
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import BinaryIO, Callable, Iterable, Iterator, List, Optional, Tuple, Union
 import logging
 
+from ..monitoring.metrics import object_store_transfer_time
+
+MiB = 1024 * 1024
+
+@dataclass
+class TransferResult:
+    """Outcome of one object in a bulk transfer."""
+    object_name: str
+    success: bool
+    size: int = 0
+    seconds: float = 0.0
+    path: Optional[str] = None
+    data: Optional[bytes] = None
+    metadata: Optional[dict] = None
+    error: Optional[str] = None
+
+def _user_metadata(headers) -> dict:
+    """User metadata of an object from its response headers, keyed without the x-amz-meta- prefix."""
+    prefix = "x-amz-meta-"
+    return {
+        key.lower()[len(prefix):]: value
+        for key, value in (headers or {}).items()
+        if key.lower().startswith(prefix)
+    }
+
 class ObjectStore:
     def __init__(self, config_path: str):
         with open(config_path, 'r') as f:
             self.config = yaml.safe_load(f)
-        
+
+        # Bulk transfers share one connection pool sized for the transfer workers
+        transfer_config = self.config['minio'].get('transfer', {})
+        self.max_workers = transfer_config.get('max_workers', 16)
+        self.part_size = transfer_config.get('part_size_mb', 16) * MiB
+        self.num_parallel_uploads = transfer_config.get('num_parallel_uploads', 4)
+        self.multipart_download_threshold = transfer_config.get('multipart_download_threshold_mb', 64) * MiB
+        http_client = urllib3.PoolManager(
+            timeout=urllib3.Timeout(
+                connect=transfer_config.get('connect_timeout_seconds', 10),
+                read=transfer_config.get('read_timeout_seconds', 300)
+            ),
+            maxsize=transfer_config.get('max_pool_connections', 64),
+            block=True,
+            retries=urllib3.Retry(total=5, backoff_factor=0.2, status_forcelist=[500, 502, 503, 504])
+        )
+
         self.client = Minio(
             endpoint=os.environ["MINIO_ADDRESS"],
             access_key=self.config['minio']['access_key'],
             secret_key=self.config['minio']['secret_key'],
-            secure=self.config['minio']['secure']
+            secure=self.config['minio']['secure'],
+            http_client=http_client
         )
+        self._executor = None
+        self._part_executor = None
+        self._executor_lock = threading.Lock()
         
         self.bucket_name = self.config['minio']['bucket_name']
         self._ensure_bucket_exists()
@@ -25,18 +77,65 @@ class ObjectStore:
         if not self.client.bucket_exists(self.bucket_name):
             self.client.make_bucket(self.bucket_name)
             
-    def upload_file(self, file_path: str, object_name: str = None):
-        """Upload a file to MinIO."""
+    def upload_file(self, file_path: str, object_name: str = None,
+                    content_type: str = "application/octet-stream", metadata: Optional[dict] = None):
+        """Upload a file to MinIO, streaming it from disk, with optional user metadata."""
         if object_name is None:
             object_name = os.path.basename(file_path)
             
+        # Files larger than one part are sent as a parallel multipart upload
         self.client.fput_object(
             self.bucket_name,
             object_name,
-            file_path
+            file_path,
+            content_type=content_type,
+            metadata=metadata,
+            part_size=self.part_size,
+            num_parallel_uploads=self.num_parallel_uploads
         )
         return object_name
         
+    def put_bytes(self, data: Union[bytes, bytearray, memoryview], object_name: str,
+                  content_type: str = "application/octet-stream", metadata: Optional[dict] = None):
+        """Upload an in-memory buffer to MinIO."""
+        return self.put_stream(
+            io.BytesIO(data), object_name, length=len(data), content_type=content_type, metadata=metadata
+        )
+
+    def put_stream(self, stream: BinaryIO, object_name: str, length: int = -1,
+                   content_type: str = "application/octet-stream", metadata: Optional[dict] = None):
+        """Stream an object to MinIO, in parts if it is large or its length is unknown."""
+        self.client.put_object(
+            self.bucket_name,
+            object_name,
+            stream,
+            length=length,
+            content_type=content_type,
+            metadata=metadata,
+            part_size=self.part_size,
+            num_parallel_uploads=self.num_parallel_uploads
+        )
+        return object_name
+
+    def get_bytes(self, object_name: str) -> Optional[bytes]:
+        """Download an object into memory, returning None if it does not exist."""
+        try:
+            response = self.client.get_object(self.bucket_name, object_name)
+        except S3Error as e:
+            if e.code == "NoSuchKey":
+                return None
+            raise
+        try:
+            return response.read()
+        finally:
+            response.close()
+            response.release_conn()
+
+    def list_objects(self, prefix: Optional[str] = None) -> Iterator[str]:
+        """Names of the objects in the bucket, optionally only those under a prefix."""
+        for obj in self.client.list_objects(self.bucket_name, prefix=prefix, recursive=True):
+            yield obj.object_name
+
     def download_file(self, object_name: str, file_path: str):
         """Download a file from MinIO."""
         self.client.fget_object(
@@ -45,6 +144,121 @@ class ObjectStore:
             file_path
         )
         
+    def upload_many(self, files: Iterable[Tuple[str, Optional[str]]]) -> List[TransferResult]:
+        """Upload (file path, object name) pairs in parallel, one result per file."""
+        def upload(item):
+            file_path, object_name = item
+            object_name = object_name or os.path.basename(file_path)
+            self.upload_file(file_path, object_name)
+            return TransferResult(object_name, True, size=os.path.getsize(file_path), path=file_path)
+        return self._run_bulk("upload", files, upload, lambda item: item[1] or os.path.basename(item[0]))
+
+    def put_many(self, objects: Iterable[Tuple[bytes, str]]) -> List[TransferResult]:
+        """Upload (buffer, object name) pairs in parallel, one result per object."""
+        def put(item):
+            data, object_name = item
+            self.put_bytes(data, object_name)
+            return TransferResult(object_name, True, size=len(data))
+        return self._run_bulk("put", objects, put, lambda item: item[1])
+
+    def download_many(self, objects: Iterable[Tuple[str, str]]) -> List[TransferResult]:
+        """Download (object name, file path) pairs in parallel, one result per object.
+
+        Objects above the multipart threshold are fetched as parallel byte ranges.
+        Each result carries the user metadata the object was stored with.
+        """
+        def download(item):
+            object_name, file_path = item
+            size, metadata = self._download_object(object_name, file_path)
+            return TransferResult(object_name, True, size=size, path=file_path, metadata=metadata)
+        return self._run_bulk("download", objects, download, lambda item: item[0])
+
+    def get_many(self, object_names: Iterable[str]) -> List[TransferResult]:
+        """Fetch objects into memory in parallel; missing objects succeed with no data."""
+        def get(object_name):
+            data = self.get_bytes(object_name)
+            return TransferResult(object_name, True, size=len(data) if data is not None else 0, data=data)
+        return self._run_bulk("get", object_names, get, lambda object_name: object_name)
+
+    def close(self):
+        """Shut down the bulk transfer thread pools."""
+        with self._executor_lock:
+            for executor in (self._executor, self._part_executor):
+                if executor is not None:
+                    executor.shutdown(wait=True)
+            self._executor = None
+            self._part_executor = None
+
+    def _run_bulk(self, operation: str, items: Iterable, transfer: Callable, name_of: Callable) -> List[TransferResult]:
+        """Run a transfer for every item on the shared pool, collecting results in order."""
+        def run(item):
+            start_time = time.time()
+            try:
+                result = transfer(item)
+            except Exception as e:
+                logging.error(f"Failed to {operation} object {name_of(item)}: {str(e)}")
+                result = TransferResult(name_of(item), False, error=str(e))
+            result.seconds = time.time() - start_time
+            object_store_transfer_time.labels(operation=operation).observe(result.seconds)
+            return result
+
+        executor = self._get_executor()
+        return list(executor.map(run, items))
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="object-store")
+            return self._executor
+
+    def _get_part_executor(self) -> ThreadPoolExecutor:
+        # Separate from the bulk pool so a download never waits on its own pool
+        with self._executor_lock:
+            if self._part_executor is None:
+                self._part_executor = ThreadPoolExecutor(
+                    max_workers=self.num_parallel_uploads, thread_name_prefix="object-store-part"
+                )
+            return self._part_executor
+
+    def _download_object(self, object_name: str, file_path: str) -> Tuple[int, dict]:
+        """Download an object to a file, in parallel byte ranges if it is large.
+
+        Returns the size and user metadata of the object.
+        """
+        stat = self.client.stat_object(self.bucket_name, object_name)
+        size, metadata = stat.size, _user_metadata(stat.metadata)
+        directory = os.path.dirname(file_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        if size < self.multipart_download_threshold:
+            self.client.fget_object(self.bucket_name, object_name, file_path)
+            return size, metadata
+
+        tmp_path = f"{file_path}.part"
+        with open(tmp_path, 'wb') as f:
+            f.truncate(size)
+
+        def download_range(offset):
+            length = min(self.part_size, size - offset)
+            response = self.client.get_object(self.bucket_name, object_name, offset=offset, length=length)
+            try:
+                with open(tmp_path, 'r+b') as f:
+                    f.seek(offset)
+                    for block in response.stream(MiB):
+                        f.write(block)
+            finally:
+                response.close()
+                response.release_conn()
+
+        try:
+            list(self._get_part_executor().map(download_range, range(0, size, self.part_size)))
+            os.replace(tmp_path, file_path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        return size, metadata
+
     def get_file_url(self, object_name: str, expires=3600):
         """Get a presigned URL for temporary access."""
         return self.client.presigned_get_object(
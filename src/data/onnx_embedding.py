@@ -0,0 +1,135 @@
+import json
+import logging
+import os
+import shutil
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+# Written next to a validated export; exports without it are built again
+BUILD_INFO_FILE = "build_info.json"
+
+# Texts embedded by both the torch model and the export to measure drift
+VALIDATION_TEXTS = [
+    "What is the role of Jensen's inequality in variational inference?",
+    "The pipeline archives the original document before it is parsed and embedded.",
+    "Milvus stores one float vector per chunk together with its document id.",
+    "Retrieval augmented generation grounds answers in retrieved passages.",
+    "Quarterly revenue grew by 12% while operating costs stayed flat.",
+    "def chunk(text, size):\n    return [text[i:i + size] for i in range(0, len(text), size)]",
+    "| Model | Parameters | Dimension |\n|---|---|---|\n| all-MiniLM-L6-v2 | 22M | 384 |",
+    "Le modèle est exporté au format ONNX puis quantifié en int8.",
+    "short",
+    "The embedding throughput of the ingestion workers limits how fast new documents "
+    "become searchable, so the model runs on every CPU core available on the node, "
+    "and long inputs like this one are truncated to the model's maximum sequence length "
+    "before they are encoded into a single normalized vector. " * 4,
+]
+
+logger = logging.getLogger(__name__)
+
+
+def onnx_file_name(quantization: Optional[str] = None) -> str:
+    """File name of an export inside its model directory."""
+    return f"onnx/model_qint8_{quantization}.onnx" if quantization else "onnx/model.onnx"
+
+
+def cosine_similarities(reference: np.ndarray, candidate: np.ndarray) -> np.ndarray:
+    """Row-wise cosine similarity of two embedding matrices."""
+    reference = np.asarray(reference, dtype=np.float32)
+    candidate = np.asarray(candidate, dtype=np.float32)
+    norms = np.linalg.norm(reference, axis=1) * np.linalg.norm(candidate, axis=1)
+    return np.sum(reference * candidate, axis=1) / np.maximum(norms, 1e-12)
+
+
+def load_onnx_model(model_dir: str, file_name: str, num_threads: Optional[int] = None):
+    """Load an export as a SentenceTransformer running on ONNX Runtime."""
+    from sentence_transformers import SentenceTransformer
+    model_kwargs = {"file_name": file_name, "provider": "CPUExecutionProvider"}
+    if num_threads:
+        import onnxruntime
+        session_options = onnxruntime.SessionOptions()
+        session_options.intra_op_num_threads = num_threads
+        model_kwargs["session_options"] = session_options
+    return SentenceTransformer(model_dir, backend="onnx", device="cpu", model_kwargs=model_kwargs)
+
+
+def build_onnx_model(
+    model_name: str,
+    output_dir: str,
+    quantization: Optional[str] = None,
+    min_cosine: float = 0.99,
+    validation_texts: Optional[List[str]] = None
+) -> Dict:
+    """Export a model to ONNX, optionally with dynamic int8 quantization, and validate it.
+
+    ``quantization`` is an ONNX Runtime quantization config such as ``avx2``,
+    ``avx512``, ``avx512_vnni`` or ``arm64``. The export is kept only if every
+    validation text embeds within ``min_cosine`` of the torch model's output;
+    otherwise a ValueError is raised. Returns the build info.
+    """
+    from sentence_transformers import SentenceTransformer, export_dynamic_quantized_onnx_model
+
+    # Built next to the target and moved into place once validated
+    build_dir = f"{output_dir}.build-{os.getpid()}"
+    shutil.rmtree(build_dir, ignore_errors=True)
+    try:
+        model = SentenceTransformer(model_name, backend="onnx", device="cpu")
+        model.save_pretrained(build_dir)
+        if quantization:
+            export_dynamic_quantized_onnx_model(model, quantization, build_dir)
+        file_name = onnx_file_name(quantization)
+
+        texts = validation_texts or VALIDATION_TEXTS
+        reference = SentenceTransformer(model_name, device="cpu").encode(texts)
+        similarities = cosine_similarities(reference, load_onnx_model(build_dir, file_name).encode(texts))
+        info = {
+            "model_name": model_name,
+            "quantization": quantization,
+            "file_name": file_name,
+            "min_cosine": float(similarities.min()),
+            "mean_cosine": float(similarities.mean())
+        }
+        if info["min_cosine"] < min_cosine:
+            raise ValueError(
+                f"ONNX export of {model_name} ({quantization or 'fp32'}) drifts from the torch model: "
+                f"minimum cosine similarity {info['min_cosine']:.4f} < {min_cosine}"
+            )
+        with open(os.path.join(build_dir, BUILD_INFO_FILE), 'w') as f:
+            json.dump(info, f, indent=2)
+
+        shutil.rmtree(output_dir, ignore_errors=True)
+        os.makedirs(os.path.dirname(os.path.abspath(output_dir)), exist_ok=True)
+        os.rename(build_dir, output_dir)
+    finally:
+        shutil.rmtree(build_dir, ignore_errors=True)
+    logger.info(
+        f"Built ONNX model {output_dir}: min cosine {info['min_cosine']:.4f}, mean {info['mean_cosine']:.4f}"
+    )
+    return info
+
+
+def prepare_onnx_model(embedding_config: dict) -> Tuple[str, str]:
+    """Directory and file name of the validated export configured for the embedding model.
+
+    The export is built on first use and reused while the model name,
+    quantization and tolerance stay the same.
+    """
+    model_name = embedding_config['model_name']
+    onnx_config = embedding_config.get('onnx', {})
+    quantization = onnx_config.get('quantization')
+    min_cosine = onnx_config.get('min_cosine', 0.99)
+    model_dir = os.path.join(
+        onnx_config.get('path', 'state/onnx'),
+        f"{model_name.replace('/', '--')}-{f'qint8_{quantization}' if quantization else 'fp32'}"
+    )
+
+    info = None
+    info_path = os.path.join(model_dir, BUILD_INFO_FILE)
+    if os.path.exists(info_path):
+        with open(info_path, 'r') as f:
+            info = json.load(f)
+    if (info is None or info.get("model_name") != model_name
+            or info.get("quantization") != quantization or info.get("min_cosine", 0.0) < min_cosine):
+        info = build_onnx_model(model_name, model_dir, quantization=quantization, min_cosine=min_cosine)
+    return model_dir, info["file_name"]
@@ -0,0 +1,64 @@
+import logging
+import threading
+from typing import Optional
+
+from ..utils.hashing import hash_config
+from ..monitoring.metrics import parse_cache_requests
+
+
+class ParseCache:
+    """Caches parsed document text in the object store.
+
+    Entries are keyed by the content hash of the original file and a fingerprint
+    of the parser settings, so the same bytes are never sent to the parser twice
+    under the same settings, whatever their file name.
+    """
+    def __init__(self, object_store, parser_settings: dict, prefix: str = "parsed"):
+        self.object_store = object_store
+        self.settings_fingerprint = hash_config(parser_settings)
+        self.prefix = prefix.rstrip("/")
+        self.logger = logging.getLogger(__name__)
+
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def object_name(self, content_hash: str) -> str:
+        """Object name of the cached parse result for a file hash."""
+        return f"{self.prefix}/{content_hash}/{self.settings_fingerprint}.md"
+
+    def get(self, content_hash: str) -> Optional[str]:
+        """Get the cached parse result, or None on a miss."""
+        try:
+            data = self.object_store.get_bytes(self.object_name(content_hash))
+        except Exception as e:
+            self.logger.warning(f"Parse cache lookup failed for {content_hash}: {str(e)}")
+            data = None
+        with self._lock:
+            if data is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        parse_cache_requests.labels(result="miss" if data is None else "hit").inc()
+        return None if data is None else data.decode('utf-8')
+
+    def put(self, content_hash: str, content: str) -> None:
+        """Store a parse result. Failures are logged, since the cache is only an optimization."""
+        try:
+            self.object_store.put_bytes(
+                content.encode('utf-8'),
+                self.object_name(content_hash),
+                content_type="text/markdown; charset=utf-8"
+            )
+        except Exception as e:
+            self.logger.warning(f"Failed to store parse result for {content_hash}: {str(e)}")
+
+    def stats(self) -> dict:
+        """Get cache hit/miss counters."""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0
+            }
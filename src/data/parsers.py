@@ -0,0 +1,217 @@
+import io
+import os
+import re
+import logging
+import mimetypes
+from abc import ABC, abstractmethod
+from html.parser import HTMLParser
+from typing import Dict, Iterator, Optional
+
+# Route target for documents that should be sent to LlamaParse
+LLAMAPARSE = "llamaparse"
+
+DEFAULT_ROUTES = {
+    "txt": "text",
+    "text/plain": "text",
+    "md": "markdown",
+    "markdown": "markdown",
+    "text/markdown": "markdown",
+    "html": "html",
+    "htm": "html",
+    "text/html": "html",
+    "pdf": "pdf_text",
+    "application/pdf": "pdf_text",
+}
+
+
+class LocalParser(ABC):
+    """Base class for parsers that run in-process."""
+    name: str = ""
+
+    @abstractmethod
+    def parse(self, data: bytes) -> Optional[str]:
+        """Parse document bytes to text.
+
+        Returns None if the document should be handed to LlamaParse instead.
+        """
+        pass
+
+    def iter_pages(self, data: bytes) -> Optional[Iterator[str]]:
+        """Parse document bytes into an iterator of page texts.
+
+        Returns None if the document should be handed to LlamaParse instead.
+        """
+        content = self.parse(data)
+        return None if content is None else iter([content])
+
+    @property
+    def settings(self) -> dict:
+        """Settings that change the text this parser produces."""
+        return {}
+
+
+class PlainTextParser(LocalParser):
+    """Decodes plain text documents."""
+    name = "text"
+
+    def parse(self, data: bytes) -> Optional[str]:
+        return data.decode('utf-8', errors='replace')
+
+
+class MarkdownParser(PlainTextParser):
+    """Markdown is already in the format produced by LlamaParse."""
+    name = "markdown"
+
+
+class _HTMLTextExtractor(HTMLParser):
+    """Collects visible text from HTML, keeping headings and block boundaries."""
+    BLOCK_TAGS = {"p", "div", "br", "li", "tr", "section", "article", "table", "ul", "ol", "pre", "blockquote"}
+    SKIP_TAGS = {"script", "style", "head", "noscript", "template"}
+    HEADING_TAGS = {"h1": 1, "h2": 2, "h3": 3, "h4": 4, "h5": 5, "h6": 6}
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.parts = []
+        self._skip_depth = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in self.SKIP_TAGS:
+            self._skip_depth += 1
+        elif tag in self.HEADING_TAGS:
+            self.parts.append("\n\n" + "#" * self.HEADING_TAGS[tag] + " ")
+        elif tag in self.BLOCK_TAGS:
+            self.parts.append("\n")
+
+    def handle_endtag(self, tag):
+        if tag in self.SKIP_TAGS:
+            self._skip_depth = max(0, self._skip_depth - 1)
+        elif tag in self.HEADING_TAGS:
+            self.parts.append("\n\n")
+        elif tag in self.BLOCK_TAGS:
+            self.parts.append("\n")
+
+    def handle_data(self, data):
+        if not self._skip_depth:
+            self.parts.append(data)
+
+
+class HtmlParser(LocalParser):
+    """Extracts text from HTML with the standard library parser."""
+    name = "html"
+
+    def parse(self, data: bytes) -> Optional[str]:
+        extractor = _HTMLTextExtractor()
+        extractor.feed(data.decode('utf-8', errors='replace'))
+        extractor.close()
+        text = "".join(extractor.parts)
+        text = re.sub(r"[ \t]+", " ", text)
+        return re.sub(r"\n\s*\n\s*\n+", "\n\n", text).strip()
+
+
+class PdfTextParser(LocalParser):
+    """Extracts the text layer of PDFs with pypdf.
+
+    PDFs with little extractable text per page (scans, image-heavy or complex
+    layouts) are handed to LlamaParse instead.
+    """
+    name = "pdf_text"
+
+    # Number of leading pages used to judge whether the text layer is usable
+    SAMPLE_PAGES = 5
+
+    def __init__(self, min_chars_per_page: int = 200):
+        self.min_chars_per_page = min_chars_per_page
+        self.logger = logging.getLogger(__name__)
+
+    @property
+    def settings(self) -> dict:
+        return {"min_chars_per_page": self.min_chars_per_page}
+
+    def parse(self, data: bytes) -> Optional[str]:
+        pages = self.iter_pages(data)
+        return None if pages is None else "".join(pages)
+
+    def iter_pages(self, data: bytes) -> Optional[Iterator[str]]:
+        try:
+            from pypdf import PdfReader
+        except ImportError:
+            self.logger.warning("pypdf is not installed, sending PDF to LlamaParse")
+            return None
+
+        try:
+            reader = PdfReader(io.BytesIO(data))
+            num_pages = len(reader.pages)
+            sample = [reader.pages[i].extract_text() or "" for i in range(min(num_pages, self.SAMPLE_PAGES))]
+        except Exception as e:
+            self.logger.warning(f"Could not read PDF text layer: {str(e)}")
+            return None
+
+        if not sample or sum(len(page.strip()) for page in sample) / len(sample) < self.min_chars_per_page:
+            return None
+        return self._iter_remaining_pages(reader, sample)
+
+    @staticmethod
+    def _iter_remaining_pages(reader, sample) -> Iterator[str]:
+        """Yield the sampled pages, then extract the rest one page at a time."""
+        for page in sample:
+            yield page + "\n\n"
+        for i in range(len(sample), len(reader.pages)):
+            yield (reader.pages[i].extract_text() or "") + "\n\n"
+
+
+class ParserRegistry:
+    """Routes documents to a parser by file extension or MIME type.
+
+    Routes map an extension (without the dot) or a MIME type to the name of a
+    registered local parser, or to ``llamaparse``. Extensions take precedence
+    over MIME types; documents without a matching route use the default.
+    """
+    def __init__(self, routes: Optional[Dict[str, str]] = None, default: str = LLAMAPARSE):
+        self.routes = {key.lower(): value for key, value in (routes or {}).items()}
+        self.default = default
+        self.parsers: Dict[str, LocalParser] = {}
+
+    def register(self, parser: LocalParser) -> None:
+        """Register a local parser under its name."""
+        self.parsers[parser.name] = parser
+
+    def route(self, file_name: Optional[str] = None, mime_type: Optional[str] = None) -> str:
+        """Get the name of the parser a document should be routed to."""
+        if file_name:
+            extension = os.path.splitext(file_name)[1][1:].lower()
+            if extension in self.routes:
+                return self.routes[extension]
+            if mime_type is None:
+                mime_type = mimetypes.guess_type(file_name)[0]
+        if mime_type and mime_type.lower() in self.routes:
+            return self.routes[mime_type.lower()]
+        return self.default
+
+    def resolve(self, file_name: Optional[str] = None, mime_type: Optional[str] = None) -> Optional[LocalParser]:
+        """Get the local parser for a document, or None if it should go to LlamaParse."""
+        name = self.route(file_name, mime_type)
+        if name == LLAMAPARSE:
+            return None
+        if name not in self.parsers:
+            raise ValueError(f"Unknown parser '{name}' in parser routes")
+        return self.parsers[name]
+
+    @property
+    def settings(self) -> dict:
+        """Routes and parser settings that determine how documents are parsed."""
+        return {
+            "routes": self.routes,
+            "default": self.default,
+            "parsers": {name: parser.settings for name, parser in self.parsers.items()}
+        }
+
+
+def create_parser_registry(parser_config: dict) -> ParserRegistry:
+    """Create a registry with the built-in local parsers from configuration."""
+    routes = parser_config.get('routes', DEFAULT_ROUTES)
+    registry = ParserRegistry(routes=routes, default=parser_config.get('default', LLAMAPARSE))
+    registry.register(PlainTextParser())
+    registry.register(MarkdownParser())
+    registry.register(HtmlParser())
+    registry.register(PdfTextParser(min_chars_per_page=parser_config.get('pdf_min_chars_per_page', 200)))
+    return registry
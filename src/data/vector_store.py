@@ -1,15 +1,100 @@
 import os
+import threading
+import time
 import yaml
-from typing import List, Dict
+from typing import Any, Iterator, List, Dict, Optional, Sequence, Union
+import numpy as np
 from pymilvus import connections, Collection, FieldSchema, CollectionSchema, DataType, utility
 import logging
 
+from .chunk_batch import ChunkBatch
+from ..utils.hashing import hash_text
+
+# Scalar fields identifying the document and content of each chunk
+CHUNK_FIELDS = ("doc_id", "chunk_hash", "chunk_index")
+
+# Upper bound on rows Milvus returns from a single query
+QUERY_LIMIT = 16384
+
+# Chunk hashes are SHA-256 hex digests; large result sets are read in buckets by hash prefix
+HEX_DIGITS = "0123456789abcdef"
+HASH_LENGTH = 64
+
+# Upper bound on query vectors Milvus accepts in a single search
+SEARCH_BATCH_LIMIT = 16384
+
+# Connection the store, the reindexer and the retriever share
+CONNECTION_ALIAS = "default"
+
+DEFAULT_INDEX_PARAMS = {
+    "metric_type": "L2",
+    "index_type": "IVF_FLAT",
+    "params": {"nlist": 1024}
+}
+DEFAULT_SEARCH_PARAMS = {
+    "metric_type": "L2",
+    "params": {"nprobe": 10}
+}
+
+def _literal(value: Any) -> str:
+    """Milvus expression literal of a scalar value."""
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, (int, float, np.integer, np.floating)):
+        return str(value)
+    escaped = str(value).replace('\\', '\\\\').replace('"', '\\"')
+    return f'"{escaped}"'
+
+def _filter_expr(filters: Optional[Union[str, Dict[str, Any]]]) -> Optional[str]:
+    """Milvus boolean expression for search filters given as an expression or a field mapping."""
+    if not filters:
+        return None
+    if isinstance(filters, str):
+        return filters
+    clauses = []
+    for field, value in filters.items():
+        if isinstance(value, (list, tuple, set)):
+            clauses.append(f"{field} in [{', '.join(_literal(item) for item in value)}]")
+        else:
+            clauses.append(f"{field} == {_literal(value)}")
+    return " and ".join(clauses)
+
+def iter_query(collection: Collection, expr: Optional[str], output_fields: List[str],
+               prefix: str = "") -> Iterator[List[dict]]:
+    """Run a query in buckets of rows, splitting by chunk hash prefix when the query limit is hit.
+
+    Milvus returns at most ``QUERY_LIMIT`` rows per query, so a query that
+    hits the limit is repeated for each longer hash prefix until every
+    bucket fits.
+    """
+    bucket_expr = f'chunk_hash like "{prefix}%"' if prefix else None
+    rows = collection.query(
+        expr=" and ".join(clause for clause in (expr, bucket_expr) if clause),
+        output_fields=output_fields,
+        limit=QUERY_LIMIT
+    )
+    if len(rows) < QUERY_LIMIT or len(prefix) >= HASH_LENGTH:
+        yield rows
+        return
+    for digit in HEX_DIGITS:
+        yield from iter_query(collection, expr, output_fields, prefix + digit)
+
 class VectorStore:
-    def __init__(self, config_path: str):
+    def __init__(self, config_path: str, collection_name: Optional[str] = None):
         with open(config_path, 'r') as f:
             self.config = yaml.safe_load(f)
             
-        self.collection_name = self.config['vector_store']['collection_name']
+        # The configured name may be an alias that the reindexer switches between collection versions
+        self.collection_name = collection_name or self.config['vector_store']['collection_name']
+        self.dimension = self.config['embedding_model'].get('dimension', 384)
+        self.index_params = self.config['vector_store'].get('index', DEFAULT_INDEX_PARAMS)
+        self.search_params = self.config['vector_store'].get('search_params', DEFAULT_SEARCH_PARAMS)
+
+        # One collection handle is reused by every call and loaded once for search and query
+        connection_config = self.config['vector_store'].get('connection', {})
+        self.health_check_interval = connection_config.get('health_check_interval_seconds', 30)
+        self._collection = None
+        self._collection_lock = threading.Lock()
         self._connect()
         logging.info(f"Connected to Milvus")
         self._initialize_collection()
@@ -17,71 +102,228 @@ class VectorStore:
     def _connect(self):
         """Connect to vector database."""
         connections.connect(
+            alias=CONNECTION_ALIAS,
             host=os.environ["MILVUS_HOST"],
             port=os.environ["MILVUS_PORT"]
         )
+        self._last_health_check = time.monotonic()
+
+    def _check_connection(self):
+        """Reconnect if the connection is gone or the server stopped answering.
+
+        The server is pinged at most once per health check interval, so the
+        check adds no round trip to most calls.
+        """
+        now = time.monotonic()
+        connected = connections.has_connection(CONNECTION_ALIAS)
+        if connected and now - self._last_health_check < self.health_check_interval:
+            return
+        try:
+            if not connected:
+                raise ConnectionError("not connected")
+            utility.get_server_version(using=CONNECTION_ALIAS)
+            self._last_health_check = now
+        except Exception as e:
+            logging.warning(f"Milvus connection is unhealthy ({str(e)}), reconnecting")
+            try:
+                connections.disconnect(CONNECTION_ALIAS)
+            except Exception:
+                pass
+            self._connect()
+            with self._collection_lock:
+                # A restarted server may have released the collection
+                self._collection = None
+                self._loaded = False
+
+    def _get_collection(self, load: bool = False) -> Collection:
+        """Shared handle of the collection, loaded first if it is needed for search or query.
+
+        The handle refers to the collection by name, so when the name is an
+        alias a switch to another collection version applies to it as well.
+        """
+        self._check_connection()
+        with self._collection_lock:
+            if self._collection is None:
+                self._collection = Collection(self.collection_name)
+            if load and not self._loaded:
+                self._collection.load()
+                self._loaded = True
+            return self._collection
         
     def _initialize_collection(self):
         """Initialize vector collection if it doesn't exist."""
         # Use utility.has_collection() instead of Collection.list()
         if not utility.has_collection(self.collection_name):
-            fields = [
-                FieldSchema(name="id", dtype=DataType.INT64, is_primary=True, auto_id=True),
-                FieldSchema(name="content", dtype=DataType.VARCHAR, max_length=65535),
-                FieldSchema(name="embedding", dtype=DataType.FLOAT_VECTOR, dim=384)
-            ]
-            schema = CollectionSchema(fields=fields, description="Document chunks with embeddings")
-            Collection(name=self.collection_name, schema=schema)
-            
-            # Create index for vector field
-            index_params = {
-                "metric_type": "L2",
-                "index_type": "IVF_FLAT",
-                "params": {"nlist": 1024}
-            }
-            collection = Collection(self.collection_name)
-            collection.create_index(field_name="embedding", index_params=index_params)
+            self.create_collection(self.collection_name)
+
+        field_names = {field.name for field in Collection(self.collection_name).schema.fields}
+        self.has_chunk_fields = set(CHUNK_FIELDS) <= field_names
+        if not self.has_chunk_fields:
+            logging.warning(
+                f"Collection {self.collection_name} has no chunk identity fields, "
+                f"updated documents will be fully re-ingested"
+            )
+        self._loaded = False
+
+    def create_collection(self, name: str, dimension: Optional[int] = None) -> Collection:
+        """Create an empty chunk collection with the configured vector index."""
+        fields = [
+            FieldSchema(name="id", dtype=DataType.INT64, is_primary=True, auto_id=True),
+            FieldSchema(name="content", dtype=DataType.VARCHAR, max_length=65535),
+            FieldSchema(name="embedding", dtype=DataType.FLOAT_VECTOR, dim=dimension or self.dimension),
+            FieldSchema(name="doc_id", dtype=DataType.VARCHAR, max_length=1024),
+            FieldSchema(name="chunk_hash", dtype=DataType.VARCHAR, max_length=64),
+            FieldSchema(name="chunk_index", dtype=DataType.INT64)
+        ]
+        schema = CollectionSchema(fields=fields, description="Document chunks with embeddings")
+        collection = Collection(name=name, schema=schema)
+
+        # Create index for vector field
+        collection.create_index(field_name="embedding", index_params=self.index_params)
+        return collection
             
-    def upsert_documents(self, documents: List[Dict]):
+    def upsert_documents(self, documents: Union[ChunkBatch, List[Dict]]):
         """Insert or update documents in vector store."""
-        collection = Collection(self.collection_name)
+        collection = self._get_collection()
         
         # Prepare data in required format
-        contents = [doc['content'] for doc in documents]
-        embeddings = [doc['embedding'] for doc in documents]
+        if isinstance(documents, ChunkBatch):
+            # Column data is passed through as is, embeddings as one float32 matrix
+            contents = documents.contents
+            embeddings = documents.embeddings
+            chunk_indices = documents.chunk_ids
+            doc_ids = documents.metadata.get('doc_id')
+            chunk_hashes = documents.metadata.get('chunk_hash')
+        else:
+            contents = [doc['content'] for doc in documents]
+            embeddings = [doc['embedding'] for doc in documents]
+            chunk_indices = [doc.get('metadata', {}).get('chunk_id', i) for i, doc in enumerate(documents)]
+            doc_ids = [doc.get('metadata', {}).get('doc_id', "") for doc in documents]
+            chunk_hashes = None
+
+        data = [contents, embeddings]
+        if self.has_chunk_fields:
+            data += [
+                [""] * len(contents) if doc_ids is None else [str(doc_id) for doc_id in doc_ids],
+                [hash_text(content) for content in contents] if chunk_hashes is None
+                else [str(chunk_hash) for chunk_hash in chunk_hashes],
+                np.asarray(chunk_indices, dtype=np.int64).tolist()
+            ]
         
-        # Insert data
-        collection.insert([contents, embeddings])
+        # Insert data. Rows become searchable from growing segments without a
+        # flush, and the collection is loaded once for search, not on every write.
+        collection.insert(data)
+
+    def get_document_chunks(self, doc_id: str) -> List[Dict]:
+        """Get the primary key, chunk hash and chunk index of every stored chunk of a document."""
+        if not self.has_chunk_fields:
+            return []
+        # Queries need a loaded collection; it is loaded once rather than per document
+        collection = self._get_collection(load=True)
+        chunks = []
+        for rows in iter_query(collection, f'doc_id == {_literal(doc_id)}', ["id", "chunk_hash", "chunk_index"]):
+            chunks.extend(rows)
+        return chunks
+
+    def delete_chunks(self, ids: List[int]):
+        """Delete chunks by primary key."""
+        collection = self._get_collection()
+        for start in range(0, len(ids), 1000):
+            batch = [int(chunk_id) for chunk_id in ids[start:start + 1000]]
+            collection.delete(f"id in {batch}")
+
+    def renumber_chunks(self, chunk_indices: Dict[int, int]):
+        """Give stored chunks new chunk indices, by primary key, reusing their embeddings.
+
+        Milvus cannot update rows in place, so each chunk is inserted again
+        under its new index before its old row is deleted.
+        """
+        collection = self._get_collection(load=True)
+        ids = list(chunk_indices)
+        for start in range(0, len(ids), 1000):
+            batch = [int(chunk_id) for chunk_id in ids[start:start + 1000]]
+            rows = collection.query(
+                expr=f"id in {batch}",
+                output_fields=["id", "content", "embedding", "doc_id", "chunk_hash"],
+                limit=QUERY_LIMIT
+            )
+            if not rows:
+                continue
+            self.upsert_documents(ChunkBatch(
+                contents=[row["content"] for row in rows],
+                embeddings=np.asarray([row["embedding"] for row in rows], dtype=np.float32),
+                chunk_ids=[chunk_indices[row["id"]] for row in rows],
+                metadata={
+                    "doc_id": np.array([row["doc_id"] for row in rows], dtype=object),
+                    "chunk_hash": np.array([row["chunk_hash"] for row in rows], dtype=object)
+                }
+            ))
+            collection.delete(f"id in {[int(row['id']) for row in rows]}")
+
+    def flush(self):
+        """Seal growing segments so inserted rows are persisted."""
+        collection = self._get_collection()
         collection.flush()
         
-        # Optionally load collection for immediate searching
-        collection.load()
-        
     def search(self, query_embedding: List[float], limit: int = 5):
         """Search for similar documents."""
-        collection = Collection(self.collection_name)
-        collection.load()
+        collection = self._get_collection(load=True)
         
-        search_params = {
-            "metric_type": "L2",
-            "params": {"nprobe": 10}
-        }
         results = collection.search(
             data=[query_embedding],
             anns_field="embedding",
-            param=search_params,
+            param=self.search_params,
             limit=limit,
             output_fields=["content"]
         )
         
         return results
     
+    def search_batch(
+        self,
+        query_embeddings: Union[np.ndarray, Sequence[Sequence[float]]],
+        limit: int = 5,
+        filters: Optional[Union[str, Dict[str, Any]]] = None,
+        output_fields: Sequence[str] = ("content", "doc_id")
+    ) -> List[List[Dict[str, Any]]]:
+        """Search with many query vectors in one request.
+
+        ``filters`` is a Milvus boolean expression, or a mapping from scalar
+        field to a value or list of allowed values, e.g. ``{"doc_id": [...]}``.
+        Returns one list of hits per query vector, in query order; each hit
+        has the chunk ``id``, the ``distance`` and the requested fields.
+        """
+        if isinstance(query_embeddings, np.ndarray):
+            query_embeddings = query_embeddings.astype(np.float32, copy=False).tolist()
+        if not self.has_chunk_fields:
+            output_fields = [field for field in output_fields if field not in CHUNK_FIELDS]
+        collection = self._get_collection(load=True)
+        expr = _filter_expr(filters)
+
+        hits_per_query = []
+        for start in range(0, len(query_embeddings), SEARCH_BATCH_LIMIT):
+            results = collection.search(
+                data=list(query_embeddings[start:start + SEARCH_BATCH_LIMIT]),
+                anns_field="embedding",
+                param=self.search_params,
+                limit=limit,
+                expr=expr,
+                output_fields=list(output_fields)
+            )
+            for hits in results:
+                hits_per_query.append([
+                    {"id": hit.id, "distance": hit.distance,
+                     **{field: hit.entity.get(field) for field in output_fields}}
+                    for hit in hits
+                ])
+        return hits_per_query
+
     def get_collection_stats(self):
         """Get statistics about the collection."""
         if not utility.has_collection(self.collection_name):
             return None
             
-        collection = Collection(self.collection_name)
+        collection = self._get_collection()
         stats = collection.stats()
         return {
             "row_count": stats["row_count"],
@@ -92,6 +334,9 @@ class VectorStore:
         """Delete the collection if it exists."""
         if utility.has_collection(self.collection_name):
             utility.drop_collection(self.collection_name)
+        with self._collection_lock:
+            self._collection = None
+            self._loaded = False
             
     def __del__(self):
         """Cleanup connection when object is destroyed."""
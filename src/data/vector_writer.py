@@ -0,0 +1,180 @@
+import logging
+import threading
+import time
+from typing import Callable, List, Optional, Tuple
+
+from .chunk_batch import ChunkBatch
+from ..monitoring.metrics import vector_store_insert_time, vector_store_operations
+
+FlushCallback = Callable[[Optional[Exception]], None]
+
+
+class BufferedVectorWriter:
+    """Write-behind buffer that groups chunk batches into large vector store inserts.
+
+    Batches from many documents are buffered and inserted together once the
+    buffer holds ``max_rows`` rows or its oldest batch has waited ``max_delay``
+    seconds. Each writer of a batch is told through its callback when the rows
+    have been inserted, or why the insert failed. The collection is sealed with
+    a single flush when the writer is closed and is never reloaded here.
+
+    Insert latency is tracked as a moving average. While it stays above
+    ``target_latency`` the writer waits between inserts, doubling the pause up
+    to ``max_backoff`` seconds, and halves the pause again once Milvus recovers.
+    Writers block while ``max_pending_rows`` rows are waiting.
+    """
+    def __init__(
+        self,
+        vector_store,
+        max_rows: int = 5000,
+        max_delay: float = 2.0,
+        target_latency: float = 1.0,
+        max_backoff: float = 5.0,
+        max_pending_rows: int = 20000,
+    ):
+        self.vector_store = vector_store
+        self.max_rows = max_rows
+        self.max_delay = max_delay
+        self.target_latency = target_latency
+        self.max_backoff = max_backoff
+        self.max_pending_rows = max(max_pending_rows, max_rows)
+        self.logger = logging.getLogger(__name__)
+
+        self._buffer: List[Tuple[ChunkBatch, Optional[FlushCallback], float]] = []
+        self._buffered_rows = 0
+        self._condition = threading.Condition()
+        self._insert_lock = threading.Lock()
+        self._closed = False
+        self._thread: Optional[threading.Thread] = None
+
+        self.latency_ema: Optional[float] = None
+        self.throttle_delay = 0.0
+        self.rows_written = 0
+        self.inserts = 0
+
+    def start(self) -> None:
+        """Start the background flushing thread."""
+        if self._thread is None:
+            self._closed = False
+            self._thread = threading.Thread(target=self._run, name="vector-writer", daemon=True)
+            self._thread.start()
+
+    def write(self, batch: ChunkBatch, on_flushed: Optional[FlushCallback] = None) -> None:
+        """Buffer a batch for insertion, blocking while too many rows are pending."""
+        with self._condition:
+            if self._closed:
+                raise RuntimeError("Vector writer is closed")
+            while self._buffered_rows >= self.max_pending_rows and not self._closed:
+                self._condition.wait()
+            first_entry = not self._buffer
+            self._buffer.append((batch, on_flushed, time.monotonic()))
+            self._buffered_rows += len(batch)
+            if first_entry or self._buffered_rows >= self.max_rows:
+                # Wake the flushing thread to start the age timer or flush by size
+                self._condition.notify_all()
+
+    def flush(self) -> None:
+        """Insert everything buffered so far."""
+        while True:
+            with self._condition:
+                entries = self._take_entries()
+            if not entries:
+                return
+            self._insert(entries)
+
+    def close(self) -> None:
+        """Flush buffered rows, seal the collection and stop the background thread."""
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self.flush()
+        self.vector_store.flush()
+
+    def stats(self) -> dict:
+        """Get writer counters and the current throttle state."""
+        with self._condition:
+            buffered_rows = self._buffered_rows
+        return {
+            "rows_written": self.rows_written,
+            "inserts": self.inserts,
+            "buffered_rows": buffered_rows,
+            "latency_ema": self.latency_ema or 0.0,
+            "throttle_delay": self.throttle_delay,
+        }
+
+    def _take_entries(self, max_rows: Optional[int] = None) -> List[Tuple[ChunkBatch, Optional[FlushCallback]]]:
+        """Take buffered batches up to ``max_rows`` rows; caller holds the condition."""
+        entries = []
+        rows = 0
+        while self._buffer and (max_rows is None or not entries or rows + len(self._buffer[0][0]) <= max_rows):
+            batch, callback, _ = self._buffer.pop(0)
+            entries.append((batch, callback))
+            rows += len(batch)
+        self._buffered_rows -= rows
+        self._condition.notify_all()
+        return entries
+
+    def _run(self) -> None:
+        """Flush by size or age until the writer is closed."""
+        while True:
+            with self._condition:
+                while not self._closed:
+                    if self._buffered_rows >= self.max_rows:
+                        break
+                    if self._buffer:
+                        remaining = self._buffer[0][2] + self.max_delay - time.monotonic()
+                        if remaining <= 0:
+                            break
+                        self._condition.wait(remaining)
+                    else:
+                        self._condition.wait()
+                if self._closed:
+                    return
+                entries = self._take_entries(self.max_rows)
+
+            if self.throttle_delay:
+                time.sleep(self.throttle_delay)
+            self._insert(entries)
+
+    def _insert(self, entries: List[Tuple[ChunkBatch, Optional[FlushCallback]]]) -> None:
+        """Insert the batches as one vector store call and notify their writers."""
+        batch = ChunkBatch.concat([entry[0] for entry in entries])
+        error = None
+        if len(batch):
+            with self._insert_lock:
+                start_time = time.time()
+                try:
+                    self.vector_store.upsert_documents(batch)
+                except Exception as e:
+                    self.logger.error(f"Failed to insert {len(batch)} rows: {str(e)}")
+                    error = e
+                else:
+                    latency = time.time() - start_time
+                    vector_store_insert_time.observe(latency)
+                    vector_store_operations.labels(operation_type="insert").inc()
+                    self.rows_written += len(batch)
+                    self.inserts += 1
+                    self._adjust_throttle(latency)
+
+        for _, callback in entries:
+            if callback is None:
+                continue
+            try:
+                callback(error)
+            except Exception as e:
+                self.logger.error(f"Error in vector writer callback: {str(e)}")
+
+    def _adjust_throttle(self, latency: float) -> None:
+        """Back off while insert latency is above target, recover when it drops."""
+        self.latency_ema = latency if self.latency_ema is None else 0.8 * self.latency_ema + 0.2 * latency
+        if self.latency_ema > self.target_latency:
+            self.throttle_delay = min(self.max_backoff, max(self.throttle_delay * 2, 0.1))
+            self.logger.warning(
+                f"Vector store insert latency {self.latency_ema:.2f}s above target, "
+                f"pausing {self.throttle_delay:.2f}s between inserts"
+            )
+        elif self.throttle_delay:
+            self.throttle_delay = self.throttle_delay / 2 if self.throttle_delay > 0.05 else 0.0
@@ -1,10 +1,25 @@
 import os
 import time
+import queue
+import threading
 import mlflow
+import numpy as np
 import yaml
-from typing import Dict, Any
+from mlflow.entities import Metric, Param
+from typing import Dict, Any, List, Tuple
 import logging
 
+# Limits of a single MLflow log_batch request
+MAX_METRICS_PER_BATCH = 1000
+MAX_PARAMS_PER_BATCH = 100
+MAX_PARAM_LENGTH = 500
+
+# Percentiles recorded for each metric of an aggregate run
+AGGREGATE_PERCENTILES = (50, 95)
+
+# (run name, params, metrics, timestamp in seconds) of a logged document run
+RunRecord = Tuple[str, Dict[str, Any], Dict[str, float], float]
+
 class ExperimentManager:
     def __init__(self, config_path: str):
         with open(config_path, 'r') as f:
@@ -27,6 +42,25 @@ class ExperimentManager:
         except Exception as e:
             logging.error(f"Failed to create/get experiment: {str(e)}")
             raise
+
+        # Runs logged through log_run are written by a background thread in
+        # "background" mode, and optionally combined into one run per batch
+        logging_config = self.config['mlflow'].get('logging', {})
+        self.logging_mode = logging_config.get('mode', 'sync')
+        self.flush_interval = logging_config.get('flush_interval_seconds', 5.0)
+        aggregate_config = logging_config.get('aggregate', {})
+        self.aggregate_batch_size = aggregate_config.get('batch_size', 100) if aggregate_config.get('enabled', False) else 0
+        self.aggregate_max_age = aggregate_config.get('max_age_seconds', 300.0)
+        self.client = mlflow.tracking.MlflowClient()
+        self._aggregate: List[RunRecord] = []
+        self._aggregate_lock = threading.Lock()
+        self._queue: queue.Queue = queue.Queue()
+        self._thread = None
+        if self.logging_mode == 'background':
+            self._thread = threading.Thread(target=self._logging_worker, name="mlflow-logger", daemon=True)
+            self._thread.start()
+        elif self.logging_mode != 'sync':
+            raise ValueError(f"Unknown MLflow logging mode '{self.logging_mode}'")
         
     def _wait_for_mlflow(self, tracking_uri, max_retries=5, delay=5):
         """Wait for MLflow server to be ready"""
@@ -58,6 +92,149 @@ class ExperimentManager:
         """Log metrics to MLflow."""
         mlflow.log_metrics(metrics, step=step)
         
+    def log_run(self, run_name: str, params: Dict[str, Any], metrics: Dict[str, float]):
+        """Log a complete run with its params and metrics.
+
+        With aggregation enabled, the run is added to the current batch instead
+        and recorded as part of that batch's aggregate run. In background mode
+        the call only enqueues the run, which is written with batch logging.
+        """
+        record = (run_name, params, metrics, time.time())
+        if not self.aggregate_batch_size:
+            self._submit(("run", record))
+            return
+
+        with self._aggregate_lock:
+            self._aggregate.append(record)
+            records = self._take_aggregate(force=False)
+        if records:
+            self._submit(("aggregate", records))
+
+    def flush(self):
+        """Write the current aggregate batch and wait until queued runs are logged."""
+        with self._aggregate_lock:
+            records = self._take_aggregate(force=True)
+        if records:
+            self._submit(("aggregate", records))
+        if self._thread is not None:
+            self._queue.join()
+
+    def close(self):
+        """Flush pending runs and stop the background logging thread."""
+        self.flush()
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join()
+            self._thread = None
+
+    def _take_aggregate(self, force: bool) -> List[RunRecord]:
+        """Take the aggregate batch if it is full, old enough or forced; caller holds the lock."""
+        if not self._aggregate:
+            return []
+        full = len(self._aggregate) >= self.aggregate_batch_size
+        expired = time.time() - self._aggregate[0][3] >= self.aggregate_max_age
+        if not (force or full or expired):
+            return []
+        records, self._aggregate = self._aggregate, []
+        return records
+
+    def _submit(self, item):
+        """Write a run now, or hand it to the background thread."""
+        if self._thread is not None:
+            self._queue.put(item)
+        else:
+            self._write(item)
+
+    def _logging_worker(self):
+        """Write queued runs, and aggregate batches that have waited too long."""
+        while True:
+            try:
+                item = self._queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                with self._aggregate_lock:
+                    records = self._take_aggregate(force=False)
+                if records:
+                    self._write(("aggregate", records))
+                continue
+            try:
+                if item is None:
+                    return
+                self._write(item)
+            finally:
+                self._queue.task_done()
+
+    def _write(self, item):
+        """Write a single run or an aggregate run, logging failures instead of raising."""
+        kind, payload = item
+        try:
+            if kind == "run":
+                run_name, params, metrics, timestamp = payload
+                self._write_run(run_name, params, metrics, timestamp)
+            else:
+                self._write_aggregate(payload)
+        except Exception as e:
+            logging.error(f"Failed to log MLflow run: {str(e)}")
+
+    def _write_run(self, run_name: str, params: Dict[str, Any], metrics: Dict[str, float], timestamp: float):
+        """Log a single document run."""
+        timestamp_ms = int(timestamp * 1000)
+        self._create_run(
+            run_name,
+            timestamp_ms,
+            params,
+            [Metric(key, float(value), timestamp_ms, 0) for key, value in metrics.items()]
+        )
+
+    def _write_aggregate(self, records: List[RunRecord]):
+        """Log a batch of document runs as one run with per-metric distributions.
+
+        Params shared by all documents are logged as is; params that differ are
+        logged as the sorted set of their values. Each metric is logged as a
+        series with one step per document, plus its count, mean, min, max, sum
+        and percentiles.
+        """
+        start_time = min(record[3] for record in records)
+        params = {"num_documents": len(records)}
+        for key in sorted({key for _, doc_params, _, _ in records for key in doc_params}):
+            values = sorted({str(doc_params.get(key)) for _, doc_params, _, _ in records})
+            params[key] = values[0] if len(values) == 1 else ",".join(values)
+
+        metrics = []
+        now_ms = int(time.time() * 1000)
+        for key in sorted({key for _, _, doc_metrics, _ in records for key in doc_metrics}):
+            values = []
+            for step, (_, _, doc_metrics, timestamp) in enumerate(records):
+                if key in doc_metrics:
+                    value = float(doc_metrics[key])
+                    values.append(value)
+                    metrics.append(Metric(key, value, int(timestamp * 1000), step))
+            summary = {
+                "count": len(values),
+                "mean": float(np.mean(values)),
+                "min": min(values),
+                "max": max(values),
+                "sum": float(np.sum(values)),
+            }
+            for percentile in AGGREGATE_PERCENTILES:
+                summary[f"p{percentile}"] = float(np.percentile(values, percentile))
+            metrics.extend(Metric(f"{key}_{name}", float(value), now_ms, 0) for name, value in summary.items())
+
+        self._create_run(f"ingestion_batch_{int(start_time)}", int(start_time * 1000), params, metrics)
+
+    def _create_run(self, run_name: str, start_time_ms: int, params: Dict[str, Any], metrics: List[Metric]):
+        """Create a finished run, logging params and metrics in as few requests as MLflow allows."""
+        run = self.client.create_run(self.experiment_id, start_time=start_time_ms, run_name=run_name)
+        run_id = run.info.run_id
+        params = [Param(key, str(value)[:MAX_PARAM_LENGTH]) for key, value in params.items()]
+        requests = max(-(-len(metrics) // MAX_METRICS_PER_BATCH), -(-len(params) // MAX_PARAMS_PER_BATCH))
+        for i in range(requests):
+            self.client.log_batch(
+                run_id,
+                metrics=metrics[i * MAX_METRICS_PER_BATCH:(i + 1) * MAX_METRICS_PER_BATCH],
+                params=params[i * MAX_PARAMS_PER_BATCH:(i + 1) * MAX_PARAMS_PER_BATCH]
+            )
+        self.client.set_terminated(run_id, end_time=int(time.time() * 1000))
+
     def log_artifact(self, local_path: str):
         """Log an artifact to MLflow."""
         mlflow.log_artifact(local_path)
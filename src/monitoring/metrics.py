@@ -1,4 +1,4 @@
-from prometheus_client import Counter, Histogram, start_http_server
+from prometheus_client import Counter, Gauge, Histogram, start_http_server
 import time
 
 # Define metrics
@@ -12,13 +12,65 @@ documents_processed = Counter(
     'Number of documents processed'
 )
 
+documents_skipped = Counter(
+    'documents_skipped_total',
+    'Number of documents skipped because they were already ingested'
+)
+
 embedding_generation_time = Histogram(
     'embedding_generation_seconds',
     'Time spent generating embeddings'
 )
 
+embedding_batch_size = Histogram(
+    'embedding_batch_size',
+    'Number of chunks per embedding model call',
+    buckets=(1, 2, 4, 8, 16, 32, 64, 128, 256, 512)
+)
+
+embedding_cache_requests = Counter(
+    'embedding_cache_requests_total',
+    'Number of chunk embedding cache lookups',
+    ['result']
+)
+
+parse_cache_requests = Counter(
+    'parse_cache_requests_total',
+    'Number of parse result cache lookups',
+    ['result']
+)
+
 vector_store_operations = Counter(
     'vector_store_operations_total',
     'Number of vector store operations',
     ['operation_type']
-)
\ No newline at end of file
+)
+
+pipeline_stage_time = Histogram(
+    'pipeline_stage_seconds',
+    'Time spent in each ingestion pipeline stage',
+    ['stage']
+)
+
+pipeline_stage_queue_depth = Gauge(
+    'pipeline_stage_queue_depth',
+    'Number of items waiting in each ingestion pipeline stage queue',
+    ['stage']
+)
+
+scheduler_wait_time = Histogram(
+    'scheduler_wait_seconds',
+    'Time documents wait in the ingestion scheduler before the first stage',
+    ['source']
+)
+
+vector_store_insert_time = Histogram(
+    'vector_store_insert_seconds',
+    'Time spent in buffered vector store inserts'
+)
+
+object_store_transfer_time = Histogram(
+    'object_store_transfer_seconds',
+    'Time spent per object in bulk object store transfers',
+    ['operation']
+)
@@ -1,21 +1,149 @@
 import yaml
-import threading
 import queue
+import threading
 import time
-from concurrent.futures import ThreadPoolExecutor
 import os
 import logging
-from typing import Dict, Type
+import mimetypes
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Dict, Iterable, Optional, Sized
+from urllib.parse import quote
 
 from .sources import SourceHandler, FolderWatchHandler
+from .stages import PipelineStage
+from .manifest import IngestionManifest
+from .scheduler import DocumentScheduler
+from .work_queue import DurableWorkQueue, UPLOADED, PARSED, UPSERTED, STAGES
+from ..data.chunk_batch import ChunkBatch
+from ..data.chunk_diff import ChunkDiff
 from ..data.object_store import ObjectStore
+from ..data.parse_cache import ParseCache
 from ..ml.experiment import ExperimentManager
 from ..data.document_processor import DocumentProcessor
 from ..data.vector_store import VectorStore
+from ..data.vector_writer import BufferedVectorWriter
 from ..monitoring.metrics import *
 
+# Stage order of the ingestion pipeline with default worker counts and queue sizes.
+DEFAULT_STAGES = {
+    "upload": {"workers": 2, "queue_size": 32},
+    "parse": {"workers": 4, "queue_size": 16},
+    "chunk": {"workers": 2, "queue_size": 16},
+    "embed": {"workers": 1, "queue_size": 8},
+    "upsert": {"workers": 2, "queue_size": 8},
+    "finalize": {"workers": 1, "queue_size": 32},
+}
+
+# User metadata on archived originals, read back when the archive is reindexed
+DOC_ID_METADATA = "doc-id"
+FILE_NAME_METADATA = "file-name"
+
+def archive_object_name(doc_id: str) -> str:
+    """Object name the original of a document is archived under.
+
+    There is one object per doc_id, so documents with the same file name in
+    different folders do not overwrite each other's original. A doc_id that
+    is a relative path keeps its folders; one with empty, "." or ".." path
+    segments, which object names cannot hold, is percent-encoded into a
+    single name.
+    """
+    if any(not segment.strip(".") for segment in doc_id.split("/")):
+        return quote(doc_id, safe="").replace(".", "%2E")
+    return doc_id.replace("%", "%25")
+
+class DocumentStream:
+    """Tracks the windows of a document that is chunked and embedded incrementally.
+
+    The producer registers a window before sending it down the pipeline, then
+    closes the stream with a final empty window once the document has been fully
+    read. The document is complete when the stream is closed and every
+    registered window has passed the finalize stage.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.windows = 0
+        self.completed = 0
+        self.closed = False
+        self.failed = False
+        self.num_chunks = 0
+        self.total_chunk_length = 0
+
+    def add_window(self) -> None:
+        """Register a window that is about to be sent down the pipeline."""
+        with self._lock:
+            self.windows += 1
+
+    def close(self) -> None:
+        """Register the final window; no more windows will be added."""
+        with self._lock:
+            self.windows += 1
+            self.closed = True
+
+    def complete_window(self, processed_chunks: ChunkBatch) -> bool:
+        """Record a finished window, returning True if the document is now complete."""
+        with self._lock:
+            self.completed += 1
+            self.num_chunks += len(processed_chunks)
+            self.total_chunk_length += processed_chunks.total_content_length
+            return self.closed and not self.failed and self.completed == self.windows
+
+    def fail(self) -> bool:
+        """Mark the document as failed, returning True only for the first failure."""
+        with self._lock:
+            first_failure = not self.failed
+            self.failed = True
+            return first_failure
+
+class BatchProgress:
+    """Counts the outcomes of the documents queued by a batch run."""
+    def __init__(self):
+        self._condition = threading.Condition()
+        self.queued = 0
+        self.outcomes = {"processed": 0, "skipped": 0, "failed": 0}
+
+    def add(self, count: int = 1) -> None:
+        """Register documents about to be queued."""
+        with self._condition:
+            self.queued += count
+
+    def discard(self) -> None:
+        """Unregister a document that was not queued after all."""
+        with self._condition:
+            self.queued -= 1
+            self._condition.notify_all()
+
+    def finish(self, outcome: str) -> None:
+        """Record how a queued document ended."""
+        with self._condition:
+            self.outcomes[outcome] += 1
+            self._condition.notify_all()
+
+    def wait(self, stop_event: threading.Event, timeout: Optional[float] = None) -> bool:
+        """Wait until every queued document has finished, returning False on timeout or stop."""
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        with self._condition:
+            while sum(self.outcomes.values()) < self.queued:
+                if stop_event.is_set():
+                    return False
+                remaining = deadline - time.monotonic() if deadline is not None else 1.0
+                if remaining <= 0:
+                    return False
+                self._condition.wait(min(remaining, 1.0))
+        return True
+
+    def summary(self) -> Dict[str, int]:
+        with self._condition:
+            finished = sum(self.outcomes.values())
+            return {"documents": self.queued, **self.outcomes, "unfinished": self.queued - finished}
+
 class DocumentIngestionPipeline:
-    """Main pipeline class for document ingestion from multiple sources."""
+    """Main pipeline class for document ingestion from multiple sources.
+
+    Documents flow through the stages upload -> parse -> chunk -> embed -> upsert
+    -> finalize. Each stage has its own worker pool and a bounded queue in front
+    of it, so network-bound and CPU-bound stages overlap and a slow stage applies
+    backpressure to the stages before it.
+    """
     def __init__(self, config_path: str):
         with open(config_path, 'r') as f:
             self.config = yaml.safe_load(f)
@@ -27,13 +155,115 @@ class DocumentIngestionPipeline:
         self.experiment_manager = ExperimentManager(config_path)
         self.logger = logging.getLogger(__name__)
 
-        # Initialize processing queue and thread pool
-        self.processing_queue = queue.Queue()
+        # Reuse parse results stored next to the original documents
+        parse_cache_config = self.config['document_processor'].get('parse_cache', {})
+        if parse_cache_config.get('enabled', False):
+            self.document_processor.parse_cache = ParseCache(
+                self.object_store,
+                self.document_processor.parser_settings,
+                prefix=parse_cache_config.get('prefix', 'parsed')
+            )
+
+        # Group inserts from many documents into large batched writes
+        self.vector_writer = None
+        writer_config = self.config['vector_store'].get('writer', {})
+        if writer_config.get('enabled', False):
+            self.vector_writer = BufferedVectorWriter(
+                self.vector_store,
+                max_rows=writer_config.get('max_rows', 5000),
+                max_delay=writer_config.get('max_delay_seconds', 2.0),
+                target_latency=writer_config.get('target_latency_seconds', 1.0),
+                max_backoff=writer_config.get('max_backoff_seconds', 5.0),
+                max_pending_rows=writer_config.get('max_pending_rows', 20000)
+            )
+
+        # Initialize processing stages
         self.should_stop = threading.Event()
-        self.executor = ThreadPoolExecutor(max_workers=3)
+        ingestion_config = self.config.get('ingestion', {})
+
+        # Skip documents already ingested under the current chunking/embedding config
+        self.manifest = None
+        manifest_config = ingestion_config.get('manifest', {})
+        if manifest_config.get('enabled', False):
+            self.manifest = IngestionManifest(manifest_config['path'])
+
+        # Record queued documents and their progress so a restart resumes them
+        self.work_queue = None
+        work_queue_config = ingestion_config.get('work_queue', {})
+        if work_queue_config.get('enabled', False):
+            self.work_queue = DurableWorkQueue(
+                work_queue_config['path'],
+                max_attempts=work_queue_config.get('max_attempts', 3)
+            )
+        self.retry_backoff_seconds = work_queue_config.get('retry_backoff_seconds', 30)
+
+        # Diff updated documents against their stored chunks
+        chunk_diff_config = ingestion_config.get('chunk_diff', {})
+        self.chunk_diff_enabled = chunk_diff_config.get('enabled', False) and self.vector_store.has_chunk_fields
+
+        # Documents at least this large are chunked and embedded incrementally
+        streaming_config = self.config['document_processor'].get('streaming', {})
+        self.streaming_min_bytes = streaming_config.get('min_file_size_mb', 0) * 1024 * 1024
+        self.stats_log_interval = ingestion_config.get('stats_log_interval', 60)
+
+        # Originals are archived to MinIO while the document is parsed and embedded
+        self.upload_executor = ThreadPoolExecutor(
+            max_workers=ingestion_config.get('archive_upload_workers', 4),
+            thread_name_prefix="archive-upload"
+        )
+        self.stages = self._build_stages(ingestion_config.get('stages', {}), ingestion_config.get('scheduler', {}))
+
+        # Sources feed the first stage through the scheduler
+        self.processing_queue = self.stages["upload"].input_queue
 
         # Initialize source handlers
         self.source_handlers: Dict[str, SourceHandler] = {}
+        # Set while run_batch waits for its documents
+        self._batch: Optional[BatchProgress] = None
+
+    def _build_stages(self, stage_config: dict, scheduler_config: dict) -> Dict[str, PipelineStage]:
+        """Create the pipeline stages and link them in order.
+
+        The first stage reads from a DocumentScheduler, which bounds each
+        source to the upload stage queue size and decides which source's
+        document is processed next.
+        """
+        handlers = {
+            "upload": self._upload_stage,
+            "parse": self._parse_stage,
+            "chunk": self._chunk_stage,
+            "embed": self._embed_stage,
+            "upsert": self._upsert_stage,
+            "finalize": self._finalize_stage,
+        }
+        stages = {}
+        previous = None
+        for name, defaults in DEFAULT_STAGES.items():
+            settings = {**defaults, **stage_config.get(name, {})}
+            input_queue = None
+            if previous is None:
+                input_queue = DocumentScheduler(
+                    maxsize=settings["queue_size"],
+                    policy=scheduler_config.get('policy', 'fifo'),
+                    order=scheduler_config.get('order', 'fifo'),
+                    sources=scheduler_config.get('sources', {}),
+                    aging_mb_per_second=scheduler_config.get('aging_mb_per_second', 1.0),
+                    store=self.work_queue
+                )
+            stage = PipelineStage(
+                name=name,
+                handler=handlers[name],
+                workers=settings["workers"],
+                queue_size=settings["queue_size"],
+                stop_event=self.should_stop,
+                on_error=self._handle_stage_error,
+                input_queue=input_queue
+            )
+            if previous is not None:
+                previous.next_stage = stage
+            stages[name] = stage
+            previous = stage
+        return stages
 
     def add_source_handler(self, name: str, handler: SourceHandler) -> None:
         """Add a new source handler to the pipeline."""
@@ -43,17 +273,27 @@ class DocumentIngestionPipeline:
     def run(self) -> None:
         """Start the document ingestion pipeline."""
         try:
+            # Start the processing stages before the sources start filling them
+            if self.vector_writer is not None:
+                self.vector_writer.start()
+            for stage in self.stages.values():
+                stage.start()
+
+            # Documents interrupted by the last shutdown go ahead of new ones
+            if self.work_queue is not None:
+                threading.Thread(target=self._resume_work, name="work-queue-resume", daemon=True).start()
+
             # Start all source handlers
             for handler in self.source_handlers.values():
                 handler.start()
 
-            # Start the processing worker
-            processing_thread = threading.Thread(target=self._processing_worker)
-            processing_thread.start()
-
             # Keep the main thread running
+            last_stats_time = time.time()
             while not self.should_stop.is_set():
                 time.sleep(1)
+                if self.stats_log_interval and time.time() - last_stats_time >= self.stats_log_interval:
+                    self._log_stage_stats()
+                    last_stats_time = time.time()
 
         except KeyboardInterrupt:
             self.logger.info("Received shutdown signal")
@@ -63,92 +303,498 @@ class DocumentIngestionPipeline:
             self.stop()
             raise
 
+    def run_batch(self, documents: Iterable[dict], timeout: Optional[float] = None) -> Dict[str, Any]:
+        """Process a fixed set of documents with all stages running, then stop.
+
+        Unlike ``run``, sources are not started: the given documents, and any
+        unfinished ones in the work queue, are queued and the call returns
+        once all of them have been processed, skipped or failed, or after
+        ``timeout`` seconds. The timeout includes the time spent waiting for
+        room in the queue; once it expires no more documents are taken, and
+        the one that could not be queued, plus the rest of ``documents`` if
+        it is a sequence, count as unfinished. Returns a summary of the run.
+        """
+        self._batch = BatchProgress()
+        start_time = time.time()
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        completed = False
+        try:
+            if self.vector_writer is not None:
+                self.vector_writer.start()
+            for stage in self.stages.values():
+                stage.start()
+
+            enqueued = True
+            if self.work_queue is not None:
+                enqueued = self._resume_work(deadline)
+            for index, doc_info in enumerate(documents if enqueued else ()):
+                self._batch.add()
+                queued = self._put_before(doc_info, deadline)
+                if queued is None:
+                    enqueued = False
+                    if isinstance(documents, Sized):
+                        self._batch.add(len(documents) - index - 1)
+                    break
+                if queued is False:
+                    # The work queue already holds the same file, e.g. from a resumed run
+                    self._batch.discard()
+            if enqueued:
+                remaining = max(deadline - time.monotonic(), 0.0) if deadline is not None else None
+                completed = self._batch.wait(self.should_stop, remaining)
+        finally:
+            self.stop()
+
+        elapsed = time.time() - start_time
+        summary = self._batch.summary()
+        summary.update(
+            completed=completed,
+            seconds=elapsed,
+            documents_per_second=summary["documents"] / elapsed if elapsed else 0.0
+        )
+        self.logger.info(
+            f"Batch finished in {elapsed:.1f}s: {summary['processed']} processed, "
+            f"{summary['skipped']} skipped, {summary['failed']} failed, {summary['unfinished']} unfinished"
+        )
+        return summary
+
     def stop(self) -> None:
         """Stop the pipeline gracefully."""
         self.logger.info("Stopping document ingestion pipeline...")
         self.should_stop.set()
-        
-        # Stop all source handlers
+
+        # Stop taking new documents from the sources
         for handler in self.source_handlers.values():
             handler.stop()
-            
-        self.executor.shutdown(wait=True)
+
+        for stage in self.stages.values():
+            stage.join()
+        self.upload_executor.shutdown(wait=True)
+        if self.vector_writer is not None:
+            # Rows still buffered are inserted and their documents finalized inline
+            self.vector_writer.close()
+        self.document_processor.close()
+        # Write the last aggregate run and any runs still queued for MLflow
+        self.experiment_manager.close()
+        # Every document has reported its outcome, so sources can close their state
+        for handler in self.source_handlers.values():
+            handler.close()
+        if self.manifest is not None:
+            self.manifest.close()
+        if self.work_queue is not None:
+            self.work_queue.close()
+        self._log_stage_stats()
         self.logger.info("Pipeline stopped")
 
-    def _processing_worker(self) -> None:
-        """Worker thread to process files from the queue."""
+    def _resume_work(self, deadline: Optional[float] = None) -> bool:
+        """Queue the documents a previous run accepted but did not finish.
+
+        Returns False if the pipeline stopped or the deadline passed first.
+        """
+        resumed = 0
+        for doc_info, attempts in self.work_queue.unfinished():
+            if self.should_stop.is_set():
+                return False
+            if self._batch is not None:
+                self._batch.add()
+            if attempts >= self.work_queue.max_attempts:
+                # Interrupted on every attempt, e.g. because it crashed the process
+                self.work_queue.fail(doc_info["work_id"], "Interrupted too many times")
+                self._fail_document(doc_info)
+                continue
+            if not self._put_before(doc_info, deadline):
+                return False
+            resumed += 1
+        if resumed:
+            self.logger.info(f"Resumed {resumed} unfinished documents from the work queue")
+        return True
+
+    def _put_before(self, doc_info: dict, deadline: Optional[float]) -> Optional[bool]:
+        """Queue a document, waiting for room until the pipeline stops or the deadline passes.
+
+        Returns True once queued, False if the work queue already holds the
+        document, or None if it could not be queued in time.
+        """
         while not self.should_stop.is_set():
+            remaining = deadline - time.monotonic() if deadline is not None else 1.0
+            if remaining <= 0:
+                return None
             try:
-                # Get document from queue with timeout
-                doc_info = self.processing_queue.get(timeout=1)
-                self._process_document(doc_info)
-                self.processing_queue.task_done()
-            except queue.Empty:
+                return self.processing_queue.put(doc_info, timeout=min(remaining, 1.0))
+            except queue.Full:
                 continue
-            except Exception as e:
-                self.logger.error(f"Error processing document: {str(e)}")
+        return None
+
+    def get_stage_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Get per-stage throughput statistics, in pipeline order."""
+        return {name: stage.stats() for name, stage in self.stages.items()}
+
+    def _log_stage_stats(self) -> None:
+        """Log per-stage throughput so worker counts can be sized."""
+        for name, stats in self.get_stage_stats().items():
+            self.logger.info(
+                f"Stage {name}: workers={stats['workers']} "
+                f"queue={stats['queue_depth']}/{stats['queue_size']} "
+                f"processed={stats['processed']} failed={stats['failed']} "
+                f"avg={stats['avg_seconds']:.3f}s "
+                f"throughput={stats['throughput_per_second']:.2f}/s "
+                f"utilization={stats['utilization']:.0%}"
+            )
+        if self.vector_writer is not None:
+            writer_stats = self.vector_writer.stats()
+            self.logger.info(
+                f"Vector writer: rows={writer_stats['rows_written']} inserts={writer_stats['inserts']} "
+                f"buffered={writer_stats['buffered_rows']} latency={writer_stats['latency_ema']:.2f}s "
+                f"throttle={writer_stats['throttle_delay']:.2f}s"
+            )
+        if self.document_processor.embedding_cache is not None:
+            cache_stats = self.document_processor.embedding_cache.stats()
+            self.logger.info(
+                f"Embedding cache: hits={cache_stats['hits']} misses={cache_stats['misses']} "
+                f"hit_rate={cache_stats['hit_rate']:.0%} "
+                f"entries={cache_stats['entries']}/{cache_stats['max_entries']}"
+            )
+        if self.document_processor.parse_cache is not None:
+            cache_stats = self.document_processor.parse_cache.stats()
+            self.logger.info(
+                f"Parse cache: hits={cache_stats['hits']} misses={cache_stats['misses']} "
+                f"hit_rate={cache_stats['hit_rate']:.0%}"
+            )
 
-    def _process_document(self, doc_info: dict) -> None:
-        """Process a single document."""
+    def _upload_stage(self, doc_info: dict) -> dict:
+        """Check the document against the manifest and start archiving the original to MinIO.
+
+        The file is read once: the same buffer is hashed for the manifest,
+        uploaded and handed to the parse stage. The upload runs in the
+        background while the document moves on; finalize waits for it, so a
+        document only completes once it is archived.
+        """
+        file_path = doc_info["path"]
+        progress, uploaded = None, False
+        if self.work_queue is not None and "work_id" in doc_info:
+            progress, uploaded = self.work_queue.start(doc_info["work_id"])
+        # Sources may supply their own document id, e.g. the path below a watched
+        # folder; by default it is the file name
+        doc_info.setdefault("doc_id", os.path.basename(file_path))
+        fingerprint = self.document_processor.config_fingerprint
+        if self.manifest is not None and self.manifest.check_path(doc_info, fingerprint):
+            self._skip_document(doc_info)
+            return None
+
+        doc_info["start_time"] = time.time()
+        with open(file_path, 'rb') as f:
+            file_bytes = f.read()
+        if self.manifest is not None and self.manifest.check_content(doc_info, fingerprint, data=file_bytes):
+            self._skip_document(doc_info)
+            return None
+
+        object_name = archive_object_name(doc_info["doc_id"])
+        if uploaded or doc_info.get("archived"):
+            # Archived before the restart, or read back from the archive for a reindex
+            doc_info["upload"] = Future()
+            doc_info["upload"].set_result(object_name)
+        else:
+            file_name = doc_info.get("file_name") or os.path.basename(file_path)
+            content_type = mimetypes.guess_type(file_name)[0] or "application/octet-stream"
+            # Object names need not round-trip to a doc_id, so the id and
+            # original file name are stored with the object, percent-encoded
+            # since metadata travels as HTTP headers
+            metadata = {
+                DOC_ID_METADATA: quote(doc_info["doc_id"], safe=""),
+                FILE_NAME_METADATA: quote(file_name, safe="")
+            }
+            doc_info["upload"] = self.upload_executor.submit(
+                self.object_store.put_bytes, file_bytes, object_name, content_type, metadata
+            )
+            if progress is not None:
+                doc_info["upload"].add_done_callback(lambda upload: self._mark_uploaded(doc_info, upload))
+        if progress is not None and STAGES.index(progress) >= STAGES.index(PARSED):
+            doc_info["content"] = self.work_queue.load_content(doc_info["work_id"])
+        if doc_info.get("content") is None:
+            doc_info["file_bytes"] = file_bytes
+        doc_info["object_name"] = object_name
+        if progress == UPSERTED:
+            self._resume_inserted(doc_info)
+            return None
+        return doc_info
+
+    def _resume_inserted(self, doc_info: dict) -> None:
+        """Finalize a document whose rows were inserted before the restart.
+
+        Its chunks are not embedded or inserted again. With chunk diffing, the
+        stored text is chunked and diffed against the stored chunks once more
+        to find the chunks still left to renumber or delete.
+        """
+        content = doc_info.pop("content", None)
+        if content is not None and self._create_chunk_diff(doc_info) is not None:
+            doc_info["chunk_diff"].filter_new(self.document_processor.chunk_document(content))
+        self.stages["finalize"].put({**doc_info, "processed_chunks": ChunkBatch.empty()})
+
+    def _skip_document(self, doc_info: dict) -> None:
+        """Move an already ingested document out of the source folder."""
+        file_path = doc_info["path"]
+        self.logger.info(f"Skipping already ingested file: {file_path}")
+        documents_skipped.inc()
+        self._handle_processed_file(doc_info)
+        if self.work_queue is not None and "work_id" in doc_info:
+            self.work_queue.complete(doc_info["work_id"])
+        self._finish_document(doc_info, "skipped")
+
+    def _mark_uploaded(self, doc_info: dict, upload: Future) -> None:
+        """Record a finished archive upload in the work queue."""
+        if upload.exception() is None:
+            self.work_queue.mark_stage(doc_info["work_id"], UPLOADED)
+
+    def _mark_progress(self, doc_info: dict, stage: str, content: Optional[str] = None) -> None:
+        """Record the stage a document completed, if it is tracked in the work queue."""
+        if self.work_queue is not None and "work_id" in doc_info:
+            self.work_queue.mark_stage(doc_info["work_id"], stage, content=content)
+
+    def _mark_inserted(self, doc_info: dict) -> None:
+        """Record that all rows of a document are in the vector store.
+
+        Windows of a streamed document are inserted one by one, so it is
+        marked once its last window completes.
+        """
+        if doc_info.get("stream") is None:
+            self._mark_progress(doc_info, UPSERTED)
+
+    def _parse_stage(self, doc_info: dict) -> dict:
+        """Parse the document into text from the bytes read by the upload stage."""
+        file_path = doc_info["path"]
+        if doc_info.get("content") is not None:
+            # Parsed before the restart
+            return doc_info
+        file_bytes = doc_info.pop("file_bytes")
+        extra_info = {
+            "file_name": doc_info.get("file_name") or os.path.basename(file_path),
+            "source": doc_info["source"]
+        }
+        if self.streaming_min_bytes and len(file_bytes) >= self.streaming_min_bytes:
+            self._stream_document(doc_info, file_bytes, extra_info)
+            return None
+
+        doc_info["content"] = self.document_processor.parse_document(bytes=file_bytes, extra_info=extra_info)
+        self._mark_progress(doc_info, PARSED, content=doc_info["content"])
+        return doc_info
+
+    def _stream_document(self, doc_info: dict, file_bytes: bytes, extra_info: dict) -> None:
+        """Send a large document down the pipeline in windows of chunks.
+
+        Pages are chunked as they are parsed and each window goes straight to the
+        embed stage. The bounded stage queues block this worker while downstream
+        stages catch up, so memory stays bounded regardless of document size.
+        """
+        stream = DocumentStream()
+        doc_info["stream"] = stream
+        diff = self._create_chunk_diff(doc_info)
+        self.logger.info(f"Streaming large file: {doc_info['path']}")
+
+        pages = self.document_processor.iter_pages(file_bytes, extra_info)
+        for start_index, chunks in self.document_processor.iter_chunk_windows(pages):
+            if stream.failed or self.should_stop.is_set():
+                return
+            window = {**doc_info, "chunks": chunks, "chunk_offset": start_index}
+            if diff is not None:
+                window["chunks"], window["chunk_indices"] = diff.filter_new(chunks, start_index)
+                if not window["chunks"]:
+                    continue
+            stream.add_window()
+            self.stages["embed"].put(window)
+
+        # Final empty window marks the end of the document
+        stream.close()
+        self.stages["finalize"].put({**doc_info, "processed_chunks": ChunkBatch.empty()})
+
+    def _create_chunk_diff(self, doc_info: dict) -> Optional[ChunkDiff]:
+        """Load the stored chunks of a document to diff an update against, if enabled."""
+        if not self.chunk_diff_enabled:
+            return None
+        doc_info["chunk_diff"] = ChunkDiff(self.vector_store.get_document_chunks(doc_info["doc_id"]))
+        return doc_info["chunk_diff"]
+
+    def _chunk_stage(self, doc_info: dict) -> dict:
+        """Split the parsed content into chunks."""
+        chunks = self.document_processor.chunk_document(doc_info.pop("content"))
+        diff = self._create_chunk_diff(doc_info)
+        if diff is not None:
+            # Only chunks that are not stored yet are embedded and inserted
+            chunks, doc_info["chunk_indices"] = diff.filter_new(chunks)
+        doc_info["chunks"] = chunks
+        return doc_info
+
+    def _embed_stage(self, doc_info: dict) -> dict:
+        """Generate embeddings for the chunks."""
+        with embedding_generation_time.time():
+            doc_info["processed_chunks"] = self.document_processor.embed_chunks(
+                doc_info.pop("chunks"),
+                start_index=doc_info.get("chunk_offset", 0),
+                chunk_ids=doc_info.pop("chunk_indices", None),
+                doc_id=doc_info.get("doc_id")
+            )
+        return doc_info
+
+    def _upsert_stage(self, doc_info: dict) -> dict:
+        """Store the embedded chunks in the vector database."""
+        if not len(doc_info["processed_chunks"]):
+            # Nothing changed in this document
+            self._mark_inserted(doc_info)
+            return doc_info
+
+        if self.vector_writer is not None:
+            # The document moves on to finalize once its rows have been inserted
+            self.vector_writer.write(
+                doc_info["processed_chunks"],
+                on_flushed=lambda error: self._on_rows_inserted(doc_info, error)
+            )
+            return None
+
+        self.vector_store.upsert_documents(doc_info["processed_chunks"])
+        vector_store_operations.labels(operation_type="insert").inc()
+        self._mark_inserted(doc_info)
+        return doc_info
+
+    def _on_rows_inserted(self, doc_info: dict, error: Exception = None) -> None:
+        """Forward a document whose buffered rows were written, or fail it."""
+        if error is not None:
+            self._handle_stage_error("upsert", doc_info, error)
+            return
+        self._mark_inserted(doc_info)
+        if not self.stages["finalize"].put(doc_info):
+            # The pipeline is shutting down; finalize in the writer thread
+            self._finalize_stage(doc_info)
+
+    def _finalize_stage(self, doc_info: dict) -> None:
+        """Finalize a processed document, or one window of a streamed document."""
+        processed_chunks = doc_info.pop("processed_chunks")
+        stream = doc_info.get("stream")
+        if stream is None:
+            self._complete_document(
+                doc_info,
+                num_chunks=len(processed_chunks),
+                total_chunk_length=processed_chunks.total_content_length
+            )
+        elif stream.complete_window(processed_chunks):
+            self._complete_document(
+                doc_info,
+                num_chunks=stream.num_chunks,
+                total_chunk_length=stream.total_chunk_length
+            )
+
+    def _complete_document(self, doc_info: dict, num_chunks: int, total_chunk_length: int) -> None:
+        """Log the processed document and move it out of the source folder."""
+        file_path = doc_info["path"]
+        # Raises if archiving the original failed, failing the document
+        doc_info["upload"].result()
+        if doc_info.get("stream") is not None:
+            self._mark_progress(doc_info, UPSERTED)
+        processing_time = time.time() - doc_info["start_time"]
+
+        # Stale chunks are removed only after the new ones have been written
+        diff = doc_info.get("chunk_diff")
+        moved = diff.moved_chunks() if diff is not None else {}
+        if moved:
+            # Unchanged chunks that shifted keep their embeddings under their new index
+            self.vector_store.renumber_chunks(moved)
+            vector_store_operations.labels(operation_type="insert").inc()
+        stale_ids = diff.stale_ids() if diff is not None else []
+        if stale_ids:
+            self.vector_store.delete_chunks(stale_ids)
+            vector_store_operations.labels(operation_type="delete").inc()
+
+        # Logged off the hot path, or folded into a per-batch aggregate run
+        self.experiment_manager.log_run(
+            run_name=f"process_{os.path.basename(file_path)}",
+            params={
+                "chunk_size": self.document_processor.chunk_size,
+                "chunk_overlap": self.document_processor.chunk_overlap,
+                "model_name": self.document_processor.config['embedding_model']['model_name'],
+                "config_fingerprint": self.document_processor.config_fingerprint,
+                "source": doc_info["source"]
+            },
+            metrics={
+                "processing_time": processing_time,
+                "num_chunks": num_chunks,
+                "avg_chunk_length": total_chunk_length / max(num_chunks, 1),
+                "chunks_unchanged": diff.unchanged if diff is not None else 0,
+                "chunks_renumbered": len(moved),
+                "chunks_deleted": len(stale_ids)
+            }
+        )
+
+        # Update Prometheus metrics
+        document_processing_time.observe(processing_time)
+        documents_processed.inc()
+
+        self.logger.info(f"Successfully processed file: {file_path}")
+
+        # Handle processed file
+        self._handle_processed_file(doc_info)
+        if self.manifest is not None:
+            self.manifest.record(doc_info, self.document_processor.config_fingerprint)
+        if self.work_queue is not None and "work_id" in doc_info:
+            self.work_queue.complete(doc_info["work_id"])
+        self._finish_document(doc_info, "processed")
+
+    def _handle_stage_error(self, stage_name: str, doc_info: dict, error: Exception) -> None:
+        """Handle a document that failed in one of the stages."""
+        file_path = doc_info["path"]
+        self.logger.error(f"Error processing file {file_path} in stage {stage_name}: {str(error)}")
+        stream = doc_info.get("stream")
+        if stream is not None and not stream.fail():
+            # Another window of this document already failed and moved the file
+            return
+        if self.work_queue is not None and "work_id" in doc_info:
+            retry = self.work_queue.fail(doc_info["work_id"], f"{stage_name}: {str(error)}")
+            if retry is not None:
+                self._retry_document(retry)
+                return
+        self._fail_document(doc_info)
+
+    def _fail_document(self, doc_info: dict) -> None:
+        """Move a document that will not be retried to the error folder."""
         file_path = doc_info["path"]
         try:
-            # Start MLflow run
-            with self.experiment_manager.start_run(run_name=f"process_{os.path.basename(file_path)}"):
-                # Log configuration parameters
-                self.experiment_manager.log_params({
-                    "chunk_size": self.document_processor.chunk_size,
-                    "chunk_overlap": self.document_processor.chunk_overlap,
-                    "model_name": self.document_processor.config['embedding_model']['model_name'],
-                    "source": doc_info["source"]
-                })
-
-                # Upload original document to MinIO
-                object_name = self.object_store.upload_file(file_path)
-
-                start_time = time.time()
-
-                # Process document
-                with document_processing_time.time():
-                    with open(file_path, 'rb') as f:
-                        file_bytes = f.read()
-                        extra_info = {
-                            "file_name": os.path.basename(file_path),
-                            "source": doc_info["source"]
-                        }
-                        content = self.document_processor.parse_document(bytes=file_bytes, extra_info=extra_info)
-
-                    processed_chunks = self.document_processor.process_document(content)
-
-                processing_time = time.time() - start_time
-
-                # Store in vector database
-                self.vector_store.upsert_documents(processed_chunks)
-
-                # Log metrics
-                self.experiment_manager.log_metrics({
-                    "processing_time": processing_time,
-                    "num_chunks": len(processed_chunks),
-                    "avg_chunk_length": sum(len(chunk['content']) for chunk in processed_chunks) / len(processed_chunks)
-                })
-
-                # Update Prometheus metrics
-                documents_processed.inc()
-                vector_store_operations.labels(operation_type="insert").inc()
-
-                self.logger.info(f"Successfully processed file: {file_path}")
-
-                # Handle processed file
-                self._handle_processed_file(file_path)
+            self._handle_failed_file(file_path)
+        except OSError as e:
+            self.logger.error(f"Could not move failed file {file_path}: {str(e)}")
+        self._finish_document(doc_info, "failed")
+
+    def _retry_document(self, doc_info: dict) -> None:
+        """Queue a failed document again after a backoff, off the stage worker threads."""
+        self.logger.info(f"Retrying {doc_info['path']} in {self.retry_backoff_seconds}s")
+        timer = threading.Timer(self.retry_backoff_seconds, self.stages["upload"].put, args=(doc_info,))
+        timer.daemon = True
+        timer.start()
 
+    def _finish_document(self, doc_info: dict, outcome: str) -> None:
+        """Record that a document was processed, skipped or failed for good."""
+        if self._batch is not None:
+            self._batch.finish(outcome)
+        self._notify_source(doc_info, success=outcome != "failed")
+
+    def _notify_source(self, doc_info: dict, success: bool) -> None:
+        """Tell the source a document came from how its processing ended."""
+        handler = self.source_handlers.get(doc_info["source"])
+        if handler is None:
+            return
+        try:
+            handler.on_document_complete(doc_info, success)
         except Exception as e:
-            self.logger.error(f"Error processing file {file_path}: {str(e)}")
-            self._handle_failed_file(file_path)
+            self.logger.error(f"Error in completion hook of source {doc_info['source']}: {str(e)}")
 
-    def _handle_processed_file(self, file_path: str) -> None:
-        """Handle a successfully processed file."""
+    def _handle_processed_file(self, doc_info: dict) -> None:
+        """Handle a successfully processed file.
+
+        Files a source spooled for the pipeline, such as API uploads, are
+        already archived in MinIO and are removed instead of kept.
+        """
+        file_path = doc_info["path"]
+        if doc_info.get("spooled"):
+            os.remove(file_path)
+            return
         processed_dir = os.path.join(os.path.dirname(file_path), "processed")
         os.makedirs(processed_dir, exist_ok=True)
-        
+
         filename = os.path.basename(file_path)
         new_path = os.path.join(processed_dir, filename)
         os.rename(file_path, new_path)
@@ -157,7 +803,7 @@ class DocumentIngestionPipeline:
         """Handle a file that failed processing."""
         error_dir = os.path.join(os.path.dirname(file_path), "error")
         os.makedirs(error_dir, exist_ok=True)
-        
+
         filename = os.path.basename(file_path)
         new_path = os.path.join(error_dir, filename)
-        os.rename(file_path, new_path)
\ No newline at end of file
+        os.rename(file_path, new_path)
@@ -0,0 +1,113 @@
+import os
+import sqlite3
+import threading
+import time
+import logging
+from typing import Optional
+
+from ..utils.hashing import hash_bytes, hash_file
+
+
+class IngestionManifest:
+    """Persistent record of the version of each document that was ingested.
+
+    Every document id has one entry with the content hash and the fingerprint
+    of the chunking and embedding configuration of its last ingestion. A
+    document is skipped only if its file is that same version: first checked
+    by size and mtime without hashing, then by content hash. Content
+    ingested under another doc_id, or a document reverted to an earlier
+    version, does not match and is ingested.
+    """
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self.logger = logging.getLogger(__name__)
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript("""
+            -- Entries keyed by content hash alone could not tell documents apart
+            DROP TABLE IF EXISTS ingested_documents;
+            CREATE TABLE IF NOT EXISTS documents (
+                doc_id TEXT PRIMARY KEY,
+                content_hash TEXT NOT NULL,
+                config_fingerprint TEXT NOT NULL,
+                path TEXT,
+                size INTEGER,
+                mtime REAL,
+                ingested_at REAL
+            );
+        """)
+        self._conn.commit()
+
+    def check(self, doc_info: dict, config_fingerprint: str) -> bool:
+        """Check whether this version of a document was already ingested under this configuration.
+
+        Stores the content hash, size and mtime on ``doc_info`` so they can be
+        recorded once the document has been ingested.
+        """
+        return self.check_path(doc_info, config_fingerprint) or self.check_content(doc_info, config_fingerprint)
+
+    def check_path(self, doc_info: dict, config_fingerprint: str) -> bool:
+        """Check by size and mtime only, without reading the file.
+
+        The entry is matched by doc_id rather than path, since an ingested
+        file is moved away from the path it was ingested from.
+        """
+        file_path = doc_info["path"]
+        stat = os.stat(file_path)
+        doc_info["size"] = stat.st_size
+        doc_info["mtime"] = stat.st_mtime
+
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT content_hash FROM documents "
+                "WHERE doc_id = ? AND size = ? AND mtime = ? AND config_fingerprint = ?",
+                (doc_info["doc_id"], stat.st_size, stat.st_mtime, config_fingerprint)
+            ).fetchone()
+        if row is not None:
+            doc_info["content_hash"] = row[0]
+            return True
+        return False
+
+    def check_content(self, doc_info: dict, config_fingerprint: str, data: Optional[bytes] = None) -> bool:
+        """Check by content hash, hashing ``data`` if the file was already read."""
+        doc_info["content_hash"] = hash_file(doc_info["path"]) if data is None else hash_bytes(data)
+        return self.contains(doc_info["doc_id"], doc_info["content_hash"], config_fingerprint)
+
+    def contains(self, doc_id: str, content_hash: str, config_fingerprint: str) -> bool:
+        """Check whether the last ingested version of a document has this hash and configuration."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT 1 FROM documents WHERE doc_id = ? AND content_hash = ? AND config_fingerprint = ?",
+                (doc_id, content_hash, config_fingerprint)
+            ).fetchone()
+        return row is not None
+
+    def record(self, doc_info: dict, config_fingerprint: str) -> None:
+        """Record the version of a document that was just ingested, replacing the previous one."""
+        content_hash = doc_info.get("content_hash") or hash_file(doc_info["path"])
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO documents "
+                "(doc_id, content_hash, config_fingerprint, path, size, mtime, ingested_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    doc_info["doc_id"],
+                    content_hash,
+                    config_fingerprint,
+                    os.path.abspath(doc_info["path"]),
+                    doc_info.get("size"),
+                    doc_info.get("mtime"),
+                    time.time()
+                )
+            )
+            self._conn.commit()
+
+    def close(self) -> None:
+        """Close the manifest database."""
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,375 @@
+import copy
+import itertools
+import logging
+import os
+import random
+import re
+import shutil
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from urllib.parse import unquote
+
+import numpy as np
+import yaml
+from pymilvus import Collection, utility
+
+from ..data.chunk_batch import ChunkBatch
+from ..data.vector_store import VectorStore, CHUNK_FIELDS, HEX_DIGITS, iter_query
+
+# Where a reindex can read the documents to embed again
+SOURCES = ("chunks", "archive")
+
+# Passes over chunks ingested into the live collection while it was being copied
+MAX_CATCH_UP_PASSES = 3
+
+
+class CollectionReindexer:
+    """Rebuilds the vector collection under a new version and switches to it atomically.
+
+    The configured ``vector_store.collection_name`` is used as a Milvus alias
+    for one of the versioned collections ``<name>_v<N>``. A build fills the
+    next version from the chunks stored in the live collection, or by
+    ingesting the originals archived in MinIO again, while searches and
+    ingestion keep using the live version. Once the new version passes
+    validation the alias is moved to it in a single call, so the retriever
+    and the pipeline resolve the new version without a restart. Earlier
+    versions are kept for rollback until they are cleaned up.
+    """
+    def __init__(self, config_path: str):
+        with open(config_path, 'r') as f:
+            self.config = yaml.safe_load(f)
+        self.config_path = config_path
+        self.alias = self.config['vector_store']['collection_name']
+
+        reindex_config = self.config['vector_store'].get('reindex', {})
+        self.workers = reindex_config.get('workers', 4)
+        self.sample_size = reindex_config.get('sample_size', 200)
+        self.recall_k = reindex_config.get('recall_k', 10)
+        self.min_recall = reindex_config.get('min_recall', 0.9)
+        self.min_row_ratio = reindex_config.get('min_row_ratio', 0.99)
+        self.keep_versions = reindex_config.get('keep_versions', 2)
+        self.spool_dir = reindex_config.get('spool_dir', 'state/reindex')
+        self.logger = logging.getLogger(__name__)
+
+        # Connects to Milvus; the store itself always works on the alias
+        self.vector_store = VectorStore(config_path)
+        self._pattern = re.compile(rf"^{re.escape(self.alias)}_v(\d+)$")
+
+    def versions(self) -> List[Tuple[int, str]]:
+        """Versioned collections behind the alias as (version, name), oldest first."""
+        versions = []
+        for name in utility.list_collections():
+            match = self._pattern.match(name)
+            if match:
+                versions.append((int(match.group(1)), name))
+        return sorted(versions)
+
+    def current(self) -> Optional[str]:
+        """Collection the configured name resolves to, or None if it does not exist."""
+        for _, name in reversed(self.versions()):
+            if self.alias in utility.list_aliases(name):
+                return name
+        if self.alias in utility.list_collections():
+            # Created before reindexing existed: a plain collection, not an alias
+            return self.alias
+        return None
+
+    def reindex(self, source: str = "chunks", swap: bool = True) -> Dict[str, Any]:
+        """Build a new version, validate it and switch the alias to it if it passed."""
+        report = self.build(source)
+        report["validation"] = self.validate(report["collection"], expected_rows=report.get("expected_rows"))
+        report["passed"] = report["validation"]["passed"] and not report.get("failed")
+        if not report["passed"]:
+            # Dropped so that a later rollback never lands on a rejected build
+            utility.drop_collection(report["collection"])
+            self.logger.error(f"Reindex into {report['collection']} failed validation and was dropped")
+        elif swap:
+            self.swap(report["collection"])
+        return report
+
+    def build(self, source: str = "chunks") -> Dict[str, Any]:
+        """Create the next collection version and fill it from ``source``.
+
+        Chunks written to the live collection while a build from it runs are
+        copied in catch-up passes; chunks deleted meanwhile are not.
+        """
+        if source not in SOURCES:
+            raise ValueError(f"Unknown reindex source '{source}', expected one of {', '.join(SOURCES)}")
+        live = self.current()
+        if source == "chunks" and live is None:
+            raise ValueError(f"There is no collection {self.alias} to copy chunks from")
+
+        versions = self.versions()
+        name = f"{self.alias}_v{versions[-1][0] + 1 if versions else 1}"
+        self.vector_store.create_collection(name)
+        self.logger.info(f"Building {name} from {source} while {live} stays live")
+
+        try:
+            if source == "chunks":
+                report = self._copy_chunks(live, name)
+            else:
+                report = self._ingest_archive(name)
+        except Exception:
+            utility.drop_collection(name)
+            raise
+
+        target = Collection(name)
+        target.flush()
+        target.load()
+        report.update(collection=name, source=source, rows=target.num_entities)
+        self.logger.info(f"Built {name} with {report['rows']} rows")
+        return report
+
+    def validate(self, collection_name: str, expected_rows: Optional[int] = None) -> Dict[str, Any]:
+        """Check the row count of a built collection and its self-recall on sampled rows.
+
+        Each sampled row searches the collection with its own embedding and
+        counts as recalled if it is among the top ``recall_k`` hits, which
+        catches empty, truncated or badly indexed builds.
+        """
+        collection = Collection(collection_name)
+        rows = collection.num_entities
+        row_ratio = rows / expected_rows if expected_rows else None
+        rows_ok = rows > 0 and (row_ratio is None or row_ratio >= self.min_row_ratio)
+
+        sample = self._sample_rows(collection)
+        hits = 0
+        if sample:
+            results = collection.search(
+                data=[row["embedding"] for row in sample],
+                anns_field="embedding",
+                param=self.vector_store.search_params,
+                limit=self.recall_k
+            )
+            hits = sum(row["id"] in set(result.ids) for row, result in zip(sample, results))
+        recall = hits / len(sample) if sample else 0.0
+
+        validation = {
+            "rows": rows,
+            "expected_rows": expected_rows,
+            "row_ratio": row_ratio,
+            "sampled": len(sample),
+            "recall": recall,
+            "passed": rows_ok and recall >= self.min_recall
+        }
+        self.logger.info(f"Validated {collection_name}: {validation}")
+        return validation
+
+    def swap(self, collection_name: str) -> None:
+        """Point the alias at a collection version in one atomic call."""
+        if collection_name not in {name for _, name in self.versions()}:
+            raise ValueError(f"{collection_name} is not a version of {self.alias}")
+        # Searches through the alias need the collection loaded
+        Collection(collection_name).load()
+
+        current = self.current()
+        if current == self.alias:
+            # Keep the plain collection as version 0 so the name is free for the alias
+            legacy = f"{self.alias}_v0"
+            utility.rename_collection(self.alias, legacy)
+            self.logger.info(f"Renamed collection {self.alias} to {legacy}")
+            try:
+                utility.create_alias(collection_name, self.alias)
+            except Exception:
+                # Searches fail until the name resolves again, so give it back
+                utility.rename_collection(legacy, self.alias)
+                self.logger.error(f"Could not create alias {self.alias}, renamed {legacy} back")
+                raise
+            current = legacy
+        elif current is None:
+            utility.create_alias(collection_name, self.alias)
+        else:
+            utility.alter_alias(collection_name, self.alias)
+        self.logger.info(f"Alias {self.alias} now points to {collection_name} (was {current})")
+
+    def rollback(self, to: Optional[str] = None) -> str:
+        """Point the alias back at the previous version, or at the given one."""
+        if to is None:
+            current = self.current()
+            versions = self.versions()
+            legacy = f"{self.alias}_v0"
+            if current is None and any(name == legacy for _, name in versions):
+                # A swap stopped after moving the plain collection to version 0
+                self.swap(legacy)
+                return legacy
+            current_version = next((number for number, name in versions if name == current), None)
+            earlier = [name for number, name in versions if current_version is None or number < current_version]
+            if not earlier or current_version is None:
+                raise ValueError(f"There is no earlier version of {self.alias} to roll back to")
+            to = earlier[-1]
+        self.swap(to)
+        return to
+
+    def status(self) -> Dict[str, Any]:
+        """Collection versions with their row counts and the one the alias points to."""
+        current = self.current()
+        return {
+            "alias": self.alias,
+            "current": current,
+            "versions": [
+                {"name": name, "rows": Collection(name).num_entities, "current": name == current}
+                for _, name in self.versions()
+            ]
+        }
+
+    def cleanup(self, keep: Optional[int] = None) -> List[str]:
+        """Drop all but the ``keep`` newest versions; the live version is always kept."""
+        keep = self.keep_versions if keep is None else keep
+        current = self.current()
+        names = [name for _, name in self.versions()]
+        dropped = [name for name in names[:max(len(names) - keep, 0)] if name != current]
+        for name in dropped:
+            utility.drop_collection(name)
+            self.logger.info(f"Dropped collection {name}")
+        return dropped
+
+    def _copy_chunks(self, live: str, name: str) -> Dict[str, Any]:
+        """Embed the stored chunks of the live collection again into a new one."""
+        source = Collection(live)
+        if not set(CHUNK_FIELDS) <= {field.name for field in source.schema.fields}:
+            raise ValueError(f"Collection {live} has no chunk fields, reindex from the archive instead")
+        source.load()
+        # Only rows persisted when the copy starts are counted as expected
+        source.flush()
+        expected_rows = source.num_entities
+
+        # Only builds need the embedding model; status, swap and rollback start fast
+        from ..data.document_processor import DocumentProcessor
+        processor = DocumentProcessor(self.config_path)
+        target = VectorStore(self.config_path, collection_name=name)
+        copied = 0
+        # At most two buckets per worker are held in memory
+        slots = threading.Semaphore(self.workers * 2)
+        try:
+            dimension = processor.embedding_dimension
+            if dimension != target.dimension:
+                raise ValueError(
+                    f"Embedding model produces {dimension}-dimensional vectors, "
+                    f"set embedding_model.dimension to {dimension}"
+                )
+            with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="reindex") as executor:
+                futures = []
+                lower = None
+                for _ in range(1 + MAX_CATCH_UP_PASSES):
+                    # Each pass copies the ids up to the highest one stored when it
+                    # starts. Chunks ingested during a pass get higher ids, even in
+                    # buckets already scanned, and are left to the next pass.
+                    upper = self._max_id(source)
+                    if lower is not None and upper <= lower:
+                        break
+                    expr = f"id <= {upper}" if lower is None else f"id > {lower} and id <= {upper}"
+                    for rows in self._iter_buckets(source, expr):
+                        if not rows:
+                            continue
+                        copied += len(rows)
+                        slots.acquire()
+                        future = executor.submit(self._embed_rows, rows, processor, target)
+                        future.add_done_callback(lambda _: slots.release())
+                        futures.append(future)
+                    lower = upper
+                for future in futures:
+                    future.result()
+        finally:
+            processor.close()
+        return {"copied": copied, "expected_rows": expected_rows}
+
+    def _sample_rows(self, collection: Collection) -> List[dict]:
+        """Up to ``sample_size`` rows with their embeddings, from random hash buckets."""
+        sample = []
+        for digit in random.sample(HEX_DIGITS, len(HEX_DIGITS)):
+            prefix = digit + random.choice(HEX_DIGITS)
+            sample += collection.query(
+                expr=f'chunk_hash like "{prefix}%"',
+                output_fields=["id", "embedding"],
+                limit=self.sample_size - len(sample)
+            )
+            if len(sample) >= self.sample_size:
+                break
+        return sample
+
+    def _max_id(self, collection: Collection) -> int:
+        """Highest chunk id stored in a collection, reading only the id field."""
+        max_id = 0
+        for digit in HEX_DIGITS:
+            for rows in iter_query(collection, None, ["id"], prefix=digit):
+                max_id = max([max_id] + [row["id"] for row in rows])
+        return max_id
+
+    def _iter_buckets(self, collection: Collection, expr: Optional[str]) -> Iterator[List[dict]]:
+        """Query stored chunks in buckets by hash prefix, splitting buckets that hit the query limit."""
+        for digit in HEX_DIGITS:
+            yield from iter_query(collection, expr, ["id", "content", *CHUNK_FIELDS], prefix=digit)
+
+    def _embed_rows(self, rows: List[dict], processor, target: VectorStore) -> None:
+        """Embed one bucket of stored chunks with the current model and insert it."""
+        contents = [row["content"] for row in rows]
+        target.upsert_documents(ChunkBatch(
+            contents=contents,
+            embeddings=processor.embed_texts(contents),
+            chunk_ids=[row["chunk_index"] for row in rows],
+            metadata={
+                "doc_id": np.array([row["doc_id"] for row in rows], dtype=object),
+                "chunk_hash": np.array([row["chunk_hash"] for row in rows], dtype=object)
+            }
+        ))
+
+    def _ingest_archive(self, name: str) -> Dict[str, Any]:
+        """Run the originals archived in MinIO through the ingestion pipeline into a new collection."""
+        spool = os.path.join(self.spool_dir, name)
+        os.makedirs(spool, exist_ok=True)
+        config = copy.deepcopy(self.config)
+        config['vector_store']['collection_name'] = name
+        ingestion_config = config.setdefault('ingestion', {})
+        # Every archived document is ingested, and none of the live state is touched
+        for section in ('manifest', 'work_queue', 'chunk_diff'):
+            ingestion_config[section] = {'enabled': False}
+        config_path = os.path.join(spool, 'config.yaml')
+        with open(config_path, 'w') as f:
+            yaml.safe_dump(config, f)
+
+        from .document_ingestion_pipeline import DocumentIngestionPipeline
+        try:
+            pipeline = DocumentIngestionPipeline(config_path)
+            summary = pipeline.run_batch(self._archived_documents(pipeline, spool))
+        finally:
+            shutil.rmtree(spool, ignore_errors=True)
+        return {"documents": summary["documents"], "failed": summary["failed"] + summary["unfinished"]}
+
+    def _archived_documents(self, pipeline, spool: str) -> Iterator[dict]:
+        """Download archived originals in small groups as the pipeline asks for more."""
+        from .document_ingestion_pipeline import DOC_ID_METADATA, FILE_NAME_METADATA
+
+        object_store = pipeline.object_store
+        parse_cache_prefix = self.config['document_processor'].get('parse_cache', {}).get('prefix', 'parsed')
+        names = (
+            name for name in object_store.list_objects()
+            if not name.startswith(f"{parse_cache_prefix.rstrip('/')}/")
+        )
+        spool_numbers = itertools.count()
+        while not pipeline.should_stop.is_set():
+            group = [name for _, name in zip(range(self.workers * 4), names)]
+            if not group:
+                return
+            # Originals in different folders may share a file name, so each
+            # spooled copy gets its own number
+            for result in object_store.download_many(
+                (name, os.path.join(spool, f"{next(spool_numbers):06d}_{os.path.basename(name)}"))
+                for name in group
+            ):
+                if not result.success:
+                    # Logged by the object store; the document is left out of the new version
+                    continue
+                metadata = result.metadata or {}
+                # Originals archived before the doc_id was stored with them
+                # fall back to the object name, their file name
+                doc_info = {
+                    "source": "reindex",
+                    "path": result.path,
+                    "doc_id": unquote(metadata.get(DOC_ID_METADATA, "")) or os.path.basename(result.object_name),
+                    "archived": True,
+                    "spooled": True
+                }
+                if FILE_NAME_METADATA in metadata:
+                    doc_info["file_name"] = unquote(metadata[FILE_NAME_METADATA])
+                yield doc_info
@@ -0,0 +1,263 @@
+import heapq
+import itertools
+import os
+import queue
+import threading
+import time
+from collections import deque
+from typing import Any, Dict, Optional
+
+from .work_queue import DurableWorkQueue
+from ..monitoring.metrics import scheduler_wait_time
+
+POLICIES = ("fifo", "fair")
+ORDERS = ("fifo", "sjf")
+
+DEFAULT_SOURCE = "default"
+
+
+class _Lane:
+    """Waiting documents of one source, in FIFO or shortest-job-first order."""
+    def __init__(self, name: str, weight: float, priority: int, order: str):
+        self.name = name
+        self.weight = weight
+        self.priority = priority
+        self.order = order
+        self.items = deque() if order == "fifo" else []
+        # Stride scheduling: the lane with the lowest pass is served next and
+        # every document served advances it by 1 / weight
+        self.pass_value = 0.0
+        # Slots held by puts that are recording their document in the store
+        self.reserved = 0
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    def occupied(self) -> int:
+        """Slots counted against maxsize: waiting documents and reservations."""
+        return len(self.items) + self.reserved
+
+    def push(self, key: float, seq: int, enqueued_at: float, item: Any) -> None:
+        if self.order == "fifo":
+            self.items.append((key, seq, enqueued_at, item))
+        else:
+            heapq.heappush(self.items, (key, seq, enqueued_at, item))
+
+    def head_seq(self) -> int:
+        return self.items[0][1]
+
+    def pop(self):
+        if self.order == "fifo":
+            return self.items.popleft()
+        return heapq.heappop(self.items)
+
+
+class DocumentScheduler:
+    """Drop-in replacement for the ``queue.Queue`` in front of the pipeline.
+
+    Documents are kept in one lane per source (``doc_info["source"]``), each
+    bounded by ``maxsize`` so a large batch load cannot fill the queue and
+    shut out other sources. ``get`` picks the lane to serve by policy:
+
+    - ``fifo``: the oldest document of any lane, as with a single queue.
+    - ``fair``: the highest ``priority`` among non-empty lanes, and within
+      it weighted fair sharing, so a lane with weight 4 is served four
+      documents for every one of a lane with weight 1.
+
+    Within a lane, ``order: sjf`` serves the smallest file first. Waiting
+    documents age by ``aging_mb_per_second``, so a file of N MB is served
+    ahead of new small files after about N / aging seconds and large
+    documents are never starved.
+
+    With a ``store``, every newly queued document is recorded in the
+    DurableWorkQueue first; a file that is already waiting or in progress
+    there is not queued again. The store is written outside the scheduler
+    lock, with a slot of the lane reserved meanwhile, so workers taking
+    documents never wait on its disk writes.
+    """
+    def __init__(
+        self,
+        maxsize: int = 0,
+        policy: str = "fifo",
+        order: str = "fifo",
+        sources: Optional[Dict[str, dict]] = None,
+        aging_mb_per_second: float = 1.0,
+        store: Optional[DurableWorkQueue] = None
+    ):
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown scheduling policy '{policy}', expected one of {POLICIES}")
+        if order not in ORDERS:
+            raise ValueError(f"Unknown scheduling order '{order}', expected one of {ORDERS}")
+        self.maxsize = maxsize
+        self.policy = policy
+        self.order = order
+        self.source_settings = sources or {}
+        self.aging_bytes_per_second = aging_mb_per_second * 1024 * 1024
+        self.store = store
+
+        self._lanes: Dict[str, _Lane] = {}
+        self._size = 0
+        self._unfinished = 0
+        self._virtual_time = 0.0
+        self._seq = itertools.count()
+        self._mutex = threading.Lock()
+        self._not_empty = threading.Condition(self._mutex)
+        self._not_full = threading.Condition(self._mutex)
+        self._all_done = threading.Condition(self._mutex)
+
+    def put(self, item: Any, block: bool = True, timeout: Optional[float] = None) -> bool:
+        """Queue a document in its source's lane, blocking while that lane is full.
+
+        Returns False if the store already holds the document and it was not queued.
+        """
+        source = item.get("source", DEFAULT_SOURCE) if isinstance(item, dict) else DEFAULT_SOURCE
+        key = self._sort_key(item) if self.order == "sjf" else 0.0
+        with self._not_full:
+            lane = self._lane(source)
+            if self.maxsize > 0:
+                if not block:
+                    if lane.occupied() >= self.maxsize:
+                        raise queue.Full
+                elif timeout is None:
+                    while lane.occupied() >= self.maxsize:
+                        self._not_full.wait()
+                else:
+                    deadline = time.monotonic() + timeout
+                    while lane.occupied() >= self.maxsize:
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0:
+                            raise queue.Full
+                        self._not_full.wait(remaining)
+            # Documents that are resumed or retried already have a work_id
+            if self.store is None or "work_id" in item:
+                self._push(lane, key, item)
+                return True
+            lane.reserved += 1
+        added = False
+        try:
+            added = self.store.add(item)
+        finally:
+            with self._not_full:
+                lane.reserved -= 1
+                if added:
+                    self._push(lane, key, item)
+                else:
+                    self._not_full.notify_all()
+        return added
+
+    def get(self, block: bool = True, timeout: Optional[float] = None) -> Any:
+        """Take the next document according to the scheduling policy."""
+        with self._not_empty:
+            if not block:
+                if not self._size:
+                    raise queue.Empty
+            elif timeout is None:
+                while not self._size:
+                    self._not_empty.wait()
+            else:
+                deadline = time.monotonic() + timeout
+                while not self._size:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise queue.Empty
+                    self._not_empty.wait(remaining)
+            lane = self._next_lane()
+            _, _, enqueued_at, item = lane.pop()
+            self._virtual_time = lane.pass_value
+            lane.pass_value += 1.0 / lane.weight
+            self._size -= 1
+            self._not_full.notify_all()
+        scheduler_wait_time.labels(source=lane.name).observe(time.time() - enqueued_at)
+        return item
+
+    def put_nowait(self, item: Any) -> bool:
+        return self.put(item, block=False)
+
+    def get_nowait(self) -> Any:
+        return self.get(block=False)
+
+    def task_done(self) -> None:
+        """Mark a document taken with ``get`` as handled."""
+        with self._all_done:
+            if self._unfinished <= 0:
+                raise ValueError("task_done() called too many times")
+            self._unfinished -= 1
+            if not self._unfinished:
+                self._all_done.notify_all()
+
+    def join(self) -> None:
+        """Block until every queued document has been handled."""
+        with self._all_done:
+            while self._unfinished:
+                self._all_done.wait()
+
+    def qsize(self, source: Optional[str] = None) -> int:
+        """Number of waiting documents, in total or for one source."""
+        with self._mutex:
+            if source is None:
+                return self._size
+            lane = self._lanes.get(source)
+            return len(lane) if lane is not None else 0
+
+    def empty(self) -> bool:
+        return self.qsize() == 0
+
+    def full(self) -> bool:
+        """True only if every lane is full."""
+        with self._mutex:
+            return self.maxsize > 0 and bool(self._lanes) and all(
+                lane.occupied() >= self.maxsize for lane in self._lanes.values()
+            )
+
+    def _push(self, lane: _Lane, key: float, item: Any) -> None:
+        """Add a document to its lane; called with the lock held."""
+        if not len(lane):
+            # A lane that was idle does not bank credit for the time it was idle
+            lane.pass_value = max(lane.pass_value, self._virtual_time)
+        lane.push(key, next(self._seq), time.time(), item)
+        self._size += 1
+        self._unfinished += 1
+        self._not_empty.notify()
+
+    def _lane(self, source: str) -> _Lane:
+        lane = self._lanes.get(source)
+        if lane is None:
+            settings = self.source_settings.get(source, {})
+            lane = _Lane(
+                source,
+                weight=max(float(settings.get('weight', 1.0)), 1e-6),
+                priority=int(settings.get('priority', 0)),
+                order=self.order
+            )
+            lane.pass_value = self._virtual_time
+            self._lanes[source] = lane
+        return lane
+
+    def _next_lane(self) -> _Lane:
+        active = [lane for lane in self._lanes.values() if len(lane)]
+        if self.policy == "fifo":
+            return min(active, key=_Lane.head_seq)
+        top = max(lane.priority for lane in active)
+        return min(
+            (lane for lane in active if lane.priority == top),
+            key=lambda lane: (lane.pass_value, lane.head_seq())
+        )
+
+    def _sort_key(self, item: Any) -> float:
+        """Size in bytes, offset by arrival time so waiting documents age.
+
+        Every queued document ages at the same rate, so ordering by
+        size - aging * waited equals ordering by size + aging * arrival.
+        """
+        return self._job_size(item) + self.aging_bytes_per_second * time.monotonic()
+
+    @staticmethod
+    def _job_size(item: Any) -> int:
+        if not isinstance(item, dict):
+            return 0
+        if item.get("size") is not None:
+            return item["size"]
+        try:
+            return os.path.getsize(item["path"])
+        except (KeyError, OSError):
+            return 0
@@ -20,6 +20,18 @@ class SourceHandler(ABC):
         """Stop monitoring the source."""
         pass
 
+    def close(self) -> None:
+        """Release what the source keeps for completion hooks.
+
+        Called once the pipeline has drained, after the last
+        ``on_document_complete``.
+        """
+        pass
+
+    def on_document_complete(self, doc_info: dict, success: bool) -> None:
+        """Called by the pipeline once a document from this source succeeded or failed."""
+        pass
+
     def set_processing_queue(self, queue: Queue) -> None:
         """Set the queue where new documents should be sent for processing."""
         self.processing_queue = queue
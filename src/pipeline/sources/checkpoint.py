@@ -0,0 +1,36 @@
+import os
+import threading
+from typing import Dict, Tuple
+
+
+class ScanCheckpoint:
+    """Record of the files a source has queued and not yet completed, in this process.
+
+    A file seen again by the scan and by file system events is queued once,
+    unless its size or mtime changed. The record is not persisted: completed
+    and failed files are moved out of the watched tree by the pipeline, so
+    after a restart every file left in the tree still needs processing, and
+    documents interrupted mid-pipeline are resumed by the durable work queue.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._queued: Dict[str, Tuple[int, float]] = {}
+
+    def should_enqueue(self, path: str, size: int, mtime: float) -> bool:
+        """Check whether a file with this size and mtime still needs to be queued."""
+        with self._lock:
+            return self._queued.get(os.path.abspath(path)) != (size, mtime)
+
+    def mark_queued(self, path: str, size: int, mtime: float) -> None:
+        """Record that a file was queued."""
+        with self._lock:
+            self._queued[os.path.abspath(path)] = (size, mtime)
+
+    def forget(self, path: str) -> None:
+        """Drop a file once it was completed or failed, and moved out of the watched tree."""
+        with self._lock:
+            self._queued.pop(os.path.abspath(path), None)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._queued)
@@ -0,0 +1,442 @@
+import os
+import queue
+import re
+import shutil
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+import uvicorn
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
+from python_multipart.multipart import MultipartParser, parse_options_header
+
+from .base import SourceHandler
+from ..scheduler import DocumentScheduler
+
+# Document states reported by the job status endpoint
+RECEIVING = "receiving"
+QUEUED = "queued"
+PROCESSED = "processed"
+FAILED = "failed"
+REJECTED = "rejected"
+
+# Longest doc_id the vector store can hold
+MAX_DOC_ID_LENGTH = 1024
+
+_UNSAFE_FILENAME = re.compile(r"[^A-Za-z0-9._-]+")
+
+
+class UploadRejected(Exception):
+    """Raised while spooling a request that has to be aborted."""
+    def __init__(self, status_code: int, detail: str):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+
+
+class IngestionJob:
+    """Documents received in one upload request and their processing state."""
+    def __init__(self, job_id: str, directory: str):
+        self.job_id = job_id
+        self.directory = directory
+        self.created_at = time.time()
+        self.receiving = True
+        self.documents: "OrderedDict[str, dict]" = OrderedDict()
+
+    def add(self, doc_id: str, file_name: str, status: str, error: Optional[str] = None) -> None:
+        self.documents[doc_id] = {"doc_id": doc_id, "file_name": file_name, "status": status, "error": error}
+
+    def status(self) -> str:
+        """Overall job state derived from the states of its documents."""
+        if self.receiving:
+            return RECEIVING
+        states = [document["status"] for document in self.documents.values()]
+        if QUEUED in states or RECEIVING in states:
+            return "processing"
+        if any(state in (FAILED, REJECTED) for state in states):
+            return "completed_with_errors"
+        return "completed"
+
+    def to_dict(self) -> dict:
+        counts: Dict[str, int] = {}
+        for document in self.documents.values():
+            counts[document["status"]] = counts.get(document["status"], 0) + 1
+        return {
+            "job_id": self.job_id,
+            "status": self.status(),
+            "created_at": self.created_at,
+            "counts": counts,
+            "documents": list(self.documents.values()),
+        }
+
+
+class _MultipartSpooler:
+    """Streaming multipart callbacks that write file parts straight to disk.
+
+    A text field named ``doc_id`` sets the id of the file part that follows
+    it; file parts without one use their file name. Finished files are
+    collected in ``completed`` for the request handler to enqueue.
+    """
+    def __init__(self, handler: 'ApiSourceHandler', job: IngestionJob):
+        self.handler = handler
+        self.job = job
+        self.completed: List[dict] = []
+        self.next_doc_id: Optional[str] = None
+        self._header_field = b""
+        self._header_value = b""
+        self._headers: Dict[bytes, bytes] = {}
+        self._part: Optional[dict] = None
+
+    def callbacks(self) -> dict:
+        return {
+            "on_part_begin": self.on_part_begin,
+            "on_header_field": self.on_header_field,
+            "on_header_value": self.on_header_value,
+            "on_header_end": self.on_header_end,
+            "on_headers_finished": self.on_headers_finished,
+            "on_part_data": self.on_part_data,
+            "on_part_end": self.on_part_end,
+        }
+
+    def on_part_begin(self) -> None:
+        self._headers = {}
+        self._part = None
+
+    def on_header_field(self, data: bytes, start: int, end: int) -> None:
+        self._header_field += data[start:end]
+
+    def on_header_value(self, data: bytes, start: int, end: int) -> None:
+        self._header_value += data[start:end]
+
+    def on_header_end(self) -> None:
+        self._headers[self._header_field.lower()] = self._header_value
+        self._header_field = b""
+        self._header_value = b""
+
+    def on_headers_finished(self) -> None:
+        _, options = parse_options_header(self._headers.get(b"content-disposition", b""))
+        name = options.get(b"name", b"").decode("utf-8", "replace")
+        filename = options.get(b"filename")
+        if filename is None:
+            # Small form field; only doc_id is understood
+            self._part = {"field": name, "value": bytearray()}
+            return
+
+        file_name = filename.decode("utf-8", "replace")
+        doc_id = self.next_doc_id or file_name
+        self.next_doc_id = None
+        self._part = self.handler._open_document(self.job, doc_id, file_name)
+
+    def on_part_data(self, data: bytes, start: int, end: int) -> None:
+        part = self._part
+        if part is None:
+            return
+        if "field" in part:
+            part["value"] += data[start:end]
+            if len(part["value"]) > MAX_DOC_ID_LENGTH:
+                raise UploadRejected(400, f"Form field '{part['field']}' is too long")
+        elif part.get("file") is not None:
+            self.handler._write_document(part, data[start:end])
+
+    def on_part_end(self) -> None:
+        part = self._part
+        self._part = None
+        if part is None:
+            return
+        if "field" in part:
+            if part["field"] == "doc_id":
+                self.next_doc_id = part["value"].decode("utf-8", "replace").strip() or None
+        elif part.get("file") is not None:
+            self.completed.append(self.handler._close_document(part))
+
+    def abort(self) -> None:
+        """Remove a partially written file after the request failed."""
+        part = self._part
+        if part is not None and part.get("file") is not None:
+            self.handler._discard_document(self.job, part)
+
+
+class ApiSourceHandler(SourceHandler):
+    """Accepts documents pushed over HTTP.
+
+    ``POST /documents`` takes a multipart body with any number of files and
+    ``PUT /documents/{doc_id}`` a single raw body. Bodies are streamed to a
+    spool directory chunk by chunk and every finished file is queued right
+    away, so a large batch is processed while it is still being received.
+    Each request returns a job id that can be polled at ``GET /jobs/{job_id}``.
+    A job's spool directory is removed once all of its documents are handled.
+
+    New requests are refused with 429 while the pipeline queue holds
+    ``max_queue_depth`` documents or more; once admitted, a request blocks on
+    the bounded queue, which slows the upload down instead of buffering it.
+    """
+    def __init__(self, config: dict, spool_directory: Optional[str] = None):
+        super().__init__(config)
+        self.supported_formats = set(config['document_processor']['supported_formats'])
+
+        api_config = config.get('ingestion', {}).get('sources', {}).get('api', {})
+        self.host = api_config.get('host', '0.0.0.0')
+        self.port = api_config.get('port', 8081)
+        self.spool_directory = spool_directory or api_config.get('spool_dir', 'state/api_uploads')
+        self.max_queue_depth = api_config.get('max_queue_depth')
+        self.max_concurrent_uploads = api_config.get('max_concurrent_uploads', 8)
+        self.max_document_bytes = int(api_config.get('max_document_mb', 512) * 1024 * 1024)
+        self.max_jobs = api_config.get('max_jobs', 10000)
+        self.retry_after_seconds = api_config.get('retry_after_seconds', 5)
+        self.queue_timeout = api_config.get('queue_timeout_seconds', 0.5)
+
+        self._jobs: "OrderedDict[str, IngestionJob]" = OrderedDict()
+        self._jobs_lock = threading.Lock()
+        self._active_uploads = 0
+        self._server: Optional[uvicorn.Server] = None
+        self._thread: Optional[threading.Thread] = None
+        self.should_stop = threading.Event()
+        self.app = self._create_app()
+
+    def start(self) -> None:
+        """Start the HTTP server in a background thread."""
+        self._validate_queue()
+        self.should_stop.clear()
+        os.makedirs(self.spool_directory, exist_ok=True)
+        server_config = uvicorn.Config(self.app, host=self.host, port=self.port, log_level="warning")
+        self._server = uvicorn.Server(server_config)
+        self._thread = threading.Thread(target=self._server.run, name="api-source", daemon=True)
+        self._thread.start()
+        self.logger.info(f"Accepting document uploads on http://{self.host}:{self.port}")
+
+    def stop(self) -> None:
+        """Stop the HTTP server."""
+        self.should_stop.set()
+        if self._server is not None:
+            self._server.should_exit = True
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self.logger.info("API source stopped")
+
+    def on_document_complete(self, doc_info: dict, success: bool) -> None:
+        """Record the outcome of an uploaded document in its job."""
+        with self._jobs_lock:
+            job = self._jobs.get(doc_info.get("job_id"))
+            if job is None:
+                return
+            document = job.documents.get(doc_info["doc_id"])
+            if document is not None:
+                document["status"] = PROCESSED if success else FAILED
+        self._remove_spool(job)
+
+    def get_job(self, job_id: str) -> Optional[dict]:
+        """Status of a job, or None if it is unknown or was evicted."""
+        with self._jobs_lock:
+            job = self._jobs.get(job_id)
+            return job.to_dict() if job is not None else None
+
+    def _create_app(self) -> FastAPI:
+        app = FastAPI(title="Document ingestion", version="1.0.0")
+
+        @app.post("/documents", status_code=202)
+        async def upload_documents(request: Request) -> dict:
+            content_type, options = parse_options_header(request.headers.get("content-type", ""))
+            boundary = options.get(b"boundary")
+            if content_type != b"multipart/form-data" or not boundary:
+                raise HTTPException(status_code=415, detail="Expected a multipart/form-data body")
+            return await self._receive(request, boundary=boundary)
+
+        @app.put("/documents/{doc_id:path}", status_code=202)
+        async def upload_document(doc_id: str, request: Request, filename: Optional[str] = None) -> dict:
+            return await self._receive(request, doc_id=doc_id, file_name=filename or doc_id)
+
+        @app.get("/jobs/{job_id}")
+        async def job_status(job_id: str) -> dict:
+            job = self.get_job(job_id)
+            if job is None:
+                raise HTTPException(status_code=404, detail=f"Unknown job: {job_id}")
+            return job
+
+        @app.get("/health")
+        async def health() -> dict:
+            return {"status": "healthy", "queue_depth": self._queue_depth()}
+
+        return app
+
+    async def _receive(self, request: Request, boundary: Optional[bytes] = None,
+                       doc_id: Optional[str] = None, file_name: Optional[str] = None) -> dict:
+        """Spool one request body to disk, queueing documents as they finish."""
+        self._admit()
+        self._active_uploads += 1
+        job = self._create_job()
+        spooler = None
+        try:
+            if boundary is not None:
+                spooler = _MultipartSpooler(self, job)
+                parser = MultipartParser(boundary, spooler.callbacks())
+                async for chunk in request.stream():
+                    parser.write(chunk)
+                    await self._enqueue_completed(job, spooler.completed)
+                parser.finalize()
+                await self._enqueue_completed(job, spooler.completed)
+            else:
+                part = self._open_document(job, doc_id, file_name)
+                try:
+                    async for chunk in request.stream():
+                        if part["file"] is not None:
+                            self._write_document(part, chunk)
+                except BaseException:
+                    self._discard_document(job, part)
+                    raise
+                if part["file"] is not None:
+                    await self._enqueue_completed(job, [self._close_document(part)])
+        except UploadRejected as e:
+            if spooler is not None:
+                spooler.abort()
+            self._finish_receiving(job)
+            raise HTTPException(status_code=e.status_code, detail=f"{e.detail} (job {job.job_id})")
+        except Exception as e:
+            if spooler is not None:
+                spooler.abort()
+            self._finish_receiving(job)
+            self.logger.error(f"Error receiving upload for job {job.job_id}: {str(e)}")
+            raise HTTPException(status_code=400, detail=f"Could not read upload: {str(e)}")
+        finally:
+            self._active_uploads -= 1
+
+        self._finish_receiving(job)
+        status = self.get_job(job.job_id)
+        self.logger.info(f"Job {job.job_id} received {len(job.documents)} documents")
+        return status
+
+    def _admit(self) -> None:
+        """Refuse a new upload while the pipeline or the server is saturated."""
+        retry_after = {"Retry-After": str(self.retry_after_seconds)}
+        if self.should_stop.is_set():
+            raise HTTPException(status_code=503, detail="Ingestion is shutting down", headers=retry_after)
+        max_depth = self.max_queue_depth or self.processing_queue.maxsize
+        if max_depth and self._queue_depth() >= max_depth:
+            raise HTTPException(status_code=429, detail="Ingestion queue is full", headers=retry_after)
+        if self._active_uploads >= self.max_concurrent_uploads:
+            raise HTTPException(status_code=429, detail="Too many concurrent uploads", headers=retry_after)
+
+    def _queue_depth(self) -> int:
+        """Documents from this source waiting to be processed."""
+        if isinstance(self.processing_queue, DocumentScheduler):
+            # The scheduler gives each source its own lane and bound
+            return self.processing_queue.qsize("api")
+        return self.processing_queue.qsize()
+
+    def _create_job(self) -> IngestionJob:
+        job_id = uuid.uuid4().hex
+        job = IngestionJob(job_id, os.path.join(self.spool_directory, job_id))
+        with self._jobs_lock:
+            self._jobs[job_id] = job
+            # Forget the oldest finished jobs once too many are tracked
+            while len(self._jobs) > self.max_jobs:
+                oldest_id, oldest = next(iter(self._jobs.items()))
+                if oldest.status() in (RECEIVING, "processing"):
+                    break
+                del self._jobs[oldest_id]
+        return job
+
+    def _finish_receiving(self, job: IngestionJob) -> None:
+        """Close a job to new documents; documents not queued by now were aborted."""
+        with self._jobs_lock:
+            job.receiving = False
+            for document in job.documents.values():
+                if document["status"] == RECEIVING:
+                    document["status"] = REJECTED
+                    document["error"] = "Upload aborted"
+        self._remove_spool(job)
+
+    def _remove_spool(self, job: IngestionJob) -> None:
+        """Remove the spool directory of a job once none of its documents is pending."""
+        with self._jobs_lock:
+            if job.status() in (RECEIVING, "processing"):
+                return
+        shutil.rmtree(job.directory, ignore_errors=True)
+
+    def _open_document(self, job: IngestionJob, doc_id: str, file_name: str) -> dict:
+        """Start spooling a document, or record why it is rejected.
+
+        Rejected documents get a part without a file, so their data is read
+        and dropped while the rest of the request carries on.
+        """
+        part = {"doc_id": doc_id, "file_name": file_name, "file": None, "size": 0}
+        error = None
+        extension = os.path.splitext(file_name)[1][1:].lower()
+        if not doc_id or len(doc_id) > MAX_DOC_ID_LENGTH:
+            error = "Invalid doc_id"
+        elif extension not in self.supported_formats:
+            error = f"Unsupported format: {extension or 'none'}"
+        with self._jobs_lock:
+            if error is None and doc_id in job.documents:
+                error = "Duplicate doc_id in job"
+            if error is not None:
+                # Keep the first entry for a duplicate id
+                if doc_id not in job.documents:
+                    job.add(doc_id, file_name, REJECTED, error)
+                return part
+
+        os.makedirs(job.directory, exist_ok=True)
+        safe_name = _UNSAFE_FILENAME.sub("_", os.path.basename(file_name)).lstrip(".") or f"document.{extension}"
+        path = os.path.join(job.directory, f"{len(job.documents):06d}_{safe_name}")
+        part["path"] = path
+        part["file"] = open(path, "wb")
+        with self._jobs_lock:
+            job.add(doc_id, file_name, RECEIVING)
+        return part
+
+    def _write_document(self, part: dict, data: bytes) -> None:
+        part["size"] += len(data)
+        if part["size"] > self.max_document_bytes:
+            raise UploadRejected(413, f"Document '{part['doc_id']}' exceeds {self.max_document_bytes} bytes")
+        part["file"].write(data)
+
+    def _close_document(self, part: dict) -> dict:
+        part["file"].close()
+        part["file"] = None
+        return part
+
+    def _discard_document(self, job: IngestionJob, part: dict) -> None:
+        if part.get("file") is not None:
+            part["file"].close()
+            part["file"] = None
+        if part.get("path") and os.path.exists(part["path"]):
+            os.remove(part["path"])
+        with self._jobs_lock:
+            document = job.documents.get(part["doc_id"])
+            if document is not None and document["status"] == RECEIVING:
+                document["status"] = REJECTED
+                document["error"] = "Upload aborted"
+
+    async def _enqueue_completed(self, job: IngestionJob, parts: List[dict]) -> None:
+        """Queue finished documents without blocking the event loop."""
+        while parts:
+            part = parts.pop(0)
+            doc_info = {
+                "source": "api",
+                "path": part["path"],
+                "doc_id": part["doc_id"],
+                "file_name": part["file_name"],
+                "job_id": job.job_id,
+                # The spooled copy is removed once the document is processed
+                "spooled": True
+            }
+            with self._jobs_lock:
+                job.documents[part["doc_id"]]["status"] = QUEUED
+            await run_in_threadpool(self._put, job, doc_info)
+
+    def _put(self, job: IngestionJob, doc_info: dict) -> None:
+        """Block until the pipeline takes the document, or give up when stopping."""
+        while not self.should_stop.is_set():
+            try:
+                self.processing_queue.put(doc_info, timeout=self.queue_timeout)
+                return
+            except queue.Full:
+                continue
+        with self._jobs_lock:
+            document = job.documents[doc_info["doc_id"]]
+            document["status"] = REJECTED
+            document["error"] = "Ingestion is shutting down"
+        raise UploadRejected(503, "Ingestion is shutting down")
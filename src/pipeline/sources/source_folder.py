@@ -1,9 +1,14 @@
 from watchdog.observers import Observer
 from watchdog.events import FileSystemEventHandler
 import os
-from typing import Set
+import queue
+import threading
+import time
+from typing import Dict, Iterator, Optional, Tuple
 
 from .base import SourceHandler
+from .checkpoint import ScanCheckpoint
+from ...utils.hashing import shard_of
 
 class FolderWatchHandler(FileSystemEventHandler):
     """Handles file system events for the folder watcher."""
@@ -13,48 +18,202 @@ class FolderWatchHandler(FileSystemEventHandler):
 
     def on_created(self, event):
         """Handle file creation event."""
-        if not event.is_directory and self.source_handler._is_supported_format(event.src_path):
+        if not event.is_directory:
             self.source_handler.handle_new_file(event.src_path)
 
+    def on_modified(self, event):
+        """Handle file modification, e.g. a file that is still being written."""
+        if not event.is_directory:
+            self.source_handler.handle_new_file(event.src_path)
+
+    def on_moved(self, event):
+        """Handle a file moved or renamed into the watched tree."""
+        if not event.is_directory:
+            self.source_handler.handle_new_file(event.dest_path)
+
 class FolderSourceHandler(SourceHandler):
-    """Handles watching a folder for new documents."""
+    """Handles watching a folder tree for new documents.
+
+    Existing files are enumerated with ``os.scandir`` in a background thread
+    and streamed into the processing queue. New and changed files are only
+    queued once their size and mtime have not changed for the debounce
+    window, so files still being copied are not picked up half-written. The
+    processed and error folders the pipeline moves files into are skipped.
+    """
     def __init__(self, config: dict, watch_directory: str):
         super().__init__(config)
         self.watch_directory = watch_directory
         self.supported_formats = set(config['document_processor']['supported_formats'])
+
+        folder_config = config.get('ingestion', {}).get('sources', {}).get('folder', {})
+        self.recursive = folder_config.get('recursive', True)
+        self.debounce_seconds = folder_config.get('debounce_seconds', 2.0)
+        self.poll_interval = folder_config.get('poll_interval_seconds', 0.5)
+        self.excluded_dirs = set(folder_config.get('exclude_dirs', ["processed", "error"]))
+        # Files queued and not yet finished; a file is not queued twice by one process
+        self.checkpoint = ScanCheckpoint()
+
         self.observer = Observer()
         self.watch_handler = FolderWatchHandler(self)
+        self.should_stop = threading.Event()
+        self._pending: Dict[str, Tuple[int, float, float]] = {}
+        self._pending_lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
 
     def start(self) -> None:
         """Start watching the directory."""
         self._validate_queue()
-        self.observer.schedule(self.watch_handler, self.watch_directory, recursive=False)
+        self.should_stop.clear()
+        self.observer.schedule(self.watch_handler, self.watch_directory, recursive=self.recursive)
         self.observer.start()
         self.logger.info(f"Started watching directory: {self.watch_directory}")
-        
-        # Process existing files
-        self._process_existing_files()
+
+        # Existing files are scanned and debounced in the background
+        self._thread = threading.Thread(target=self._run, name="folder-source", daemon=True)
+        self._thread.start()
 
     def stop(self) -> None:
         """Stop watching the directory."""
-        self.observer.stop()
-        self.observer.join()
+        self.should_stop.set()
+        # Not started in batch runs, which only enumerate pending files
+        if self.observer.is_alive():
+            self.observer.stop()
+            self.observer.join()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
         self.logger.info("Folder watcher stopped")
 
     def handle_new_file(self, file_path: str) -> None:
-        """Handle a new file detected in the watch directory."""
-        self.logger.info(f"New file detected: {file_path}")
-        self._validate_queue()
-        self.processing_queue.put({"source": "folder", "path": file_path})
+        """Track a new or changed file until it is stable, then queue it."""
+        if not self._is_watched(file_path):
+            return
+        try:
+            stat = os.stat(file_path)
+        except FileNotFoundError:
+            return
+        with self._pending_lock:
+            previous = self._pending.get(file_path)
+            if previous is None or previous[:2] != (stat.st_size, stat.st_mtime):
+                self._pending[file_path] = (stat.st_size, stat.st_mtime, time.monotonic())
+
+    def pending_documents(self, shard_index: int = 0, num_shards: int = 1) -> Iterator[dict]:
+        """Enumerate the files waiting in the watch directory, for batch runs.
+
+        Files are split into ``num_shards`` by a hash of their path relative
+        to the watch directory, so several batch runs can share the directory.
+        Files modified within the debounce window may still be written to and
+        are left for the next run.
+        """
+        for entry in self._scan(self.watch_directory):
+            relative_path = os.path.relpath(entry.path, self.watch_directory)
+            if num_shards > 1 and shard_of(relative_path, num_shards) != shard_index:
+                continue
+            stat = entry.stat()
+            if time.time() - stat.st_mtime < self.debounce_seconds:
+                continue
+            if not self.checkpoint.should_enqueue(entry.path, stat.st_size, stat.st_mtime):
+                continue
+            self.checkpoint.mark_queued(entry.path, stat.st_size, stat.st_mtime)
+            yield {"source": "folder", "path": entry.path, "doc_id": self._doc_id(entry.path)}
+
+    def on_document_complete(self, doc_info: dict, success: bool) -> None:
+        """Drop a finished file from the checkpoint; the pipeline moved it out of the tree."""
+        self.checkpoint.forget(doc_info["path"])
+
+    def _run(self) -> None:
+        """Scan existing files, then queue tracked files once they are stable."""
+        try:
+            self._process_existing_files()
+        except Exception as e:
+            self.logger.error(f"Error scanning {self.watch_directory}: {str(e)}")
+        while not self.should_stop.wait(self.poll_interval):
+            self._enqueue_stable_files()
 
     def _process_existing_files(self) -> None:
-        """Process any existing files in the watch directory."""
-        for filename in os.listdir(self.watch_directory):
-            file_path = os.path.join(self.watch_directory, filename)
-            if os.path.isfile(file_path) and self._is_supported_format(file_path):
+        """Stream the files already in the watch directory into the queue."""
+        count = 0
+        for entry in self._scan(self.watch_directory):
+            if self.should_stop.is_set():
+                return
+            stat = entry.stat()
+            if time.time() - stat.st_mtime >= self.debounce_seconds:
+                self._enqueue(entry.path, stat.st_size, stat.st_mtime)
+            else:
+                self.handle_new_file(entry.path)
+            count += 1
+        self.logger.info(f"Scanned {count} existing files in {self.watch_directory}")
+
+    def _scan(self, directory: str) -> Iterator[os.DirEntry]:
+        """Yield supported files below a directory, depth first, without building a full listing."""
+        stack = [directory]
+        while stack:
+            current = stack.pop()
+            try:
+                with os.scandir(current) as entries:
+                    for entry in entries:
+                        if entry.is_dir(follow_symlinks=False):
+                            if self.recursive and entry.name not in self.excluded_dirs:
+                                stack.append(entry.path)
+                        elif entry.is_file() and self._is_supported_format(entry.name):
+                            yield entry
+            except OSError as e:
+                self.logger.warning(f"Could not scan {current}: {str(e)}")
+
+    def _enqueue_stable_files(self) -> None:
+        """Queue tracked files whose size and mtime stopped changing."""
+        now = time.monotonic()
+        with self._pending_lock:
+            candidates = [
+                (file_path, size, mtime) for file_path, (size, mtime, since) in self._pending.items()
+                if now - since >= self.debounce_seconds
+            ]
+
+        for file_path, size, mtime in candidates:
+            try:
+                stat = os.stat(file_path)
+            except FileNotFoundError:
+                with self._pending_lock:
+                    self._pending.pop(file_path, None)
+                continue
+            if (stat.st_size, stat.st_mtime) != (size, mtime):
+                # Changed without an event reaching us yet; restart its window
                 self.handle_new_file(file_path)
+                continue
+            with self._pending_lock:
+                self._pending.pop(file_path, None)
+            self._enqueue(file_path, size, mtime)
+
+    def _enqueue(self, file_path: str, size: int, mtime: float) -> None:
+        """Put a file on the processing queue unless this process already queued it."""
+        if not self.checkpoint.should_enqueue(file_path, size, mtime):
+            return
+        self.checkpoint.mark_queued(file_path, size, mtime)
+        self.logger.info(f"New file detected: {file_path}")
+        doc_info = {"source": "folder", "path": file_path, "doc_id": self._doc_id(file_path)}
+        # Block while the pipeline is busy, but give up when stopping
+        while not self.should_stop.is_set():
+            try:
+                self.processing_queue.put(doc_info, timeout=self.poll_interval)
+                return
+            except queue.Full:
+                continue
+
+    def _doc_id(self, file_path: str) -> str:
+        """Document id of a file: its path below the watch directory, with "/" separators."""
+        return os.path.relpath(os.path.abspath(file_path), os.path.abspath(self.watch_directory)).replace(os.sep, "/")
+
+    def _is_watched(self, file_path: str) -> bool:
+        """Check that a file is supported and not inside an excluded folder."""
+        if not self._is_supported_format(file_path):
+            return False
+        relative = os.path.relpath(os.path.dirname(os.path.abspath(file_path)), os.path.abspath(self.watch_directory))
+        parts = [] if relative == "." else relative.split(os.sep)
+        if parts and (parts[0] == ".." or not self.recursive):
+            return False
+        return not any(part in self.excluded_dirs for part in parts)
 
     def _is_supported_format(self, file_path: str) -> bool:
         """Check if file format is supported."""
         extension = os.path.splitext(file_path)[1][1:].lower()
-        return extension in self.supported_formats
\ No newline at end of file
+        return extension in self.supported_formats
@@ -0,0 +1,135 @@
+import logging
+import queue
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from ..monitoring.metrics import pipeline_stage_time, pipeline_stage_queue_depth
+
+
+class PipelineStage:
+    """A pipeline stage with its own worker pool and a bounded input queue.
+
+    Each worker takes an item from the input queue, runs the stage handler on it
+    and forwards the result to the next stage. A handler returning ``None`` means
+    the item was consumed (or handed off asynchronously) and is not forwarded.
+    Because every input queue is bounded, a slow stage blocks the stages before
+    it instead of letting work pile up in memory.
+    """
+    def __init__(
+        self,
+        name: str,
+        handler: Callable[[Any], Any],
+        workers: int = 1,
+        queue_size: int = 0,
+        stop_event: Optional[threading.Event] = None,
+        on_error: Optional[Callable[[str, Any, Exception], None]] = None,
+        input_queue: Optional[queue.Queue] = None,
+    ):
+        self.name = name
+        self.handler = handler
+        self.workers = max(1, int(workers))
+        # Any object with the queue.Queue interface, e.g. a DocumentScheduler
+        self.input_queue = input_queue if input_queue is not None else queue.Queue(maxsize=queue_size)
+        self.stop_event = stop_event or threading.Event()
+        self.on_error = on_error
+        self.next_stage: Optional['PipelineStage'] = None
+        self.logger = logging.getLogger(__name__)
+
+        self._threads: List[threading.Thread] = []
+        self._lock = threading.Lock()
+        self._started_at: Optional[float] = None
+        self._processed = 0
+        self._failed = 0
+        self._busy_seconds = 0.0
+
+    def start(self) -> None:
+        """Start the stage worker threads."""
+        self._started_at = time.time()
+        for i in range(self.workers):
+            thread = threading.Thread(
+                target=self._worker,
+                name=f"stage-{self.name}-{i}",
+                daemon=True
+            )
+            thread.start()
+            self._threads.append(thread)
+
+    def join(self, timeout: Optional[float] = None) -> None:
+        """Wait for the worker threads to exit after the stop event is set."""
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+
+    def put(self, item: Any) -> bool:
+        """Put an item on the stage input queue, blocking while the queue is full.
+
+        Returns False if the pipeline was stopped before the item could be queued.
+        """
+        while not self.stop_event.is_set():
+            try:
+                self.input_queue.put(item, timeout=1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def forward(self, item: Any) -> None:
+        """Send an item to the next stage, if there is one."""
+        if self.next_stage is not None:
+            self.next_stage.put(item)
+
+    def stats(self) -> Dict[str, Any]:
+        """Get throughput statistics for this stage."""
+        with self._lock:
+            processed = self._processed
+            failed = self._failed
+            busy_seconds = self._busy_seconds
+        elapsed = time.time() - self._started_at if self._started_at else 0.0
+        completed = processed + failed
+        return {
+            "workers": self.workers,
+            "queue_depth": self.input_queue.qsize(),
+            "queue_size": self.input_queue.maxsize,
+            "processed": processed,
+            "failed": failed,
+            "avg_seconds": busy_seconds / completed if completed else 0.0,
+            "throughput_per_second": processed / elapsed if elapsed else 0.0,
+            # Fraction of the worker pool that was busy; close to 1.0 means the
+            # stage is saturated and would benefit from more workers.
+            "utilization": busy_seconds / (elapsed * self.workers) if elapsed else 0.0,
+        }
+
+    def _worker(self) -> None:
+        """Worker loop pulling items from the input queue."""
+        while not self.stop_event.is_set():
+            try:
+                item = self.input_queue.get(timeout=1)
+            except queue.Empty:
+                continue
+
+            pipeline_stage_queue_depth.labels(stage=self.name).set(self.input_queue.qsize())
+            start_time = time.time()
+            try:
+                result = self.handler(item)
+            except Exception as e:
+                self._record(time.time() - start_time, failed=True)
+                self.logger.error(f"Error in stage '{self.name}': {str(e)}")
+                if self.on_error is not None:
+                    self.on_error(self.name, item, e)
+            else:
+                self._record(time.time() - start_time, failed=False)
+                if result is not None:
+                    self.forward(result)
+            finally:
+                self.input_queue.task_done()
+
+    def _record(self, duration: float, failed: bool) -> None:
+        """Record the outcome of a single handler call."""
+        pipeline_stage_time.labels(stage=self.name).observe(duration)
+        with self._lock:
+            self._busy_seconds += duration
+            if failed:
+                self._failed += 1
+            else:
+                self._processed += 1
@@ -0,0 +1,209 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+import zlib
+import logging
+from typing import List, Optional, Tuple
+
+# Progress of a document through the processing stages, in order. A document
+# resumes after its last stage: a parsed one is chunked and embedded from the
+# stored text, and an upserted one, whose rows are all in the vector store,
+# only needs finalizing.
+QUEUED = "queued"
+PARSED = "parsed"
+UPSERTED = "upserted"
+STAGES = (QUEUED, PARSED, UPSERTED)
+
+# The original is archived alongside the processing stages and tracked separately
+UPLOADED = "uploaded"
+
+
+class DurableWorkQueue:
+    """SQLite record of the documents accepted by the pipeline and their progress.
+
+    A document is added when a source queues it and removed once it has been
+    completed. In between, the last stage it completed is stored, together
+    with its parsed text and whether the original was archived, so a
+    document interrupted by a crash or restart is queued again and skips
+    archiving and parsing that already happened.
+    Every start of a document counts as an attempt; a document that failed
+    or was interrupted ``max_attempts`` times is moved to the dead-letter table.
+    """
+    def __init__(self, db_path: str, max_attempts: int = 3):
+        self.db_path = db_path
+        self.max_attempts = max_attempts
+        self.session = uuid.uuid4().hex
+        self.logger = logging.getLogger(__name__)
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS work_items (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                path TEXT NOT NULL UNIQUE,
+                source TEXT NOT NULL,
+                doc_info TEXT NOT NULL,
+                stage TEXT NOT NULL,
+                uploaded INTEGER NOT NULL DEFAULT 0,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                last_error TEXT,
+                session TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                updated_at REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS parsed_content (
+                work_id INTEGER PRIMARY KEY,
+                content BLOB NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS dead_letter (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                path TEXT NOT NULL,
+                source TEXT NOT NULL,
+                doc_info TEXT NOT NULL,
+                stage TEXT NOT NULL,
+                attempts INTEGER NOT NULL,
+                error TEXT,
+                failed_at REAL NOT NULL
+            );
+        """)
+        # Earlier versions also recorded an "embedded" stage, which resumes like "parsed"
+        self._conn.execute("UPDATE work_items SET stage = ? WHERE stage = 'embedded'", (PARSED,))
+        self._conn.commit()
+
+    def add(self, doc_info: dict) -> bool:
+        """Record a newly queued document and set its ``work_id``.
+
+        Returns False if the same file is already waiting or in progress, in
+        which case it must not be queued a second time.
+        """
+        now = time.time()
+        with self._lock:
+            cursor = self._conn.execute(
+                "INSERT OR IGNORE INTO work_items "
+                "(path, source, doc_info, stage, session, created_at, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (os.path.abspath(doc_info["path"]), doc_info["source"], json.dumps(doc_info),
+                 QUEUED, self.session, now, now)
+            )
+            self._conn.commit()
+        if not cursor.rowcount:
+            return False
+        doc_info["work_id"] = cursor.lastrowid
+        return True
+
+    def start(self, work_id: int) -> Tuple[str, bool]:
+        """Count an attempt at processing a document.
+
+        Returns its last completed stage and whether the original was archived.
+        """
+        with self._lock:
+            self._conn.execute(
+                "UPDATE work_items SET attempts = attempts + 1, session = ?, updated_at = ? WHERE id = ?",
+                (self.session, time.time(), work_id)
+            )
+            self._conn.commit()
+            row = self._conn.execute("SELECT stage, uploaded FROM work_items WHERE id = ?", (work_id,)).fetchone()
+        return (row[0], bool(row[1])) if row is not None else (QUEUED, False)
+
+    def mark_stage(self, work_id: int, stage: str, content: Optional[str] = None) -> None:
+        """Record that a document completed a stage, keeping parsed text if given."""
+        with self._lock:
+            if content is not None:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO parsed_content (work_id, content) VALUES (?, ?)",
+                    (work_id, zlib.compress(content.encode('utf-8')))
+                )
+            if stage == UPLOADED:
+                self._conn.execute(
+                    "UPDATE work_items SET uploaded = 1, updated_at = ? WHERE id = ?", (time.time(), work_id)
+                )
+                self._conn.commit()
+                return
+            row = self._conn.execute("SELECT stage FROM work_items WHERE id = ?", (work_id,)).fetchone()
+            # Windows of a streamed document may finish out of order
+            if row is not None and STAGES.index(stage) > STAGES.index(row[0]):
+                self._conn.execute(
+                    "UPDATE work_items SET stage = ?, updated_at = ? WHERE id = ?",
+                    (stage, time.time(), work_id)
+                )
+            self._conn.commit()
+
+    def load_content(self, work_id: int) -> Optional[str]:
+        """Parsed text stored for a document, if it got that far."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT content FROM parsed_content WHERE work_id = ?", (work_id,)
+            ).fetchone()
+        return zlib.decompress(row[0]).decode('utf-8') if row is not None else None
+
+    def complete(self, work_id: int) -> None:
+        """Remove a document that was processed or skipped."""
+        with self._lock:
+            self._conn.execute("DELETE FROM work_items WHERE id = ?", (work_id,))
+            self._conn.execute("DELETE FROM parsed_content WHERE work_id = ?", (work_id,))
+            self._conn.commit()
+
+    def fail(self, work_id: int, error: str) -> Optional[dict]:
+        """Record a failed attempt.
+
+        Returns the document to queue again, or None once it has used up its
+        attempts and was moved to the dead-letter table.
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT path, source, doc_info, stage, attempts FROM work_items WHERE id = ?", (work_id,)
+            ).fetchone()
+            if row is None:
+                return None
+            path, source, doc_info, stage, attempts = row
+            if attempts < self.max_attempts:
+                self._conn.execute(
+                    "UPDATE work_items SET last_error = ?, updated_at = ? WHERE id = ?",
+                    (error, time.time(), work_id)
+                )
+                self._conn.commit()
+                return {**json.loads(doc_info), "work_id": work_id}
+
+            self._conn.execute(
+                "INSERT INTO dead_letter (path, source, doc_info, stage, attempts, error, failed_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (path, source, doc_info, stage, attempts, error, time.time())
+            )
+            self._conn.execute("DELETE FROM work_items WHERE id = ?", (work_id,))
+            self._conn.execute("DELETE FROM parsed_content WHERE work_id = ?", (work_id,))
+            self._conn.commit()
+        self.logger.warning(f"Moved {path} to the dead-letter table after {attempts} attempts: {error}")
+        return None
+
+    def unfinished(self) -> List[Tuple[dict, int]]:
+        """Documents left over from earlier runs, with their attempt counts, oldest first."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT id, doc_info, attempts FROM work_items WHERE session != ? ORDER BY id",
+                (self.session,)
+            ).fetchall()
+        return [({**json.loads(doc_info), "work_id": work_id}, attempts) for work_id, doc_info, attempts in rows]
+
+    def dead_letters(self) -> List[dict]:
+        """Documents that used up their attempts, most recent first."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT path, source, stage, attempts, error, failed_at FROM dead_letter ORDER BY id DESC"
+            ).fetchall()
+        return [
+            {"path": path, "source": source, "stage": stage, "attempts": attempts, "error": error, "failed_at": failed_at}
+            for path, source, stage, attempts, error, failed_at in rows
+        ]
+
+    def close(self) -> None:
+        """Close the work queue database."""
+        with self._lock:
+            self._conn.close()
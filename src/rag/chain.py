@@ -1,17 +1,15 @@
 import yaml
 import logging
+from functools import cached_property
 from typing import List, Dict
 
 from langchain_core.messages import HumanMessage, SystemMessage
 from langchain_openai import ChatOpenAI
 from langchain.chains.conversational_retrieval.base import ConversationalRetrievalChain
-import langchain.chat_models
-import langchain.chat_models.openai
 from langchain.memory import ConversationBufferMemory
 
 from .prompt_templates import QA_PROMPT, CONDENSE_QUESTION_PROMPT
 from .retrievers import DocumentRetriever
-from ..evaluation.rag_evaluation import RAGEvaluator
 
 class RAGChain:
     def __init__(self, config_path: str):
@@ -24,7 +22,12 @@ class RAGChain:
         
         # Create the chain
         self.chain = self._create_chain()
-        self.evaluator = RAGEvaluator()
+
+    @cached_property
+    def evaluator(self):
+        """Ragas evaluator, created on first use so serving never imports ragas."""
+        from ..evaluation.rag_evaluation import RAGEvaluator
+        return RAGEvaluator()
 
     def _initialize_llm(self):
         """Initialize the language model based on configuration."""
@@ -0,0 +1,22 @@
+from typing import List
+
+from langchain_core.embeddings import Embeddings
+
+from ..data.embedding_registry import get_embedding_model
+
+
+class RegistryEmbeddings(Embeddings):
+    """LangChain embeddings backed by the process-wide embedding model registry.
+
+    Retrieval embeds queries with the same loaded model instance as ingestion
+    in the same process, instead of loading a second copy of the weights.
+    """
+    def __init__(self, embedding_config: dict):
+        self.model = get_embedding_model(embedding_config, device=embedding_config.get('device'))
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        texts = [text.replace("\n", " ") for text in texts]
+        return self.model.encode(texts).tolist()
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.embed_documents([text])[0]
@@ -1,11 +1,12 @@
 import os
 from langchain_community.vectorstores import Milvus
-from langchain.embeddings import HuggingFaceEmbeddings
 import yaml
 import logging
 
 from dotenv import load_dotenv
 
+from .embeddings import RegistryEmbeddings
+
 load_dotenv()
 
 class DocumentRetriever:
@@ -13,10 +14,8 @@ class DocumentRetriever:
         with open(config_path, 'r') as f:
             self.config = yaml.safe_load(f)
             
-        # Initialize embeddings
-        self.embeddings = HuggingFaceEmbeddings(
-            model_name=self.config['embedding_model']['model_name']
-        )
+        # Initialize embeddings, sharing the model loaded by ingestion in this process
+        self.embeddings = RegistryEmbeddings(self.config['embedding_model'])
         
         # Initialize vector store
         self.vectorstore = Milvus(
@@ -0,0 +1,35 @@
+import hashlib
+import json
+from typing import Any
+
+HASH_BLOCK_SIZE = 1024 * 1024
+
+
+def hash_file(file_path: str) -> str:
+    """Compute the SHA-256 hex digest of a file, reading it in blocks."""
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for block in iter(lambda: f.read(HASH_BLOCK_SIZE), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def hash_bytes(data: bytes) -> str:
+    """Compute the SHA-256 hex digest of in-memory bytes."""
+    return hashlib.sha256(data).hexdigest()
+
+
+def hash_config(settings: Any) -> str:
+    """Compute a short stable fingerprint of a JSON-serializable settings object."""
+    payload = json.dumps(settings, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()[:16]
+
+
+def hash_text(text: str) -> str:
+    """Compute the SHA-256 hex digest of a text, e.g. a chunk's content."""
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+def shard_of(key: str, num_shards: int) -> int:
+    """Stable shard index of a key, e.g. a file path, across processes and hosts."""
+    return int(hash_text(key)[:8], 16) % num_shards
@@ -1,6 +1,7 @@
 import logging
 from src.pipeline.document_ingestion_pipeline import DocumentIngestionPipeline
 from src.pipeline.sources.source_folder import FolderSourceHandler
+from src.pipeline.sources.source_api import ApiSourceHandler
 
 if __name__ == "__main__":
     # Configure logging
@@ -17,6 +18,10 @@ if __name__ == "__main__":
     # Add a folder source handler
     folder_handler = FolderSourceHandler(pipeline.config, "documents/")
     pipeline.add_source_handler("folder", folder_handler)
+
+    # Accept documents pushed over HTTP
+    if pipeline.config['ingestion'].get('sources', {}).get('api', {}).get('enabled', False):
+        pipeline.add_source_handler("api", ApiSourceHandler(pipeline.config))
     
     logging.info("Start ingestion!")
     
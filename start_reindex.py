@@ -0,0 +1,47 @@
+import argparse
+import json
+import logging
+from src.pipeline.reindex import CollectionReindexer, SOURCES
+
+def main():
+    parser = argparse.ArgumentParser(description="Rebuild the vector collection and switch between its versions")
+    parser.add_argument('--config', default='config/config.yaml')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    build = commands.add_parser('build', help="build and validate a new version, then switch to it")
+    build.add_argument('--source', choices=SOURCES, default='chunks',
+                       help="re-embed the stored chunks, or ingest the archived originals again")
+    build.add_argument('--no-swap', action='store_true', help="keep serving the current version")
+    swap = commands.add_parser('swap', help="switch to a built version")
+    swap.add_argument('collection')
+    rollback = commands.add_parser('rollback', help="switch back to the previous version")
+    rollback.add_argument('--to', default=None, help="version to switch to instead of the previous one")
+    commands.add_parser('status', help="list the versions and the one in use")
+    cleanup = commands.add_parser('cleanup', help="drop old versions")
+    cleanup.add_argument('--keep', type=int, default=None)
+    args = parser.parse_args()
+
+    # Setup logging
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+
+    reindexer = CollectionReindexer(args.config)
+    if args.command == 'build':
+        result = reindexer.reindex(source=args.source, swap=not args.no_swap)
+    elif args.command == 'swap':
+        reindexer.swap(args.collection)
+        result = reindexer.status()
+    elif args.command == 'rollback':
+        reindexer.rollback(to=args.to)
+        result = reindexer.status()
+    elif args.command == 'cleanup':
+        result = {"dropped": reindexer.cleanup(keep=args.keep)}
+    else:
+        result = reindexer.status()
+    print(json.dumps(result, indent=2, default=str))
+    return 0 if result.get("passed", True) else 1
+
+if __name__ == "__main__":
+    raise SystemExit(main())
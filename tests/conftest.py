@@ -3,6 +3,14 @@ import yaml
 import os
 import tempfile
 
+from src.data.embedding_registry import embedding_registry
+
+@pytest.fixture(autouse=True)
+def clear_embedding_registry():
+    # Models loaded, or mocked, by one test are not shared with the next
+    yield
+    embedding_registry.clear()
+
 @pytest.fixture
 def test_config():
     config = {
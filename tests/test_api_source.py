@@ -0,0 +1,119 @@
+import os
+import queue
+import threading
+import pytest
+from fastapi.testclient import TestClient
+from src.pipeline.sources.source_api import ApiSourceHandler
+
+
+def make_handler(tmp_path, maxsize=0, **api_config):
+    config = {
+        'document_processor': {'supported_formats': ['txt', 'pdf']},
+        'ingestion': {'sources': {'api': {'queue_timeout_seconds': 0.05, **api_config}}}
+    }
+    handler = ApiSourceHandler(config, str(tmp_path / "spool"))
+    handler.set_processing_queue(queue.Queue(maxsize=maxsize))
+    return handler
+
+
+def drain(handler):
+    items = []
+    while not handler.processing_queue.empty():
+        items.append(handler.processing_queue.get())
+    return items
+
+
+def test_multipart_upload_spools_and_queues_documents(tmp_path):
+    handler = make_handler(tmp_path)
+    client = TestClient(handler.app)
+
+    response = client.post("/documents", data={"doc_id": "report-1"}, files=[
+        ("file", ("report.txt", b"first document", "text/plain")),
+        ("file", ("notes.txt", b"second document", "text/plain")),
+        ("file", ("image.png", b"not supported", "image/png")),
+    ])
+
+    assert response.status_code == 202
+    job = response.json()
+    assert job["status"] == "processing"
+    assert job["counts"] == {"queued": 2, "rejected": 1}
+
+    items = drain(handler)
+    assert [item["doc_id"] for item in items] == ["report-1", "notes.txt"]
+    assert all(item["source"] == "api" and item["job_id"] == job["job_id"] for item in items)
+    with open(items[0]["path"], "rb") as f:
+        assert f.read() == b"first document"
+
+
+def test_streamed_upload_and_job_status(tmp_path):
+    handler = make_handler(tmp_path)
+    client = TestClient(handler.app)
+
+    response = client.put("/documents/doc-42?filename=paper.pdf", content=iter([b"%PDF-", b"body"]))
+    assert response.status_code == 202
+    job_id = response.json()["job_id"]
+
+    [doc_info] = drain(handler)
+    assert doc_info["doc_id"] == "doc-42"
+    assert os.path.basename(doc_info["path"]).endswith("paper.pdf")
+    assert os.path.getsize(doc_info["path"]) == 9
+
+    handler.on_document_complete(doc_info, success=True)
+    status = client.get(f"/jobs/{job_id}").json()
+    assert status["status"] == "completed"
+    assert status["documents"][0]["status"] == "processed"
+    # Nothing of the job is left in the spool
+    assert not os.path.exists(os.path.dirname(doc_info["path"]))
+
+    assert client.get("/jobs/unknown").status_code == 404
+
+
+def test_upload_rejected_when_queue_is_full(tmp_path):
+    handler = make_handler(tmp_path, max_queue_depth=1)
+    handler.processing_queue.put({"source": "api", "path": "waiting.txt"})
+    client = TestClient(handler.app)
+
+    response = client.put("/documents/doc-1?filename=a.txt", content=b"data")
+
+    assert response.status_code == 429
+    assert "Retry-After" in response.headers
+    assert handler.processing_queue.qsize() == 1
+
+
+def test_oversized_document_is_discarded(tmp_path):
+    handler = make_handler(tmp_path, max_document_mb=1 / 1024)
+    client = TestClient(handler.app)
+
+    response = client.post("/documents", files=[("file", ("big.txt", b"x" * 4096, "text/plain"))])
+
+    assert response.status_code == 413
+    assert handler.processing_queue.empty()
+    assert os.listdir(tmp_path / "spool") == []
+
+
+def test_doc_id_may_contain_slashes(tmp_path):
+    handler = make_handler(tmp_path)
+    client = TestClient(handler.app)
+
+    response = client.put("/documents/reports/2024/q1.pdf", content=b"%PDF-")
+
+    assert response.status_code == 202
+    [doc_info] = drain(handler)
+    assert doc_info["doc_id"] == "reports/2024/q1.pdf"
+    assert os.path.basename(doc_info["path"]).endswith("q1.pdf")
+
+
+def test_document_not_queued_before_shutdown_is_rejected(tmp_path):
+    handler = make_handler(tmp_path, maxsize=1, max_queue_depth=2)
+    handler.processing_queue.put({"source": "api", "path": "waiting.txt"})
+    client = TestClient(handler.app)
+    threading.Timer(0.2, handler.should_stop.set).start()
+
+    response = client.put("/documents/doc-1?filename=a.txt", content=b"data")
+
+    assert response.status_code == 503
+    job_id = response.json()["detail"].split("job ")[1].rstrip(")")
+    status = client.get(f"/jobs/{job_id}").json()
+    assert status["status"] == "completed_with_errors"
+    assert status["documents"][0]["status"] == "rejected"
+    assert os.listdir(tmp_path / "spool") == []
@@ -0,0 +1,57 @@
+from src.data.chunk_diff import ChunkDiff
+from src.utils.hashing import hash_text
+
+
+def stored(*chunks):
+    return [
+        {'id': 100 + i, 'chunk_hash': hash_text(chunk), 'chunk_index': i}
+        for i, chunk in enumerate(chunks)
+    ]
+
+
+def test_unchanged_document():
+    diff = ChunkDiff(stored("a", "b", "c"))
+
+    new_chunks, indices = diff.filter_new(["a", "b", "c"])
+
+    assert new_chunks == [] and indices == []
+    assert diff.unchanged == 3
+    assert diff.stale_ids() == []
+
+
+def test_edited_document():
+    diff = ChunkDiff(stored("a", "b", "c"))
+
+    new_chunks, indices = diff.filter_new(["a", "b2", "c", "d"])
+
+    assert new_chunks == ["b2", "d"]
+    assert indices == [1, 3]
+    assert diff.stale_ids() == [101]
+
+
+def test_duplicate_chunks_are_matched_once():
+    diff = ChunkDiff(stored("a", "a"))
+
+    new_chunks, _ = diff.filter_new(["a", "a", "a"])
+
+    assert new_chunks == ["a"]
+    assert diff.stale_ids() == []
+
+
+def test_windows():
+    diff = ChunkDiff(stored("a", "b", "c", "d"))
+
+    assert diff.filter_new(["a", "x"], start_index=0) == (["x"], [1])
+    assert diff.filter_new(["c"], start_index=2) == ([], [])
+
+    assert sorted(diff.stale_ids()) == [101, 103]
+
+
+def test_shifted_chunks_are_renumbered():
+    diff = ChunkDiff(stored("a", "b", "c"))
+
+    new_chunks, indices = diff.filter_new(["new", "a", "b", "c"])
+
+    assert new_chunks == ["new"] and indices == [0]
+    assert diff.moved_chunks() == {100: 1, 101: 2, 102: 3}
+    assert diff.stale_ids() == []
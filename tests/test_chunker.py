@@ -0,0 +1,87 @@
+import re
+
+import pytest
+
+from src.data.chunker import TextChunker
+
+
+def word_offsets(text):
+    """Stand-in tokenizer: every word is one token."""
+    return [match.span() for match in re.finditer(r"\S+", text)]
+
+
+@pytest.fixture
+def markdown_text():
+    sections = []
+    for i in range(20):
+        lines = "\n".join(f"- item {j} of section {i} with a few words" for j in range(5))
+        sections.append(f"# Section {i}\n\nSome introduction text for section {i}. " * 3 + "\n\n" + lines)
+    return "\n\n".join(sections)
+
+
+def test_offsets_match_chunk_text(markdown_text):
+    chunker = TextChunker(chunk_size=200, chunk_overlap=20)
+
+    offsets = chunker.split_offsets(markdown_text)
+
+    assert chunker.split_text(markdown_text) == [markdown_text[start:end] for start, end in offsets]
+    assert all(0 < end - start <= 200 for start, end in offsets)
+    assert all(not markdown_text[start].isspace() and not markdown_text[end - 1].isspace() for start, end in offsets)
+    # Consecutive chunks move forward and together cover all non-whitespace text
+    assert all(a[0] < b[0] for a, b in zip(offsets, offsets[1:]))
+    covered = set()
+    for start, end in offsets:
+        covered.update(range(start, end))
+    assert all(i in covered for i, char in enumerate(markdown_text) if not char.isspace())
+
+
+def test_prefers_paragraph_boundaries():
+    text = "first paragraph.\n\nsecond paragraph that is longer\nwith two lines."
+    chunker = TextChunker(chunk_size=40)
+
+    assert chunker.split_text(text) == ["first paragraph.", "second paragraph that is longer", "with two lines."]
+
+
+def test_overlap_starts_at_separator():
+    text = " ".join(f"word{i}" for i in range(50))
+    chunker = TextChunker(chunk_size=30, chunk_overlap=12)
+
+    chunks = chunker.split_text(text)
+
+    assert all(len(chunk) <= 30 for chunk in chunks)
+    for previous, chunk in zip(chunks, chunks[1:]):
+        first_word = chunk.split()[0]
+        assert first_word in previous.split()
+
+
+def test_cuts_text_without_separators():
+    chunker = TextChunker(chunk_size=10)
+
+    assert chunker.split_text("x" * 25) == ["x" * 10, "x" * 10, "x" * 5]
+
+
+def test_token_length_mode():
+    text = "\n\n".join(" ".join(f"w{p}_{i}" for i in range(30)) for p in range(4))
+    calls = []
+
+    def counting_offsets(paragraph):
+        calls.append(paragraph)
+        return word_offsets(paragraph)
+
+    chunker = TextChunker(chunk_size=16, chunk_overlap=4, length_mode="tokens", token_offsets=counting_offsets)
+
+    chunks = chunker.split_text(text)
+
+    assert all(len(chunk.split()) <= 16 for chunk in chunks)
+    assert chunker.length(chunks[0]) == len(chunks[0].split())
+    # Paragraphs are tokenized once and then served from the cache
+    tokenized = len(calls)
+    chunker.split_text(text)
+    assert len(calls) == tokenized
+
+
+def test_invalid_settings():
+    with pytest.raises(ValueError):
+        TextChunker(chunk_size=10, chunk_overlap=10)
+    with pytest.raises(ValueError):
+        TextChunker(chunk_size=10, length_mode="tokens")
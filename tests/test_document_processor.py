@@ -1,9 +1,11 @@
 import pytest
+import numpy as np
+import yaml
 from unittest.mock import MagicMock, patch
 from src.data.document_processor import DocumentProcessor
 
 @pytest.fixture
-def doc_processor(test_config):
+def doc_processor(test_config, mocked_env):
     with patch('src.data.document_processor.SentenceTransformer') as mock_transformer, \
          patch('src.data.document_processor.LlamaParse') as mock_parser:
         processor = DocumentProcessor(test_config)
@@ -39,3 +41,70 @@ def test_process_document(doc_processor, sample_document):
     assert len(result) > 0
     assert all(isinstance(item, dict) for item in result)
     assert all(key in result[0] for key in ['content', 'embedding', 'metadata'])
+
+def test_iter_chunk_windows(doc_processor):
+    doc_processor.stream_window_chunks = 4
+    doc_processor.stream_buffer_chars = 2000
+    pages = [f"Page {i}. " + "Some sentence on this page. " * 40 for i in range(10)]
+
+    windows = list(doc_processor.iter_chunk_windows(iter(pages)))
+
+    assert all(len(chunks) <= 4 for _, chunks in windows)
+    assert [start for start, _ in windows] == [i * 4 for i in range(len(windows))]
+    streamed = [chunk for _, chunks in windows for chunk in chunks]
+    assert all(len(chunk) <= doc_processor.chunk_size for chunk in streamed)
+    assert "Page 0." in streamed[0] and "Page 9." in "".join(streamed)
+
+def test_embed_chunks_returns_chunk_batch(doc_processor):
+    doc_processor._generate_embeddings = MagicMock(return_value=[[0.1, 0.2], [0.3, 0.4]])
+
+    batch = doc_processor.embed_chunks(["chunk1", "chunk2"], start_index=10)
+
+    assert len(batch) == 2
+    assert batch.embeddings.dtype == np.float32
+    assert batch.embeddings.shape == (2, 2)
+    assert batch.chunk_ids.tolist() == [10, 11]
+
+def test_embed_chunks_with_doc_id(doc_processor):
+    doc_processor._generate_embeddings = MagicMock(return_value=[[0.1, 0.2], [0.3, 0.4]])
+
+    batch = doc_processor.embed_chunks(["chunk1", "chunk2"], chunk_ids=[2, 5], doc_id="doc.pdf")
+
+    assert batch.chunk_ids.tolist() == [2, 5]
+    assert batch.metadata['doc_id'].tolist() == ["doc.pdf", "doc.pdf"]
+    assert batch.metadata['chunk_hash'][0] != batch.metadata['chunk_hash'][1]
+
+def test_process_pool_backend_does_not_load_model_in_parent(test_config, mocked_env):
+    with open(test_config) as f:
+        config = yaml.safe_load(f)
+    config['embedding_model']['backend'] = 'process_pool'
+    with open(test_config, 'w') as f:
+        yaml.dump(config, f)
+
+    with patch('src.data.document_processor.EmbeddingProcessPool') as pool_class, \
+         patch('src.data.document_processor.get_embedding_model') as get_model:
+        pool_class.return_value.dimension = 384
+        processor = DocumentProcessor(test_config)
+
+        assert processor.embedding_dimension == 384
+        get_model.assert_not_called()
+        pool_class.return_value.start.assert_called_once()
+
+def test_config_fingerprint_covers_parsers_and_embedding_backend(test_config, mocked_env):
+    def fingerprint(update):
+        with open(test_config) as f:
+            config = yaml.safe_load(f)
+        update(config)
+        with open(test_config, 'w') as f:
+            yaml.dump(config, f)
+        with patch('src.data.document_processor.get_embedding_model'):
+            return DocumentProcessor(test_config).config_fingerprint
+
+    base = fingerprint(lambda config: None)
+    assert fingerprint(lambda config: None) == base
+    routed = fingerprint(lambda config: config['document_processor'].update(parsers={'routes': {'pdf': 'llamaparse'}}))
+    assert routed != base
+    onnx = fingerprint(lambda config: config['embedding_model'].update(backend='onnx'))
+    assert onnx not in (base, routed)
+    quantized = fingerprint(lambda config: config['embedding_model'].update(onnx={'quantization': 'avx2'}))
+    assert quantized not in (base, routed, onnx)
@@ -0,0 +1,56 @@
+import threading
+import numpy as np
+import pytest
+from src.data.embedding_batcher import EmbeddingBatcher
+
+def fake_encode(texts):
+    return np.array([[float(len(text)), 1.0] for text in texts], dtype=np.float32)
+
+@pytest.fixture
+def batcher():
+    calls = []
+
+    def encode(texts):
+        calls.append(list(texts))
+        return fake_encode(texts)
+
+    batcher = EmbeddingBatcher(encode, max_batch_size=4, max_wait_time=0.05)
+    batcher.calls = calls
+    batcher.start()
+    yield batcher
+    batcher.stop()
+
+def test_results_are_returned_in_order(batcher):
+    texts = ["a", "bb", "ccc", "dddd", "eeeee", "ffffff"]
+    embeddings = batcher.embed(texts)
+    np.testing.assert_array_equal(embeddings, fake_encode(texts))
+    assert all(len(call) <= 4 for call in batcher.calls)
+
+def test_chunks_from_documents_share_batches(batcher):
+    documents = [["x" * (i + 1)] for i in range(8)]
+    results = [None] * len(documents)
+
+    def submit(i):
+        results[i] = batcher.embed(documents[i])
+
+    threads = [threading.Thread(target=submit, args=(i,)) for i in range(len(documents))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    for document, embeddings in zip(documents, results):
+        np.testing.assert_array_equal(embeddings, fake_encode(document))
+    assert len(batcher.calls) < len(documents)
+
+def test_encode_errors_propagate():
+    def encode(texts):
+        raise RuntimeError("model failure")
+
+    batcher = EmbeddingBatcher(encode, max_batch_size=4, max_wait_time=0.01)
+    batcher.start()
+    try:
+        with pytest.raises(RuntimeError):
+            batcher.embed(["text"])
+    finally:
+        batcher.stop()
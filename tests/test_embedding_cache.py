@@ -0,0 +1,43 @@
+import time
+import numpy as np
+import pytest
+from src.data.embedding_cache import EmbeddingCache
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = EmbeddingCache(str(tmp_path / "cache.db"), model_name="test-model", max_entries=10)
+    yield cache
+    cache.close()
+
+def test_miss_then_hit(cache):
+    assert cache.get_many(["license text"]) == [None]
+
+    cache.put_many(["license text"], np.array([[0.1, 0.2, 0.3]], dtype=np.float32))
+    result = cache.get_many(["license text"])
+
+    np.testing.assert_allclose(result[0], [0.1, 0.2, 0.3])
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+def test_whitespace_is_normalized(cache):
+    cache.put_many(["Copyright  2024\nAll rights reserved"], np.ones((1, 2), dtype=np.float32))
+    assert cache.get_many(["Copyright 2024 All rights reserved"])[0] is not None
+
+def test_entries_are_scoped_by_model(cache, tmp_path):
+    cache.put_many(["header"], np.ones((1, 2), dtype=np.float32))
+    other = EmbeddingCache(str(tmp_path / "cache.db"), model_name="other-model")
+    assert other.get_many(["header"]) == [None]
+    other.close()
+
+def test_size_bounded_eviction(cache):
+    cache.put_many([f"old {i}" for i in range(5)], np.ones((5, 2), dtype=np.float32))
+    time.sleep(0.01)
+    cache.put_many([f"new {i}" for i in range(5)], np.ones((5, 2), dtype=np.float32))
+    time.sleep(0.01)
+    cache.get_many(["old 0"])  # recently used entries are kept
+    time.sleep(0.01)
+    cache.put_many(["newest 0", "newest 1"], np.ones((2, 2), dtype=np.float32))
+
+    assert cache.stats()["entries"] <= 10
+    assert cache.get_many(["old 0"])[0] is not None
+    assert cache.get_many(["old 1"])[0] is None
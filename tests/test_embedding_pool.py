@@ -0,0 +1,48 @@
+import numpy as np
+import pytest
+from src.data.embedding_pool import EmbeddingProcessPool
+
+DIMENSION = 4
+
+
+class FakeModel:
+    """Deterministic stand-in for a SentenceTransformer, loaded in the worker processes."""
+    def get_sentence_embedding_dimension(self):
+        return DIMENSION
+
+    def encode(self, texts, batch_size=32):
+        if "fail" in texts:
+            raise ValueError("cannot encode")
+        return np.array([[len(text), i, 0.5, -1.0] for i, text in enumerate(texts)], dtype=np.float32)
+
+
+def load_fake_model(model_name):
+    return FakeModel()
+
+
+@pytest.fixture(scope="module")
+def pool():
+    pool = EmbeddingProcessPool("fake-model", num_workers=2, threads_per_worker=1, shard_size=3,
+                                model_factory=load_fake_model)
+    pool.start()
+    yield pool
+    pool.close()
+
+
+def test_pool_encodes_shards_in_order(pool):
+    texts = [f"text {'x' * i}" for i in range(10)]
+
+    embeddings = pool.encode(texts)
+
+    assert embeddings.shape == (10, DIMENSION)
+    assert embeddings.dtype == np.float32
+    assert embeddings[:, 0].tolist() == [len(text) for text in texts]
+    # Position within each shard of at most three texts
+    assert embeddings[:, 1].tolist() == [0, 1, 2, 0, 1, 2, 0, 1, 2, 0]
+
+
+def test_worker_errors_are_raised(pool):
+    with pytest.raises(RuntimeError, match="cannot encode"):
+        pool.encode(["ok", "fail"])
+    # The worker stays usable
+    assert pool.encode(["ok"]).shape == (1, DIMENSION)
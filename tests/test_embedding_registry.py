@@ -0,0 +1,73 @@
+import threading
+import time
+import numpy as np
+import yaml
+from unittest.mock import patch, MagicMock
+from src.data.document_processor import DocumentProcessor
+from src.data.embedding_registry import EmbeddingModelRegistry, get_embedding_model
+from src.rag.embeddings import RegistryEmbeddings
+
+def test_registry_loads_each_key_once():
+    registry = EmbeddingModelRegistry()
+    loads = []
+
+    def loader():
+        loads.append(1)
+        time.sleep(0.05)
+        return object()
+
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(registry.get("model", "torch", None, loader)))
+        for _ in range(8)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(loads) == 1
+    assert all(result is results[0] for result in results)
+    assert registry.get("model", "torch", "cpu", object) is not results[0]
+
+def test_processor_and_retriever_share_model():
+    model = MagicMock()
+    model.encode.return_value = np.array([[0.1, 0.2]], dtype=np.float32)
+    config = {"model_name": "all-MiniLM-L6-v2"}
+
+    with patch('src.data.embedding_registry._load_sentence_transformer', return_value=model) as load:
+        shared = get_embedding_model(config)
+        embeddings = RegistryEmbeddings(config)
+        query_embedding = embeddings.embed_query("what is\nthis")
+
+    load.assert_called_once()
+    assert embeddings.model is shared
+    model.encode.assert_called_once_with(["what is this"])
+    assert query_embedding == [np.float32(0.1), np.float32(0.2)]
+
+def test_onnx_backend_uses_validated_export():
+    config = {"model_name": "all-MiniLM-L6-v2", "backend": "onnx", "onnx": {"quantization": "avx2"}}
+
+    with patch('src.data.embedding_registry.prepare_onnx_model', return_value=("dir", "onnx/model_qint8_avx2.onnx")), \
+         patch('src.data.embedding_registry.load_onnx_model') as load:
+        model = get_embedding_model(config)
+        assert get_embedding_model(config) is model
+
+    load.assert_called_once_with("dir", "onnx/model_qint8_avx2.onnx", num_threads=None)
+
+def test_devices_from_config_get_separate_models(test_config, mocked_env):
+    with open(test_config) as f:
+        config = yaml.safe_load(f)
+    config['embedding_model']['device'] = 'cuda'
+    with open(test_config, 'w') as f:
+        yaml.dump(config, f)
+
+    with patch('src.data.embedding_registry._load_sentence_transformer', side_effect=lambda *args, **kwargs: MagicMock()), \
+         patch('src.data.document_processor.SentenceTransformer', side_effect=lambda *args, **kwargs: MagicMock()) as load:
+        processor = DocumentProcessor(test_config)
+        retriever_embeddings = RegistryEmbeddings(config['embedding_model'])
+        cpu_embeddings = RegistryEmbeddings({**config['embedding_model'], 'device': 'cpu'})
+
+    load.assert_called_once_with(config['embedding_model']['model_name'], device='cuda')
+    assert retriever_embeddings.model is processor.embedding_model
+    assert cpu_embeddings.model is not processor.embedding_model
@@ -0,0 +1,97 @@
+import pytest
+import yaml
+from unittest.mock import patch, MagicMock
+
+from src.ml.experiment import ExperimentManager
+
+
+@pytest.fixture
+def mock_mlflow(monkeypatch):
+    monkeypatch.setenv("MLFLOW_TRACKING_URI", "http://localhost:5000")
+    with patch('src.ml.experiment.mlflow') as mlflow:
+        mlflow.get_experiment_by_name.return_value.experiment_id = "1"
+        client = MagicMock()
+        client.create_run.side_effect = lambda *args, **kwargs: MagicMock(**{"info.run_id": kwargs["run_name"]})
+        mlflow.tracking.MlflowClient.return_value = client
+        yield client
+
+
+def make_manager(test_config, logging_config):
+    with open(test_config) as f:
+        config = yaml.safe_load(f)
+    config['mlflow']['logging'] = logging_config
+    with open(test_config, 'w') as f:
+        yaml.dump(config, f)
+    return ExperimentManager(test_config)
+
+
+def logged(client, run_id):
+    """Metrics and params logged for a run, keyed by name."""
+    metrics, params = [], []
+    for call in client.log_batch.call_args_list:
+        if call.args[0] == run_id:
+            metrics.extend(call.kwargs['metrics'])
+            params.extend(call.kwargs['params'])
+    return metrics, {param.key: param.value for param in params}
+
+
+def test_sync_run(test_config, mock_mlflow):
+    manager = make_manager(test_config, {})
+
+    manager.log_run("process_a.pdf", {"chunk_size": 500}, {"num_chunks": 3})
+
+    metrics, params = logged(mock_mlflow, "process_a.pdf")
+    assert params == {"chunk_size": "500"}
+    assert [(metric.key, metric.value) for metric in metrics] == [("num_chunks", 3.0)]
+    mock_mlflow.set_terminated.assert_called_once()
+
+
+def test_background_runs_are_written_on_flush(test_config, mock_mlflow):
+    manager = make_manager(test_config, {"mode": "background"})
+
+    for i in range(3):
+        manager.log_run(f"process_{i}.pdf", {"source": "folder"}, {"num_chunks": i})
+    manager.close()
+
+    assert mock_mlflow.create_run.call_count == 3
+    assert mock_mlflow.set_terminated.call_count == 3
+
+
+def test_aggregate_run(test_config, mock_mlflow):
+    manager = make_manager(test_config, {"mode": "background", "aggregate": {"enabled": True, "batch_size": 4}})
+
+    for i in range(4):
+        source = "folder" if i < 3 else "api"
+        manager.log_run(f"process_{i}.pdf", {"chunk_size": 500, "source": source}, {"num_chunks": i + 1})
+    manager.flush()
+
+    mock_mlflow.create_run.assert_called_once()
+    run_id = mock_mlflow.create_run.call_args.kwargs["run_name"]
+    assert run_id.startswith("ingestion_batch_")
+    metrics, params = logged(mock_mlflow, run_id)
+    assert params == {"num_documents": "4", "chunk_size": "500", "source": "api,folder"}
+    summary = {metric.key: metric.value for metric in metrics if metric.key != "num_chunks"}
+    assert summary["num_chunks_count"] == 4
+    assert summary["num_chunks_mean"] == 2.5
+    assert summary["num_chunks_max"] == 4
+    # Per-document values are kept as a series, one step per document
+    assert sorted(metric.step for metric in metrics if metric.key == "num_chunks") == [0, 1, 2, 3]
+    manager.close()
+    mock_mlflow.create_run.assert_called_once()
+
+
+def test_partial_aggregate_is_written_on_close(test_config, mock_mlflow):
+    manager = make_manager(test_config, {"aggregate": {"enabled": True, "batch_size": 10}})
+
+    manager.log_run("process_a.pdf", {}, {"num_chunks": 1})
+    mock_mlflow.create_run.assert_not_called()
+    manager.close()
+
+    mock_mlflow.create_run.assert_called_once()
+
+
+def test_logging_errors_are_not_raised(test_config, mock_mlflow):
+    mock_mlflow.create_run.side_effect = RuntimeError("tracking server down")
+    manager = make_manager(test_config, {})
+
+    manager.log_run("process_a.pdf", {}, {"num_chunks": 1})
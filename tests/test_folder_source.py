@@ -0,0 +1,158 @@
+import os
+import queue
+import time
+import pytest
+from src.pipeline.sources.source_folder import FolderSourceHandler
+
+
+def make_handler(tmp_path, **folder_config):
+    config = {
+        'document_processor': {'supported_formats': ['txt', 'pdf']},
+        'ingestion': {'sources': {'folder': {'debounce_seconds': 0.2, 'poll_interval_seconds': 0.05, **folder_config}}}
+    }
+    handler = FolderSourceHandler(config, str(tmp_path / "docs"))
+    handler.set_processing_queue(queue.Queue())
+    return handler
+
+
+def queued_paths(handler):
+    paths = []
+    while not handler.processing_queue.empty():
+        paths.append(handler.processing_queue.get()["path"])
+    return sorted(paths)
+
+
+def write(path, content="content", age=10):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(content)
+    mtime = time.time() - age
+    os.utime(path, (mtime, mtime))
+    return str(path)
+
+
+def test_recursive_scan_skips_excluded_and_unsupported(tmp_path):
+    docs = tmp_path / "docs"
+    expected = [write(docs / "a.txt"), write(docs / "nested" / "deeper" / "b.pdf")]
+    write(docs / "processed" / "done.txt")
+    write(docs / "nested" / "error" / "failed.txt")
+    write(docs / "image.png")
+    handler = make_handler(tmp_path)
+
+    handler._process_existing_files()
+
+    assert queued_paths(handler) == sorted(expected)
+
+
+def test_file_is_queued_once_stable(tmp_path):
+    docs = tmp_path / "docs"
+    docs.mkdir()
+    handler = make_handler(tmp_path)
+    path = docs / "growing.txt"
+    path.write_text("part")
+
+    handler.handle_new_file(str(path))
+    handler._enqueue_stable_files()
+    assert handler.processing_queue.empty()
+
+    # Still being written: the debounce window starts again
+    time.sleep(0.15)
+    path.write_text("part and more")
+    handler.handle_new_file(str(path))
+    time.sleep(0.1)
+    handler._enqueue_stable_files()
+    assert handler.processing_queue.empty()
+
+    time.sleep(0.2)
+    handler._enqueue_stable_files()
+    assert queued_paths(handler) == [str(path)]
+
+
+def test_events_in_excluded_folders_are_ignored(tmp_path):
+    docs = tmp_path / "docs"
+    handler = make_handler(tmp_path)
+
+    handler.handle_new_file(write(docs / "processed" / "a.txt"))
+
+    assert not handler._pending
+
+
+def complete(handler, path):
+    """Move a file out of the tree as the pipeline does, then report it finished."""
+    processed = os.path.join(os.path.dirname(path), "processed")
+    os.makedirs(processed, exist_ok=True)
+    os.rename(path, os.path.join(processed, os.path.basename(path)))
+    handler.on_document_complete({"path": path}, success=True)
+
+
+def test_checkpoint_queues_each_file_once_per_run(tmp_path):
+    docs = tmp_path / "docs"
+    done = write(docs / "done.txt")
+    unfinished = write(docs / "unfinished.txt")
+
+    handler = make_handler(tmp_path)
+    handler._process_existing_files()
+    assert queued_paths(handler) == sorted([done, unfinished])
+    # Seen again in the same run, e.g. through a file system event
+    handler._enqueue(unfinished, os.path.getsize(unfinished), os.path.getmtime(unfinished))
+    assert handler.processing_queue.empty()
+    complete(handler, done)
+    # Only files still in flight are kept
+    assert len(handler.checkpoint) == 1
+
+    # Nothing is persisted: a new run queues every file left in the tree
+    restarted = make_handler(tmp_path)
+    restarted._process_existing_files()
+    assert queued_paths(restarted) == [unfinished]
+
+
+def test_changed_file_is_queued_again(tmp_path):
+    docs = tmp_path / "docs"
+    path = write(docs / "doc.txt")
+    handler = make_handler(tmp_path)
+    handler._process_existing_files()
+    assert queued_paths(handler) == [path]
+
+    write(docs / "doc.txt", content="new content", age=5)
+    handler._process_existing_files()
+
+    assert queued_paths(handler) == [path]
+
+
+def test_start_and_stop_watch_new_files(tmp_path):
+    docs = tmp_path / "docs"
+    docs.mkdir()
+    handler = make_handler(tmp_path)
+    handler.start()
+    try:
+        (docs / "sub").mkdir()
+        time.sleep(0.1)
+        (docs / "sub" / "new.txt").write_text("hello")
+        item = handler.processing_queue.get(timeout=5)
+    finally:
+        handler.stop()
+
+    assert item == {"source": "folder", "path": str(docs / "sub" / "new.txt"), "doc_id": "sub/new.txt"}
+
+
+def test_pending_documents_are_split_into_shards(tmp_path):
+    docs = tmp_path / "docs"
+    paths = [write(docs / f"doc{i}.txt") for i in range(8)] + [write(docs / "nested" / "doc.pdf")]
+    write(docs / "fresh.txt", age=0)
+    handler = make_handler(tmp_path)
+
+    shards = [[doc["path"] for doc in handler.pending_documents(shard, 3)] for shard in range(3)]
+
+    assert sorted(path for shard in shards for path in shard) == sorted(paths)
+    assert sum(len(shard) for shard in shards) == len(paths)
+
+
+def test_pending_documents_skip_completed_files(tmp_path):
+    docs = tmp_path / "docs"
+    done, pending = write(docs / "done.txt"), write(docs / "pending.txt")
+    handler = make_handler(tmp_path)
+    assert len(list(handler.pending_documents())) == 2
+    assert list(handler.pending_documents()) == []
+    complete(handler, done)
+
+    restarted = make_handler(tmp_path)
+    assert [doc["path"] for doc in restarted.pending_documents()] == [pending]
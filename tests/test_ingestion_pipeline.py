@@ -0,0 +1,211 @@
+import time
+from concurrent.futures import Future
+import numpy as np
+import pytest
+from unittest.mock import MagicMock, patch
+from src.data.chunk_batch import ChunkBatch
+from src.data.document_processor import DocumentProcessor
+from src.utils.hashing import hash_bytes
+from src.pipeline.manifest import IngestionManifest
+from src.pipeline.document_ingestion_pipeline import DocumentIngestionPipeline, archive_object_name
+from src.pipeline.sources.base import SourceHandler
+from src.pipeline.sources.source_folder import FolderSourceHandler
+from src.pipeline.work_queue import DurableWorkQueue
+
+@pytest.fixture
+def pipeline(test_config, mocked_env):
+    with patch('src.pipeline.document_ingestion_pipeline.DocumentProcessor'), \
+         patch('src.pipeline.document_ingestion_pipeline.VectorStore'), \
+         patch('src.pipeline.document_ingestion_pipeline.ObjectStore'), \
+         patch('src.pipeline.document_ingestion_pipeline.ExperimentManager'):
+        pipeline = DocumentIngestionPipeline(test_config)
+        yield pipeline
+        pipeline.upload_executor.shutdown(wait=True)
+
+def test_file_is_read_once_for_hash_archive_and_parse(pipeline, tmp_path):
+    pipeline.manifest = IngestionManifest(str(tmp_path / "manifest.db"))
+    pipeline.document_processor.config_fingerprint = "fingerprint"
+    pipeline.document_processor.parse_document.return_value = "document content"
+    path = tmp_path / "doc.txt"
+    path.write_text("document content")
+
+    with patch("builtins.open", wraps=open) as opened:
+        doc_info = pipeline._upload_stage({"source": "folder", "path": str(path)})
+        doc_info = pipeline._parse_stage(doc_info)
+        doc_info["upload"].result()
+
+    assert [call.args[0] for call in opened.call_args_list].count(str(path)) == 1
+    assert doc_info["content_hash"] == hash_bytes(b"document content")
+    pipeline.object_store.put_bytes.assert_called_once_with(
+        b"document content", "doc.txt", "text/plain", {"doc-id": "doc.txt", "file-name": "doc.txt"}
+    )
+    assert pipeline.document_processor.parse_document.call_args.kwargs["bytes"] == b"document content"
+    # The buffer is not kept once the document is parsed
+    assert "file_bytes" not in doc_info
+    pipeline.manifest.close()
+
+def test_same_file_name_in_different_folders(pipeline, test_config, tmp_path):
+    docs = tmp_path / "docs"
+    for folder in ("a", "b"):
+        (docs / folder).mkdir(parents=True)
+        (docs / folder / "report.pdf").write_bytes(folder.encode())
+    config = {'document_processor': {'supported_formats': ['pdf']},
+              'ingestion': {'sources': {'folder': {'debounce_seconds': 0}}}}
+    source = FolderSourceHandler(config, str(docs))
+
+    doc_infos = [pipeline._upload_stage(doc_info) for doc_info in source.pending_documents()]
+    for doc_info in doc_infos:
+        doc_info["upload"].result()
+        pipeline._handle_processed_file(doc_info)
+
+    assert sorted(doc_info["doc_id"] for doc_info in doc_infos) == ["a/report.pdf", "b/report.pdf"]
+    archived = sorted(call.args[1] for call in pipeline.object_store.put_bytes.call_args_list)
+    assert archived == ["a/report.pdf", "b/report.pdf"]
+    assert (docs / "a" / "processed" / "report.pdf").read_bytes() == b"a"
+    assert (docs / "b" / "processed" / "report.pdf").read_bytes() == b"b"
+
+def test_api_upload_is_archived_under_its_doc_id(pipeline, tmp_path):
+    path = tmp_path / "000000_report.pdf"
+    path.write_bytes(b"pdf")
+
+    doc_info = pipeline._upload_stage(
+        {"source": "api", "path": str(path), "doc_id": "reports/q1 2024", "file_name": "report.pdf", "spooled": True}
+    )
+    doc_info["upload"].result()
+
+    pipeline.object_store.put_bytes.assert_called_once_with(
+        b"pdf", "reports/q1 2024", "application/pdf",
+        {"doc-id": "reports%2Fq1%202024", "file-name": "report.pdf"}
+    )
+
+def test_archive_object_name():
+    assert archive_object_name("report.pdf") == "report.pdf"
+    assert archive_object_name("a/b/report.pdf") == "a/b/report.pdf"
+    assert archive_object_name("100%.pdf") == "100%25.pdf"
+    # Names with empty or relative segments become a single encoded name
+    assert archive_object_name("../x.pdf") == "%2E%2E%2Fx%2Epdf"
+
+def test_document_inserted_before_a_crash_is_only_finalized(pipeline, tmp_path):
+    db_path = str(tmp_path / "work_queue.db")
+    pipeline.work_queue = DurableWorkQueue(db_path)
+    path = tmp_path / "doc.txt"
+    path.write_text("document content")
+    pipeline.document_processor.parse_document.return_value = "document content"
+    pipeline.document_processor.chunk_document.return_value = ["document content"]
+    pipeline.document_processor.embed_chunks.return_value = ChunkBatch(["document content"], np.ones((1, 4)))
+
+    doc_info = {"source": "folder", "path": str(path)}
+    pipeline.work_queue.add(doc_info)
+    doc_info = pipeline._upload_stage(doc_info)
+    for stage in (pipeline._parse_stage, pipeline._chunk_stage, pipeline._embed_stage, pipeline._upsert_stage):
+        doc_info = stage(doc_info)
+    doc_info["upload"].result()
+    # The process dies after the insert, before the document is finalized
+    pipeline.work_queue.close()
+    pipeline.work_queue = DurableWorkQueue(db_path)
+
+    [(resumed, _)] = pipeline.work_queue.unfinished()
+    assert pipeline._upload_stage(resumed) is None
+    finalized = pipeline.stages["finalize"].input_queue.get_nowait()
+    pipeline._finalize_stage(finalized)
+
+    pipeline.vector_store.upsert_documents.assert_called_once()
+    assert pipeline.work_queue.unfinished() == []
+    assert (tmp_path / "processed" / "doc.txt").exists()
+    pipeline.work_queue.close()
+
+def test_streamed_document_is_stored_with_consecutive_chunk_indices(pipeline, test_config, tmp_path):
+    with patch('src.data.document_processor.get_embedding_model') as get_model:
+        get_model.return_value.encode.side_effect = lambda chunks: np.ones((len(chunks), 4), dtype=np.float32)
+        processor = DocumentProcessor(test_config)
+    processor.stream_buffer_chars = 1500
+    processor.stream_window_chunks = 4
+    processor.parser = MagicMock()
+    pages = [f"Page {page} " + " ".join(f"word{page}-{i}" for i in range(150)) + "\n\n" for page in range(4)]
+    processor.parser.load_data.return_value = [MagicMock(text=page) for page in pages]
+    pipeline.document_processor = processor
+    path = tmp_path / "large.docx"
+    path.write_bytes(b"docx")
+    upload = Future()
+    upload.set_result(archive_object_name("large.docx"))
+    doc_info = {"source": "folder", "path": str(path), "doc_id": "large.docx",
+                "upload": upload, "start_time": time.time()}
+
+    pipeline._stream_document(doc_info, b"docx", {"file_name": "large.docx"})
+    windows = []
+    while not pipeline.stages["embed"].input_queue.empty():
+        windows.append(pipeline.stages["embed"].input_queue.get_nowait())
+    for window in windows:
+        pipeline._finalize_stage(pipeline._upsert_stage(pipeline._embed_stage(window)))
+    pipeline._finalize_stage(pipeline.stages["finalize"].input_queue.get_nowait())
+
+    assert len(windows) > 1
+    stored = [call.args[0] for call in pipeline.vector_store.upsert_documents.call_args_list]
+    chunk_ids = np.concatenate([batch.chunk_ids for batch in stored])
+    assert list(chunk_ids) == list(range(len(chunk_ids)))
+    contents = [content for batch in stored for content in batch.contents]
+    assert contents == processor.chunk_document("".join(pages))
+    assert all(set(batch.metadata["doc_id"]) == {"large.docx"} for batch in stored)
+    assert (tmp_path / "processed" / "large.docx").exists()
+
+def test_documents_finalized_while_stopping_reach_the_source(pipeline):
+    source = MagicMock(spec=SourceHandler)
+    calls = []
+    source.on_document_complete.side_effect = lambda doc_info, success: calls.append("complete")
+    source.close.side_effect = lambda: calls.append("close")
+    pipeline.add_source_handler("folder", source)
+    doc_info = {"source": "folder", "path": "/docs/doc.txt"}
+    # Buffered rows of the document are written and finalized while stopping
+    pipeline.vector_writer = MagicMock()
+    pipeline.vector_writer.close.side_effect = lambda: pipeline._notify_source(doc_info, True)
+
+    with patch.object(pipeline, "_log_stage_stats"):
+        pipeline.stop()
+
+    assert calls == ["complete", "close"]
+
+def test_run_batch_summarizes_outcomes(pipeline):
+    pipeline.stages["upload"].handler = lambda doc_info: pipeline._finish_document(doc_info, doc_info["outcome"])
+    documents = [
+        {"source": "batch", "path": f"/docs/{i}.txt", "outcome": outcome}
+        for i, outcome in enumerate(["processed", "processed", "skipped", "failed"])
+    ]
+
+    with patch.object(pipeline, "_log_stage_stats"):
+        summary = pipeline.run_batch(documents, timeout=10)
+
+    assert summary["completed"]
+    assert {key: summary[key] for key in ("documents", "processed", "skipped", "failed", "unfinished")} == {
+        "documents": 4, "processed": 2, "skipped": 1, "failed": 1, "unfinished": 0
+    }
+
+def test_run_batch_timeout_covers_waiting_for_queue_room(pipeline):
+    # Workers hold their documents until the pipeline stops, so the queue fills up
+    pipeline.stages["upload"].handler = lambda doc_info: pipeline.should_stop.wait()
+    pipeline.processing_queue.maxsize = 1
+    taken = []
+
+    def documents():
+        for i in range(10):
+            taken.append(i)
+            yield {"source": "batch", "path": f"/docs/{i}.txt"}
+
+    start = time.monotonic()
+    with patch.object(pipeline, "_log_stage_stats"):
+        summary = pipeline.run_batch(documents(), timeout=0.5)
+
+    assert time.monotonic() - start < 5
+    assert not summary["completed"]
+    # Two taken by the upload workers, one waiting, one that found no room in time
+    assert len(taken) == 4
+    assert summary["documents"] == summary["unfinished"] == 4
+
+def test_run_batch_counts_documents_never_queued_as_unfinished(pipeline):
+    pipeline.stages["upload"].handler = lambda doc_info: pipeline.should_stop.wait()
+    pipeline.processing_queue.maxsize = 1
+    documents = [{"source": "batch", "path": f"/docs/{i}.txt"} for i in range(10)]
+
+    with patch.object(pipeline, "_log_stage_stats"):
+        summary = pipeline.run_batch(documents, timeout=0.5)
+
+    assert summary["documents"] == summary["unfinished"] == 10
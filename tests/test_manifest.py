@@ -0,0 +1,96 @@
+import os
+import pytest
+from unittest.mock import patch
+from src.pipeline.manifest import IngestionManifest
+
+@pytest.fixture
+def manifest(tmp_path):
+    manifest = IngestionManifest(str(tmp_path / "state" / "manifest.db"))
+    yield manifest
+    manifest.close()
+
+@pytest.fixture
+def document(tmp_path):
+    path = tmp_path / "doc.txt"
+    path.write_text("some document content")
+    return str(path)
+
+def test_new_document_is_not_ingested(manifest, document):
+    doc_info = {"path": document, "doc_id": "doc.txt"}
+    assert not manifest.check(doc_info, "config-a")
+    assert doc_info["content_hash"]
+
+def test_recorded_document_is_skipped(manifest, document, tmp_path):
+    doc_info = {"path": document, "doc_id": "doc.txt"}
+    manifest.check(doc_info, "config-a")
+    manifest.record(doc_info, "config-a")
+
+    assert manifest.check({"path": document, "doc_id": "doc.txt"}, "config-a")
+
+    # The same version of the document at another path is recognised by its hash
+    copy = tmp_path / "copy.txt"
+    copy.write_text("some document content")
+    assert manifest.check({"path": str(copy), "doc_id": "doc.txt"}, "config-a")
+    # Identical content under another doc_id is a document of its own
+    assert not manifest.check({"path": str(copy), "doc_id": "copy.txt"}, "config-a")
+
+def test_config_change_requires_reprocessing(manifest, document):
+    doc_info = {"path": document, "doc_id": "doc.txt"}
+    manifest.check(doc_info, "config-a")
+    manifest.record(doc_info, "config-a")
+
+    assert not manifest.check({"path": document, "doc_id": "doc.txt"}, "config-b")
+
+def test_manifest_persists_across_instances(tmp_path, document):
+    db_path = str(tmp_path / "manifest.db")
+    manifest = IngestionManifest(db_path)
+    doc_info = {"path": document, "doc_id": "doc.txt"}
+    manifest.check(doc_info, "config-a")
+    manifest.record(doc_info, "config-a")
+    manifest.close()
+
+    reopened = IngestionManifest(db_path)
+    assert reopened.check({"path": document, "doc_id": "doc.txt"}, "config-a")
+    reopened.close()
+
+def test_check_content_hashes_buffer(manifest, document):
+    doc_info = {"path": document, "doc_id": "doc.txt"}
+    assert not manifest.check_path(doc_info, "config-a")
+    assert not manifest.check_content(doc_info, "config-a", data=b"some document content")
+    manifest.record(doc_info, "config-a")
+
+    # The hash of the buffer matches the hash of the file it was read from
+    assert manifest.check_content({"path": document, "doc_id": "doc.txt"}, "config-a")
+
+def test_reverted_document_is_ingested_again(manifest, tmp_path):
+    path = tmp_path / "doc.txt"
+    versions = ["version A", "version B", "version A"]
+    ingested = []
+    for i, version in enumerate(versions):
+        path.write_text(version)
+        os.utime(path, (1000 + i, 1000 + i))
+        doc_info = {"path": str(path), "doc_id": "doc.txt"}
+        if not manifest.check(doc_info, "config-a"):
+            ingested.append(version)
+            manifest.record(doc_info, "config-a")
+
+    # Going back to A replaces B's chunks, although A was ingested before
+    assert ingested == versions
+
+def test_unchanged_file_is_skipped_without_hashing(manifest, tmp_path):
+    path = tmp_path / "doc.txt"
+    path.write_text("some document content")
+    doc_info = {"path": str(path), "doc_id": "doc.txt"}
+    manifest.check(doc_info, "config-a")
+    manifest.record(doc_info, "config-a")
+    # Moved into the processed folder after ingestion, keeping its size and mtime
+    (tmp_path / "processed").mkdir()
+    moved = tmp_path / "processed" / "doc.txt"
+    os.rename(path, moved)
+
+    with patch('src.pipeline.manifest.hash_file') as hash_file:
+        assert manifest.check_path({"path": str(moved), "doc_id": "doc.txt"}, "config-a")
+        hash_file.assert_not_called()
+    # A different mtime needs the content check
+    os.utime(moved, (1000, 1000))
+    assert not manifest.check_path({"path": str(moved), "doc_id": "doc.txt"}, "config-a")
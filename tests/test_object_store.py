@@ -0,0 +1,135 @@
+import io
+import pytest
+from types import SimpleNamespace
+from unittest.mock import patch
+from minio.error import S3Error
+from src.data.object_store import ObjectStore
+
+
+def no_such_key(object_name):
+    return S3Error(
+        response=None, code="NoSuchKey", message="Object does not exist",
+        resource=object_name, request_id=None, host_id=None
+    )
+
+
+class FakeResponse:
+    def __init__(self, data):
+        self.data = data
+
+    def read(self):
+        return self.data
+
+    def stream(self, amt):
+        for start in range(0, len(self.data), amt):
+            yield self.data[start:start + amt]
+
+    def close(self):
+        pass
+
+    def release_conn(self):
+        pass
+
+
+class FakeMinio:
+    """Local stand-in for the MinIO client, keeping objects in memory."""
+    def __init__(self, *args, **kwargs):
+        self.objects = {}
+        self.metadata = {}
+        self.ranged_gets = 0
+
+    def bucket_exists(self, bucket_name):
+        return True
+
+    def put_object(self, bucket_name, object_name, data, length, content_type=None, **kwargs):
+        self.objects[object_name] = data.read() if length < 0 else data.read(length)
+
+    def fput_object(self, bucket_name, object_name, file_path, metadata=None, **kwargs):
+        if object_name.startswith("fail"):
+            raise ConnectionError("connection reset")
+        self.metadata[object_name] = metadata or {}
+        with open(file_path, 'rb') as f:
+            self.objects[object_name] = f.read()
+
+    def stat_object(self, bucket_name, object_name):
+        if object_name not in self.objects:
+            raise no_such_key(object_name)
+        headers = {"Content-Type": "application/octet-stream"}
+        headers.update({f"X-Amz-Meta-{key}": value for key, value in self.metadata.get(object_name, {}).items()})
+        return SimpleNamespace(size=len(self.objects[object_name]), metadata=headers)
+
+    def get_object(self, bucket_name, object_name, offset=0, length=0):
+        if object_name not in self.objects:
+            raise no_such_key(object_name)
+        data = self.objects[object_name]
+        if length:
+            self.ranged_gets += 1
+            data = data[offset:offset + length]
+        return FakeResponse(data)
+
+    def fget_object(self, bucket_name, object_name, file_path):
+        with open(file_path, 'wb') as f:
+            f.write(self.objects[object_name])
+
+
+@pytest.fixture
+def object_store(test_config, mocked_env):
+    with patch('src.data.object_store.Minio', FakeMinio):
+        store = ObjectStore(test_config)
+    yield store
+    store.close()
+
+
+def test_upload_many_reports_each_object(object_store, tmp_path):
+    files = []
+    for name in ["a.txt", "b.txt", "fail.txt"]:
+        path = tmp_path / name
+        path.write_bytes(name.encode())
+        files.append((str(path), None))
+
+    results = object_store.upload_many(files)
+
+    assert [result.object_name for result in results] == ["a.txt", "b.txt", "fail.txt"]
+    assert [result.success for result in results] == [True, True, False]
+    assert results[0].size == 5
+    assert "connection reset" in results[2].error
+    assert object_store.client.objects["b.txt"] == b"b.txt"
+
+
+def test_put_and_get_many(object_store):
+    results = object_store.put_many([(b"one", "x/1"), (b"two", "x/2")])
+    assert all(result.success for result in results)
+
+    results = object_store.get_many(["x/1", "x/2", "x/missing"])
+
+    assert [result.data for result in results] == [b"one", b"two", None]
+    assert all(result.success for result in results)
+
+
+def test_download_many_uses_ranges_for_large_objects(object_store, tmp_path):
+    object_store.part_size = 4
+    object_store.multipart_download_threshold = 10
+    large = bytes(range(50))
+    object_store.client.objects = {"small": b"tiny", "large": large}
+
+    results = object_store.download_many([
+        ("small", str(tmp_path / "small")),
+        ("large", str(tmp_path / "out" / "large")),
+        ("missing", str(tmp_path / "missing")),
+    ])
+
+    assert [result.success for result in results] == [True, True, False]
+    assert (tmp_path / "small").read_bytes() == b"tiny"
+    assert (tmp_path / "out" / "large").read_bytes() == large
+    assert object_store.client.ranged_gets == 13
+    assert not (tmp_path / "out" / "large.part").exists()
+
+def test_download_many_returns_object_metadata(object_store, tmp_path):
+    path = tmp_path / "doc.txt"
+    path.write_bytes(b"content")
+    object_store.upload_file(str(path), "a/doc.txt", metadata={"doc-id": "a%2Fdoc.txt"})
+
+    result, = object_store.download_many([("a/doc.txt", str(tmp_path / "copy.txt"))])
+
+    assert result.success
+    assert result.metadata == {"doc-id": "a%2Fdoc.txt"}
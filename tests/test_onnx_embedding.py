@@ -0,0 +1,69 @@
+import json
+import os
+import pytest
+import numpy as np
+from unittest.mock import patch, MagicMock
+from src.data.onnx_embedding import (
+    BUILD_INFO_FILE, build_onnx_model, cosine_similarities, onnx_file_name, prepare_onnx_model
+)
+
+def test_cosine_similarities():
+    reference = np.array([[1.0, 0.0], [0.0, 2.0]])
+    candidate = np.array([[2.0, 0.0], [1.0, 1.0]])
+
+    similarities = cosine_similarities(reference, candidate)
+
+    assert similarities == pytest.approx([1.0, np.sqrt(0.5)])
+
+def fake_models(drift: float):
+    """SentenceTransformer stand-in whose ONNX variant drifts from the torch output."""
+    def factory(model_name, backend="torch", **kwargs):
+        model = MagicMock()
+        model.save_pretrained.side_effect = lambda path: os.makedirs(os.path.join(path, "onnx"))
+        if backend == "onnx" and "model_kwargs" in kwargs:
+            model.encode.side_effect = lambda texts: np.array([[1.0, drift]] * len(texts))
+        else:
+            model.encode.side_effect = lambda texts: np.array([[1.0, 0.0]] * len(texts))
+        return model
+    return factory
+
+def test_build_validates_against_torch(tmp_path):
+    output_dir = str(tmp_path / "model-qint8_avx2")
+    with patch('sentence_transformers.SentenceTransformer', side_effect=fake_models(0.01)), \
+         patch('sentence_transformers.export_dynamic_quantized_onnx_model') as export:
+        info = build_onnx_model("model", output_dir, quantization="avx2")
+
+    export.assert_called_once()
+    assert info["file_name"] == onnx_file_name("avx2") == "onnx/model_qint8_avx2.onnx"
+    assert info["min_cosine"] > 0.99
+    with open(os.path.join(output_dir, BUILD_INFO_FILE)) as f:
+        assert json.load(f) == info
+
+def test_build_rejects_drifting_export(tmp_path):
+    output_dir = str(tmp_path / "model-fp32")
+    with patch('sentence_transformers.SentenceTransformer', side_effect=fake_models(0.5)):
+        with pytest.raises(ValueError):
+            build_onnx_model("model", output_dir, min_cosine=0.99)
+
+    assert os.listdir(tmp_path) == []
+
+def test_prepare_reuses_validated_export(tmp_path):
+    config = {"model_name": "org/model", "onnx": {"path": str(tmp_path), "quantization": "avx2"}}
+    info = {"model_name": "org/model", "quantization": "avx2", "file_name": "onnx/model_qint8_avx2.onnx",
+            "min_cosine": 0.995}
+
+    def build(model_name, model_dir, **kwargs):
+        os.makedirs(model_dir, exist_ok=True)
+        with open(os.path.join(model_dir, BUILD_INFO_FILE), 'w') as f:
+            json.dump(info, f)
+        return info
+
+    with patch('src.data.onnx_embedding.build_onnx_model', side_effect=build) as mock_build:
+        assert prepare_onnx_model(config) == (str(tmp_path / "org--model-qint8_avx2"), info["file_name"])
+        prepare_onnx_model(config)
+        assert mock_build.call_count == 1
+
+        # A stricter tolerance than the export was validated with builds it again
+        config["onnx"]["min_cosine"] = 0.999
+        prepare_onnx_model(config)
+        assert mock_build.call_count == 2
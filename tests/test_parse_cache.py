@@ -0,0 +1,62 @@
+import pytest
+from unittest.mock import MagicMock, patch
+from src.data.parse_cache import ParseCache
+from src.data.document_processor import DocumentProcessor
+
+class InMemoryObjectStore:
+    """Local stand-in for the MinIO-backed ObjectStore."""
+    def __init__(self):
+        self.objects = {}
+
+    def put_bytes(self, data, object_name, content_type=None):
+        self.objects[object_name] = data
+        return object_name
+
+    def get_bytes(self, object_name):
+        return self.objects.get(object_name)
+
+@pytest.fixture
+def object_store():
+    return InMemoryObjectStore()
+
+@pytest.fixture
+def doc_processor(test_config, mocked_env, object_store):
+    with patch('src.data.document_processor.SentenceTransformer'), \
+         patch('src.data.document_processor.LlamaParse'):
+        processor = DocumentProcessor(test_config)
+    processor.parser = MagicMock()
+    processor.parser.load_data.return_value = [MagicMock(text="# Parsed "), MagicMock(text="content")]
+    processor.parse_cache = ParseCache(object_store, processor.parser_settings)
+    return processor
+
+def test_cache_round_trip(object_store):
+    cache = ParseCache(object_store, {"parser": "fake"})
+    assert cache.get("abc") is None
+
+    cache.put("abc", "# Title")
+
+    assert cache.get("abc") == "# Title"
+    assert cache.stats() == {"hits": 1, "misses": 1, "hit_rate": 0.5}
+
+def test_parser_settings_change_the_key(object_store):
+    ParseCache(object_store, {"result_type": "markdown"}).put("abc", "# Title")
+    assert ParseCache(object_store, {"result_type": "text"}).get("abc") is None
+
+def test_same_bytes_are_parsed_once(doc_processor):
+    first = doc_processor.parse_document(b"file bytes", extra_info={"file_name": "a.pdf"})
+    second = doc_processor.parse_document(b"file bytes", extra_info={"file_name": "renamed.pdf"})
+
+    assert first == second == "# Parsed content"
+    doc_processor.parser.load_data.assert_called_once()
+
+def test_lookup_failure_falls_back_to_parser(doc_processor):
+    doc_processor.parse_cache.object_store.get_bytes = MagicMock(side_effect=ConnectionError("minio down"))
+
+    assert doc_processor.parse_document(b"file bytes", extra_info={}) == "# Parsed content"
+
+def test_streamed_pages_are_cached(doc_processor):
+    pages = list(doc_processor.iter_pages(b"file bytes", extra_info={"file_name": "a.docx"}))
+
+    assert pages == ["# Parsed ", "content"]
+    assert doc_processor.parse_document(b"file bytes", extra_info={"file_name": "a.docx"}) == "# Parsed content"
+    doc_processor.parser.load_data.assert_called_once()
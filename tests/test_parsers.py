@@ -0,0 +1,38 @@
+import pytest
+from src.data.parsers import ParserRegistry, create_parser_registry, LLAMAPARSE, HtmlParser, PdfTextParser
+
+@pytest.fixture
+def registry():
+    return create_parser_registry({})
+
+def test_routes_by_extension(registry):
+    assert registry.resolve("notes.txt").name == "text"
+    assert registry.resolve("README.md").name == "markdown"
+    assert registry.resolve("page.HTML").name == "html"
+    assert registry.resolve("paper.pdf").name == "pdf_text"
+    assert registry.resolve("report.docx") is None
+
+def test_routes_by_mime_type(registry):
+    assert registry.resolve("upload", mime_type="text/plain").name == "text"
+    assert registry.resolve(None, mime_type="application/octet-stream") is None
+
+def test_routes_are_configurable():
+    registry = create_parser_registry({"routes": {"pdf": LLAMAPARSE, "log": "text"}})
+    assert registry.resolve("paper.pdf") is None
+    assert registry.resolve("server.log").name == "text"
+
+def test_unknown_parser_name_raises():
+    registry = ParserRegistry(routes={"txt": "missing"})
+    with pytest.raises(ValueError):
+        registry.resolve("notes.txt")
+
+def test_html_parser_extracts_visible_text():
+    html = b"<html><head><title>x</title><script>var a;</script></head>" \
+           b"<body><h1>Title</h1><p>First &amp; second.</p></body></html>"
+    text = HtmlParser().parse(html)
+    assert "# Title" in text
+    assert "First & second." in text
+    assert "var a" not in text
+
+def test_pdf_without_text_layer_falls_back():
+    assert PdfTextParser().parse(b"not a pdf") is None
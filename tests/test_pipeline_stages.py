@@ -0,0 +1,63 @@
+import threading
+import time
+import pytest
+from src.pipeline.stages import PipelineStage
+
+@pytest.fixture
+def stop_event():
+    event = threading.Event()
+    yield event
+    event.set()
+
+def wait_for(condition, timeout=5):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if condition():
+            return True
+        time.sleep(0.01)
+    return False
+
+def test_stage_forwards_results(stop_event):
+    results = []
+    first = PipelineStage("double", lambda x: x * 2, workers=2, queue_size=4, stop_event=stop_event)
+    second = PipelineStage("collect", results.append, stop_event=stop_event)
+    first.next_stage = second
+    first.start()
+    second.start()
+
+    for i in range(10):
+        first.put(i)
+
+    assert wait_for(lambda: len(results) == 10)
+    assert sorted(results) == [i * 2 for i in range(10)]
+    assert first.stats()["processed"] == 10
+
+def test_stage_reports_errors(stop_event):
+    errors = []
+
+    def handler(item):
+        raise ValueError("boom")
+
+    stage = PipelineStage(
+        "failing", handler, stop_event=stop_event,
+        on_error=lambda name, item, e: errors.append((name, item))
+    )
+    stage.start()
+    stage.put("doc")
+
+    assert wait_for(lambda: len(errors) == 1)
+    assert errors[0] == ("failing", "doc")
+    assert stage.stats()["failed"] == 1
+
+def test_bounded_queue_applies_backpressure(stop_event):
+    release = threading.Event()
+    stage = PipelineStage("slow", lambda item: release.wait(), queue_size=1, stop_event=stop_event)
+    stage.start()
+
+    stage.put(1)  # picked up by the worker
+    assert wait_for(lambda: stage.input_queue.empty())
+    stage.put(2)  # fills the queue
+    assert stage.input_queue.full()
+
+    release.set()
+    assert wait_for(lambda: stage.stats()["processed"] == 2)
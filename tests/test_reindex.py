@@ -0,0 +1,231 @@
+import pytest
+import threading
+from types import SimpleNamespace
+from unittest.mock import patch, MagicMock
+from src.data.object_store import TransferResult
+from src.pipeline.reindex import CollectionReindexer
+from src.data.vector_store import QUERY_LIMIT
+
+@pytest.fixture
+def milvus():
+    with patch('src.pipeline.reindex.VectorStore'), \
+         patch('src.pipeline.reindex.Collection') as collection, \
+         patch('src.pipeline.reindex.utility') as utility:
+        yield collection, utility
+
+@pytest.fixture
+def reindexer(test_config, mocked_env, milvus):
+    return CollectionReindexer(test_config)
+
+def set_collections(utility, collections, aliases):
+    utility.list_collections.return_value = collections
+    utility.list_aliases.side_effect = lambda name: aliases.get(name, [])
+
+def test_versions_and_current(reindexer, milvus):
+    _, utility = milvus
+    set_collections(
+        utility,
+        ["test_collection_v2", "other", "test_collection_v10", "test_collection_v1"],
+        {"test_collection_v2": ["test_collection"]}
+    )
+
+    assert reindexer.versions() == [
+        (1, "test_collection_v1"), (2, "test_collection_v2"), (10, "test_collection_v10")
+    ]
+    assert reindexer.current() == "test_collection_v2"
+
+def test_swap_moves_existing_alias(reindexer, milvus):
+    collection, utility = milvus
+    set_collections(utility, ["test_collection_v1", "test_collection_v2"], {"test_collection_v1": ["test_collection"]})
+
+    reindexer.swap("test_collection_v2")
+
+    collection.return_value.load.assert_called_once()
+    utility.alter_alias.assert_called_once_with("test_collection_v2", "test_collection")
+    utility.create_alias.assert_not_called()
+
+def test_swap_migrates_plain_collection(reindexer, milvus):
+    _, utility = milvus
+    set_collections(utility, ["test_collection", "test_collection_v1"], {})
+
+    reindexer.swap("test_collection_v1")
+
+    utility.rename_collection.assert_called_once_with("test_collection", "test_collection_v0")
+    utility.create_alias.assert_called_once_with("test_collection_v1", "test_collection")
+
+def test_swap_restores_plain_collection_if_alias_fails(reindexer, milvus):
+    _, utility = milvus
+    set_collections(utility, ["test_collection", "test_collection_v1"], {})
+    utility.create_alias.side_effect = RuntimeError("alias failed")
+
+    with pytest.raises(RuntimeError):
+        reindexer.swap("test_collection_v1")
+
+    assert [call.args for call in utility.rename_collection.call_args_list] == [
+        ("test_collection", "test_collection_v0"), ("test_collection_v0", "test_collection")
+    ]
+
+def test_rollback_after_interrupted_migration(reindexer, milvus):
+    _, utility = milvus
+    # Renamed to version 0, but the alias was never created
+    set_collections(utility, ["test_collection_v0", "test_collection_v1"], {})
+
+    assert reindexer.rollback() == "test_collection_v0"
+    utility.create_alias.assert_called_once_with("test_collection_v0", "test_collection")
+
+def test_swap_rejects_unknown_collection(reindexer, milvus):
+    _, utility = milvus
+    set_collections(utility, ["test_collection_v1"], {})
+
+    with pytest.raises(ValueError):
+        reindexer.swap("other")
+
+def test_rollback_to_previous_version(reindexer, milvus):
+    _, utility = milvus
+    set_collections(
+        utility,
+        ["test_collection_v0", "test_collection_v1", "test_collection_v2"],
+        {"test_collection_v2": ["test_collection"]}
+    )
+
+    assert reindexer.rollback() == "test_collection_v1"
+    utility.alter_alias.assert_called_once_with("test_collection_v1", "test_collection")
+
+def test_cleanup_keeps_live_version(reindexer, milvus):
+    _, utility = milvus
+    set_collections(
+        utility,
+        ["test_collection_v1", "test_collection_v2", "test_collection_v3", "test_collection_v4"],
+        {"test_collection_v1": ["test_collection"]}
+    )
+
+    assert reindexer.cleanup(keep=2) == ["test_collection_v2"]
+    utility.drop_collection.assert_called_once_with("test_collection_v2")
+
+def test_iter_buckets_splits_full_buckets(reindexer):
+    collection = MagicMock()
+
+    def query(expr, output_fields, limit):
+        # Only the "a" bucket hits the query limit
+        if expr.startswith('chunk_hash like "a%"'):
+            return [{"id": i} for i in range(QUERY_LIMIT)]
+        return [{"id": 0}]
+    collection.query.side_effect = query
+
+    buckets = list(reindexer._iter_buckets(collection, None))
+
+    assert len(buckets) == 15 + 16
+    queried = [call.kwargs["expr"] for call in collection.query.call_args_list]
+    assert 'chunk_hash like "af%"' in queried
+
+def test_validate_checks_rows_and_recall(reindexer, milvus):
+    collection, _ = milvus
+    instance = collection.return_value
+    instance.num_entities = 90
+    sample = [{"id": i, "embedding": [0.1, 0.2]} for i in range(4)]
+    instance.query.return_value = sample
+    # The last sampled row is not among its own nearest neighbours
+    instance.search.return_value = [MagicMock(ids=[0]), MagicMock(ids=[1]), MagicMock(ids=[2]), MagicMock(ids=[0])]
+    reindexer.sample_size = 4
+
+    validation = reindexer.validate("test_collection_v1", expected_rows=100)
+
+    assert validation["recall"] == 0.75
+    assert validation["row_ratio"] == 0.9
+    assert not validation["passed"]
+
+class LiveCollection:
+    """Stand-in for the live collection, answering the id and hash-prefix queries of a copy."""
+    def __init__(self, rows):
+        self.rows = list(rows)
+        self.schema = MagicMock(fields=[MagicMock(), MagicMock(), MagicMock()])
+        for field, name in zip(self.schema.fields, ["doc_id", "chunk_hash", "chunk_index"]):
+            field.name = name
+        self.on_query = None
+
+    def query(self, expr, output_fields, limit):
+        def matches(row, clause):
+            field, operator, value = clause.split(" ", 2)
+            if operator == "like":
+                return row[field].startswith(value.strip('"%'))
+            return row[field] > int(value) if operator == ">" else row[field] <= int(value)
+
+        result = [
+            {key: row[key] for key in output_fields}
+            for row in self.rows if all(matches(row, clause) for clause in expr.split(" and "))
+        ]
+        if self.on_query is not None:
+            self.on_query(expr, output_fields)
+        return result
+
+def live_row(id, chunk_hash):
+    return {"id": id, "chunk_hash": chunk_hash, "content": f"text {id}", "doc_id": "doc", "chunk_index": 0}
+
+def copy_chunks(reindexer, milvus, source):
+    collection, _ = milvus
+    collection.return_value = source
+    source.load = source.flush = MagicMock()
+    source.num_entities = len(source.rows)
+    with patch('src.data.document_processor.DocumentProcessor') as processor_class, \
+         patch('src.pipeline.reindex.VectorStore') as store_class:
+        processor = processor_class.return_value
+        processor.embedding_dimension = 2
+        processor.embed_texts.side_effect = lambda texts: [[0.1, 0.2]] * len(texts)
+        store_class.return_value.dimension = 2
+
+        report = reindexer._copy_chunks("test_collection_v1", "test_collection_v2")
+
+    batches = [call.args[0] for call in store_class.return_value.upsert_documents.call_args_list]
+    processor.close.assert_called_once()
+    return report, sorted(content for batch in batches for content in batch.contents)
+
+def test_copy_chunks_reembeds_and_catches_up(reindexer, milvus):
+    source = LiveCollection([live_row(5, "0a")])
+
+    def ingest(expr, output_fields):
+        if "content" in output_fields and source.rows[-1]["id"] == 5:
+            # Ingested into the live collection during the first pass
+            source.rows.append(live_row(6, "1b"))
+    source.on_query = ingest
+
+    report, copied = copy_chunks(reindexer, milvus, source)
+
+    assert report["copied"] == 2
+    assert report["expected_rows"] == 1
+    assert copied == ["text 5", "text 6"]
+
+def test_copy_chunks_catches_up_on_buckets_already_scanned(reindexer, milvus):
+    source = LiveCollection([live_row(5, "0a"), live_row(6, "fa")])
+
+    def ingest(expr, output_fields):
+        if "content" in output_fields and expr.endswith('chunk_hash like "0%"') and len(source.rows) == 2:
+            # Ingested while the copy is between buckets: the lower id lands in
+            # the bucket already copied, the higher one in a bucket still ahead
+            source.rows += [live_row(7, "0b"), live_row(8, "fb")]
+    source.on_query = ingest
+
+    report, copied = copy_chunks(reindexer, milvus, source)
+
+    assert report["copied"] == 4
+    assert copied == ["text 5", "text 6", "text 7", "text 8"]
+
+def test_archived_documents_keep_their_doc_id(reindexer, tmp_path):
+    object_store = MagicMock()
+    object_store.list_objects.return_value = ["a/report.pdf", "b/report.pdf", "paper-1", "legacy.txt", "parsed/x"]
+    object_store.download_many.side_effect = lambda items: [
+        TransferResult(name, True, path=path, metadata=metadata)
+        for (name, path), metadata in zip(items, [
+            {"doc-id": "a%2Freport.pdf", "file-name": "report.pdf"},
+            {"doc-id": "b%2Freport.pdf", "file-name": "report.pdf"},
+            {"doc-id": "paper-1", "file-name": "paper%201.pdf"},
+            {},
+        ])
+    ]
+    pipeline = SimpleNamespace(object_store=object_store, should_stop=threading.Event())
+
+    documents = list(reindexer._archived_documents(pipeline, str(tmp_path)))
+
+    assert [doc["doc_id"] for doc in documents] == ["a/report.pdf", "b/report.pdf", "paper-1", "legacy.txt"]
+    assert [doc.get("file_name") for doc in documents] == ["report.pdf", "report.pdf", "paper 1.pdf", None]
+    # Same file names from different folders are spooled to different paths
+    assert len({doc["path"] for doc in documents}) == 4
@@ -0,0 +1,122 @@
+import queue
+import threading
+import pytest
+from src.pipeline.scheduler import DocumentScheduler
+
+MB = 1024 * 1024
+
+
+def doc(source, name, size=0):
+    return {"source": source, "path": name, "size": size}
+
+
+def drain(scheduler):
+    names = []
+    while not scheduler.empty():
+        names.append(scheduler.get()["path"])
+        scheduler.task_done()
+    return names
+
+
+def test_fifo_policy_keeps_arrival_order():
+    scheduler = DocumentScheduler()
+    for i, source in enumerate(["folder", "api", "folder", "api"]):
+        scheduler.put(doc(source, f"d{i}"))
+
+    assert drain(scheduler) == ["d0", "d1", "d2", "d3"]
+
+
+def test_fair_policy_shares_by_weight():
+    scheduler = DocumentScheduler(policy="fair", sources={"api": {"weight": 2}})
+    for i in range(6):
+        scheduler.put(doc("folder", f"f{i}"))
+    for i in range(4):
+        scheduler.put(doc("api", f"a{i}"))
+
+    order = drain(scheduler)
+
+    # Two api documents for every folder document until the api lane is empty
+    assert order[:6] == ["f0", "a0", "a1", "f1", "a2", "a3"]
+    assert order[6:] == ["f2", "f3", "f4", "f5"]
+
+
+def test_priority_is_served_first():
+    scheduler = DocumentScheduler(policy="fair", sources={"api": {"priority": 1}})
+    scheduler.put(doc("folder", "f0"))
+    scheduler.put(doc("api", "a0"))
+
+    assert drain(scheduler) == ["a0", "f0"]
+
+
+def test_sjf_serves_small_files_first_with_aging(monkeypatch):
+    now = [0.0]
+    monkeypatch.setattr("src.pipeline.scheduler.time.monotonic", lambda: now[0])
+    scheduler = DocumentScheduler(order="sjf", aging_mb_per_second=1.0)
+
+    scheduler.put(doc("folder", "big", size=100 * MB))
+    scheduler.put(doc("folder", "small", size=1 * MB))
+    assert drain(scheduler) == ["small", "big"]
+
+    # After waiting 100 seconds the large file is ahead of new small ones
+    scheduler.put(doc("folder", "big", size=100 * MB))
+    now[0] = 100.5
+    scheduler.put(doc("folder", "small", size=1 * MB))
+    assert drain(scheduler) == ["big", "small"]
+
+
+def test_lanes_are_bounded_separately():
+    scheduler = DocumentScheduler(maxsize=1)
+    scheduler.put(doc("folder", "f0"))
+
+    with pytest.raises(queue.Full):
+        scheduler.put(doc("folder", "f1"), timeout=0.01)
+    scheduler.put_nowait(doc("api", "a0"))
+
+    assert scheduler.qsize() == 2
+    assert scheduler.qsize("api") == 1
+    assert scheduler.full()
+
+
+def test_get_blocks_until_put():
+    scheduler = DocumentScheduler()
+    with pytest.raises(queue.Empty):
+        scheduler.get(timeout=0.01)
+
+    threading.Timer(0.05, scheduler.put, args=(doc("api", "late"),)).start()
+    assert scheduler.get(timeout=5)["path"] == "late"
+    scheduler.task_done()
+    scheduler.join()
+
+
+def test_slow_store_does_not_block_get():
+    class SlowStore:
+        def __init__(self):
+            self.writing = threading.Event()
+            self.release = threading.Event()
+
+        def add(self, item):
+            self.writing.set()
+            self.release.wait(5)
+            return True
+
+    store = SlowStore()
+    scheduler = DocumentScheduler(maxsize=1, store=store)
+    scheduler.put(doc("api", "a0", size=1) | {"work_id": 1})
+    writer = threading.Thread(target=scheduler.put, args=(doc("folder", "f0"),))
+    writer.start()
+    assert store.writing.wait(5)
+
+    # The document already queued is served while the other is being recorded
+    assert scheduler.get(timeout=1)["path"] == "a0"
+    # The recording document holds its lane slot
+    with pytest.raises(queue.Full):
+        scheduler.put(doc("folder", "f1") | {"work_id": 2}, block=False)
+
+    store.release.set()
+    writer.join(5)
+    assert scheduler.get(timeout=1)["path"] == "f0"
+
+
+def test_unknown_policy_is_rejected():
+    with pytest.raises(ValueError):
+        DocumentScheduler(policy="random")
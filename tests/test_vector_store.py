@@ -1,6 +1,8 @@
 import pytest
+import numpy as np
 from unittest.mock import patch, MagicMock
 from src.data.vector_store import VectorStore
+from src.data.chunk_batch import ChunkBatch
 
 @pytest.fixture
 def vector_store(test_config, mocked_env):
@@ -8,7 +10,7 @@ def vector_store(test_config, mocked_env):
          patch('src.data.vector_store.Collection'), \
          patch('src.data.vector_store.utility'):
         store = VectorStore(test_config)
-        return store
+        yield store
 
 def test_vector_store_initialization(vector_store):
     assert vector_store is not None
@@ -29,8 +31,23 @@ def test_upsert_documents(mock_collection, vector_store):
     vector_store.upsert_documents(test_docs)
     
     mock_coll_instance.insert.assert_called_once()
-    mock_coll_instance.flush.assert_called_once()
-    mock_coll_instance.load.assert_called_once()
+    # No segment sealing or collection reload on the write path
+    mock_coll_instance.flush.assert_not_called()
+    mock_coll_instance.load.assert_not_called()
+
+@patch('src.data.vector_store.Collection')
+def test_upsert_chunk_batch(mock_collection, vector_store):
+    mock_coll_instance = MagicMock()
+    mock_collection.return_value = mock_coll_instance
+
+    embeddings = np.array([[0.1, 0.2, 0.3], [0.4, 0.5, 0.6]], dtype=np.float32)
+    batch = ChunkBatch(contents=['first', 'second'], embeddings=embeddings)
+
+    vector_store.upsert_documents(batch)
+
+    contents, inserted_embeddings = mock_coll_instance.insert.call_args[0][0]
+    assert contents == ['first', 'second']
+    assert inserted_embeddings is batch.embeddings
 
 @patch('src.data.vector_store.Collection')
 def test_search(mock_collection, vector_store):
@@ -54,3 +71,132 @@ def test_get_collection_stats(vector_store):
         
         assert stats["row_count"] == 100
         assert stats["collection_name"] == vector_store.collection_name
+
+@patch('src.data.vector_store.Collection')
+def test_upsert_with_chunk_fields(mock_collection, vector_store):
+    mock_coll_instance = MagicMock()
+    mock_collection.return_value = mock_coll_instance
+    vector_store.has_chunk_fields = True
+
+    embeddings = np.array([[0.1, 0.2, 0.3], [0.4, 0.5, 0.6]], dtype=np.float32)
+    batch = ChunkBatch(
+        contents=['first', 'second'],
+        embeddings=embeddings,
+        chunk_ids=[3, 7],
+        metadata={'doc_id': np.array(['doc.pdf', 'doc.pdf'], dtype=object)}
+    )
+
+    vector_store.upsert_documents(batch)
+
+    contents, _, doc_ids, chunk_hashes, chunk_indices = mock_coll_instance.insert.call_args[0][0]
+    assert doc_ids == ['doc.pdf', 'doc.pdf']
+    assert len(chunk_hashes) == 2 and all(len(chunk_hash) == 64 for chunk_hash in chunk_hashes)
+    assert chunk_indices == [3, 7]
+
+@patch('src.data.vector_store.Collection')
+def test_get_document_chunks_and_delete(mock_collection, vector_store):
+    mock_coll_instance = MagicMock()
+    mock_coll_instance.query.return_value = [{'id': 1, 'chunk_hash': 'abc', 'chunk_index': 0}]
+    mock_collection.return_value = mock_coll_instance
+    vector_store.has_chunk_fields = True
+
+    assert vector_store.get_document_chunks('doc "1".pdf') == [{'id': 1, 'chunk_hash': 'abc', 'chunk_index': 0}]
+    vector_store.get_document_chunks('doc2.pdf')
+    assert mock_coll_instance.query.call_args_list[0][1]['expr'] == 'doc_id == "doc \\"1\\".pdf"'
+    # The collection is loaded once for queries, not per document
+    mock_coll_instance.load.assert_called_once()
+
+    vector_store.delete_chunks([1, 2])
+    mock_coll_instance.delete.assert_called_once_with("id in [1, 2]")
+
+@patch('src.data.vector_store.Collection')
+def test_collection_handle_is_reused(mock_collection, vector_store):
+    mock_coll_instance = MagicMock()
+    mock_collection.return_value = mock_coll_instance
+
+    vector_store.search([0.1, 0.2, 0.3])
+    vector_store.search([0.4, 0.5, 0.6])
+    vector_store.upsert_documents([{'content': 'test content', 'embedding': [0.1, 0.2, 0.3]}])
+
+    mock_collection.assert_called_once_with(vector_store.collection_name)
+    mock_coll_instance.load.assert_called_once()
+
+def make_hit(hit_id, distance, **fields):
+    hit = MagicMock(id=hit_id, distance=distance)
+    hit.entity.get.side_effect = fields.get
+    return hit
+
+@patch('src.data.vector_store.Collection')
+def test_search_batch(mock_collection, vector_store):
+    mock_coll_instance = MagicMock()
+    mock_coll_instance.search.return_value = [
+        [make_hit(1, 0.1, content='a', doc_id='x.pdf'), make_hit(2, 0.3, content='b', doc_id='y.pdf')],
+        [],
+        [make_hit(3, 0.2, content='c', doc_id='x.pdf')]
+    ]
+    mock_collection.return_value = mock_coll_instance
+    vector_store.has_chunk_fields = True
+
+    queries = np.array([[0.1, 0.2, 0.3], [0.4, 0.5, 0.6], [0.7, 0.8, 0.9]], dtype=np.float32)
+    results = vector_store.search_batch(queries, limit=2, filters={'doc_id': ['x.pdf', 'y.pdf']})
+
+    # All query vectors go to Milvus in one search call
+    mock_coll_instance.search.assert_called_once()
+    kwargs = mock_coll_instance.search.call_args[1]
+    assert len(kwargs['data']) == 3
+    assert kwargs['expr'] == 'doc_id in ["x.pdf", "y.pdf"]'
+    assert results == [
+        [{'id': 1, 'distance': 0.1, 'content': 'a', 'doc_id': 'x.pdf'},
+         {'id': 2, 'distance': 0.3, 'content': 'b', 'doc_id': 'y.pdf'}],
+        [],
+        [{'id': 3, 'distance': 0.2, 'content': 'c', 'doc_id': 'x.pdf'}]
+    ]
+
+def test_reconnects_when_connection_is_lost(vector_store):
+    with patch('src.data.vector_store.connections') as mock_connections, \
+         patch('src.data.vector_store.Collection') as mock_collection:
+        vector_store.search([0.1, 0.2, 0.3])
+        mock_connections.connect.assert_not_called()
+
+        mock_connections.has_connection.return_value = False
+        vector_store.search([0.1, 0.2, 0.3])
+
+        mock_connections.connect.assert_called_once()
+        # The handle is created again and reloaded on the new connection
+        assert mock_collection.call_count == 2
+        assert mock_collection.return_value.load.call_count == 2
+
+@patch('src.data.vector_store.QUERY_LIMIT', 2)
+@patch('src.data.vector_store.Collection')
+def test_get_document_chunks_above_query_limit(mock_collection, vector_store):
+    stored = [
+        {'id': 1, 'chunk_hash': '0a' + '0' * 62, 'chunk_index': 0},
+        {'id': 2, 'chunk_hash': '0b' + '0' * 62, 'chunk_index': 1},
+        {'id': 3, 'chunk_hash': '1c' + '0' * 62, 'chunk_index': 2},
+    ]
+
+    def query(expr, output_fields, limit):
+        prefix = expr.split('chunk_hash like "')[1].rstrip('%"') if 'like' in expr else ''
+        return [row for row in stored if row['chunk_hash'].startswith(prefix)][:limit]
+    mock_collection.return_value.query.side_effect = query
+    vector_store.has_chunk_fields = True
+
+    chunks = vector_store.get_document_chunks('doc.pdf')
+
+    assert sorted(chunk['id'] for chunk in chunks) == [1, 2, 3]
+
+@patch('src.data.vector_store.Collection')
+def test_renumber_chunks(mock_collection, vector_store):
+    mock_coll_instance = MagicMock()
+    mock_coll_instance.query.return_value = [
+        {'id': 7, 'content': 'a', 'embedding': [0.1, 0.2], 'doc_id': 'doc.pdf', 'chunk_hash': 'h'}
+    ]
+    mock_collection.return_value = mock_coll_instance
+    vector_store.has_chunk_fields = True
+
+    vector_store.renumber_chunks({7: 3})
+
+    contents, embeddings, doc_ids, chunk_hashes, chunk_indices = mock_coll_instance.insert.call_args[0][0]
+    assert contents == ['a'] and doc_ids == ['doc.pdf'] and chunk_hashes == ['h']
+    assert chunk_indices == [3]
+    mock_coll_instance.delete.assert_called_once_with("id in [7]")
@@ -0,0 +1,78 @@
+import time
+import numpy as np
+import pytest
+from unittest.mock import MagicMock
+from src.data.chunk_batch import ChunkBatch
+from src.data.vector_writer import BufferedVectorWriter
+
+def make_batch(rows):
+    return ChunkBatch(contents=[f"chunk {i}" for i in range(rows)], embeddings=np.zeros((rows, 4)))
+
+@pytest.fixture
+def vector_store():
+    return MagicMock()
+
+def test_batches_are_grouped_into_one_insert(vector_store):
+    writer = BufferedVectorWriter(vector_store, max_rows=100, max_delay=60)
+    results = []
+    for _ in range(3):
+        writer.write(make_batch(10), on_flushed=results.append)
+
+    writer.flush()
+
+    vector_store.upsert_documents.assert_called_once()
+    assert len(vector_store.upsert_documents.call_args[0][0]) == 30
+    assert results == [None, None, None]
+
+def test_flushes_by_size(vector_store):
+    writer = BufferedVectorWriter(vector_store, max_rows=20, max_delay=60)
+    writer.start()
+    try:
+        writer.write(make_batch(15))
+        writer.write(make_batch(15))
+        deadline = time.time() + 5
+        while not vector_store.upsert_documents.called and time.time() < deadline:
+            time.sleep(0.01)
+        vector_store.upsert_documents.assert_called()
+    finally:
+        writer.close()
+
+def test_flushes_by_time(vector_store):
+    writer = BufferedVectorWriter(vector_store, max_rows=1000, max_delay=0.05)
+    writer.start()
+    try:
+        writer.write(make_batch(5))
+        time.sleep(0.5)
+        vector_store.upsert_documents.assert_called_once()
+    finally:
+        writer.close()
+
+def test_close_flushes_and_seals_once(vector_store):
+    writer = BufferedVectorWriter(vector_store, max_rows=1000, max_delay=60)
+    writer.start()
+    writer.write(make_batch(5))
+
+    writer.close()
+
+    vector_store.upsert_documents.assert_called_once()
+    vector_store.flush.assert_called_once()
+
+def test_insert_errors_are_reported(vector_store):
+    vector_store.upsert_documents.side_effect = RuntimeError("milvus unavailable")
+    writer = BufferedVectorWriter(vector_store)
+    results = []
+    writer.write(make_batch(5), on_flushed=results.append)
+
+    writer.flush()
+
+    assert isinstance(results[0], RuntimeError)
+
+def test_backs_off_when_latency_rises(vector_store):
+    writer = BufferedVectorWriter(vector_store, target_latency=0.5, max_backoff=2.0)
+    for _ in range(5):
+        writer._adjust_throttle(3.0)
+    assert 0 < writer.throttle_delay <= 2.0
+
+    for _ in range(30):
+        writer._adjust_throttle(0.01)
+    assert writer.throttle_delay == 0.0
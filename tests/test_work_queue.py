@@ -0,0 +1,87 @@
+import sqlite3
+import pytest
+from src.pipeline.scheduler import DocumentScheduler
+from src.pipeline.work_queue import DurableWorkQueue, QUEUED, UPLOADED, PARSED
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / "work_queue.db")
+
+
+def test_duplicate_documents_are_not_added(db_path):
+    work_queue = DurableWorkQueue(db_path)
+    doc_info = {"source": "folder", "path": "/docs/a.pdf"}
+
+    assert work_queue.add(doc_info)
+    assert "work_id" in doc_info
+    assert not work_queue.add({"source": "folder", "path": "/docs/a.pdf"})
+
+
+def test_restart_resumes_from_last_stage(db_path):
+    work_queue = DurableWorkQueue(db_path)
+    doc_info = {"source": "api", "path": "/spool/a.pdf", "doc_id": "doc-1"}
+    work_queue.add(doc_info)
+    assert work_queue.start(doc_info["work_id"]) == (QUEUED, False)
+    work_queue.mark_stage(doc_info["work_id"], PARSED, content="parsed text")
+    work_queue.mark_stage(doc_info["work_id"], UPLOADED)
+    # A window of a streamed document finishing late does not move progress back
+    work_queue.mark_stage(doc_info["work_id"], QUEUED)
+    work_queue.close()
+
+    restarted = DurableWorkQueue(db_path)
+    [(resumed, attempts)] = restarted.unfinished()
+    assert resumed["doc_id"] == "doc-1"
+    assert attempts == 1
+    assert restarted.start(resumed["work_id"]) == (PARSED, True)
+    assert restarted.load_content(resumed["work_id"]) == "parsed text"
+
+    restarted.complete(resumed["work_id"])
+    assert restarted.unfinished() == []
+    assert restarted.load_content(resumed["work_id"]) is None
+
+
+def test_failed_document_is_retried_then_dead_lettered(db_path):
+    work_queue = DurableWorkQueue(db_path, max_attempts=2)
+    doc_info = {"source": "folder", "path": "/docs/bad.pdf"}
+    work_queue.add(doc_info)
+    work_id = doc_info["work_id"]
+
+    work_queue.start(work_id)
+    retry = work_queue.fail(work_id, "parse: boom")
+    assert retry == {"source": "folder", "path": "/docs/bad.pdf", "work_id": work_id}
+
+    work_queue.start(work_id)
+    assert work_queue.fail(work_id, "parse: boom again") is None
+
+    [dead] = work_queue.dead_letters()
+    assert dead["path"] == "/docs/bad.pdf"
+    assert dead["attempts"] == 2
+    assert dead["error"] == "parse: boom again"
+    # The same path can be queued again, e.g. after the file was fixed
+    assert work_queue.add({"source": "folder", "path": "/docs/bad.pdf"})
+
+
+def test_scheduler_records_documents_in_store(db_path):
+    work_queue = DurableWorkQueue(db_path)
+    scheduler = DocumentScheduler(store=work_queue)
+
+    scheduler.put({"source": "folder", "path": "/docs/a.pdf"})
+    scheduler.put({"source": "folder", "path": "/docs/a.pdf"})
+
+    assert scheduler.qsize() == 1
+    assert "work_id" in scheduler.get()
+
+
+def test_embedded_stage_of_earlier_versions_resumes_as_parsed(db_path):
+    work_queue = DurableWorkQueue(db_path)
+    doc_info = {"source": "folder", "path": "/docs/a.pdf"}
+    work_queue.add(doc_info)
+    work_queue.close()
+    conn = sqlite3.connect(db_path)
+    conn.execute("UPDATE work_items SET stage = 'embedded'")
+    conn.commit()
+    conn.close()
+
+    restarted = DurableWorkQueue(db_path)
+    assert restarted.start(doc_info["work_id"]) == (PARSED, False)